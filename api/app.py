@@ -4,19 +4,49 @@ HealthFlow RegTech - Egypt's Digital Health Infrastructure
 """
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import Response
 from pydantic import BaseModel
 from typing import List, Optional
 from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager
+import asyncio
+import orjson
+import os
 import sys
 from pathlib import Path
 
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+# Worker pool for CPU-bound solver calls, so they don't block the event loop
+process_pool: Optional[ProcessPoolExecutor] = None
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start the solver worker pool with the app and shut it down on exit"""
+    global process_pool
+    process_pool = ProcessPoolExecutor(max_workers=os.cpu_count())
+    try:
+        yield
+    finally:
+        process_pool.shutdown(wait=True)
+        process_pool = None
+
+class _OrjsonResponse(Response):
+    """JSON response serialized with orjson (FastAPI's ORJSONResponse is deprecated)"""
+    media_type = "application/json"
+    
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
 app = FastAPI(
     title="AI-Enhanced Nurse Scheduler API",
     description="Intelligent nurse scheduling system for Egyptian healthcare",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=_OrjsonResponse,
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -28,6 +58,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress larger JSON payloads (schedules, violation reports)
+app.add_middleware(GZipMiddleware, minimum_size=500, compresslevel=4)
+
 # Pydantic models
 class HealthCheck(BaseModel):
     status: str
@@ -52,56 +85,70 @@ class ScheduleResponse(BaseModel):
     message: str
     schedule_id: Optional[str] = None
 
+# Static part of the health check body; only the timestamp changes per request
+_HEALTH_STATIC = {"status": "healthy", "version": "1.0.0"}
+
+def _health_response() -> _OrjsonResponse:
+    """Prebuilt health check response (skips response_model validation)"""
+    return _OrjsonResponse(content={**_HEALTH_STATIC, "timestamp": datetime.now().isoformat()})
+
 # Routes
-@app.get("/", response_model=HealthCheck)
+@app.get("/", responses={200: {"model": HealthCheck}})
 async def root():
     """Health check endpoint"""
-    return {
-        "status": "healthy",
-        "timestamp": datetime.now().isoformat(),
-        "version": "1.0.0"
-    }
+    return _health_response()
 
-@app.get("/health", response_model=HealthCheck)
+@app.get("/health", responses={200: {"model": HealthCheck}})
 async def health_check():
     """Detailed health check"""
+    return _health_response()
+
+def solve_schedule(request: ScheduleRequest) -> dict:
+    """Build a schedule for the request (runs in a worker process)"""
+    # This is a placeholder - actual scheduling logic would go here
     return {
-        "status": "healthy",
-        "timestamp": datetime.now().isoformat(),
-        "version": "1.0.0"
+        "status": "success",
+        "message": f"Schedule created for {len(request.nurses)} nurses from {request.start_date} to {request.end_date}",
+        "schedule_id": f"schedule_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
     }
 
 @app.post("/api/schedule", response_model=ScheduleResponse)
 async def create_schedule(request: ScheduleRequest):
     """Create a new nurse schedule"""
     try:
-        # This is a placeholder - actual scheduling logic would go here
-        return {
-            "status": "success",
-            "message": f"Schedule created for {len(request.nurses)} nurses from {request.start_date} to {request.end_date}",
-            "schedule_id": f"schedule_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-        }
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(process_pool, solve_schedule, request)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+# /api/info is fully static, so it is serialized once at import
+_INFO_BYTES = orjson.dumps({
+    "name": "AI-Enhanced Nurse Scheduler",
+    "organization": "HealthFlow RegTech",
+    "country": "Egypt",
+    "features": [
+        "Branch-and-price optimization",
+        "LSTM demand forecasting",
+        "XGBoost fatigue prediction",
+        "Ramadan-aware scheduling",
+        "Egyptian labor law compliance",
+        "Arabic language support"
+    ],
+    "status": "operational"
+})
+
 @app.get("/api/info")
 async def get_info():
     """Get system information"""
-    return {
-        "name": "AI-Enhanced Nurse Scheduler",
-        "organization": "HealthFlow RegTech",
-        "country": "Egypt",
-        "features": [
-            "Branch-and-price optimization",
-            "LSTM demand forecasting",
-            "XGBoost fatigue prediction",
-            "Ramadan-aware scheduling",
-            "Egyptian labor law compliance",
-            "Arabic language support"
-        ],
-        "status": "operational"
-    }
+    return Response(content=_INFO_BYTES, media_type="application/json")
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    uvicorn.run(
+        app,
+        host="0.0.0.0",
+        port=8000,
+        loop="auto",
+        http="auto",
+        access_log=False
+    )
@@ -0,0 +1,170 @@
+"""
+Numeric kernels for the per-nurse hard constraints.
+
+All kernels take flat arrays of every assigned shift, grouped by nurse
+index and sorted by date within each nurse (see ScheduleView.packed),
+and return the violation contributed by each nurse. With stop_early set,
+they return as soon as any violation is recorded (for feasibility checks).
+
+Kernels release the GIL, so callers may evaluate schedules from several
+threads concurrently (e.g. while pricing columns).
+"""
+
+import numpy as np
+
+from core._jit import njit
+
+
+@njit(cache=True, nogil=True)
+def max_consecutive_violation(nurse_idx, date_ord, n_nurses, max_days, stop_early):
+    """Days above max_days in each nurse's longest run of consecutive days"""
+    out = np.zeros(n_nurses)
+    k = len(nurse_idx)
+    if k == 0:
+        return out
+    
+    consecutive = 1
+    max_consecutive = 1
+    for i in range(1, k + 1):
+        if i == k or nurse_idx[i] != nurse_idx[i - 1]:
+            if max_consecutive > max_days:
+                out[nurse_idx[i - 1]] = max_consecutive - max_days
+                if stop_early:
+                    return out
+            consecutive = 1
+            max_consecutive = 1
+            continue
+        
+        if date_ord[i] - date_ord[i - 1] == 1:
+            consecutive += 1
+            if consecutive > max_consecutive:
+                max_consecutive = consecutive
+        else:
+            consecutive = 1
+    
+    return out
+
+
+@njit(cache=True, nogil=True)
+def min_rest_violation(nurse_idx, start_abs, end_abs, n_nurses, min_hours, stop_early):
+    """Hours short of min_hours between each nurse's adjacent shifts"""
+    out = np.zeros(n_nurses)
+    for i in range(len(nurse_idx) - 1):
+        if nurse_idx[i + 1] != nurse_idx[i]:
+            continue
+        
+        rest_hours = (start_abs[i + 1] - end_abs[i]) / 60.0
+        if rest_hours < min_hours:
+            out[nurse_idx[i]] += min_hours - rest_hours
+            if stop_early:
+                return out
+    
+    return out
+
+
+@njit(cache=True, nogil=True)
+def weekly_hours_violation(nurse_idx, week, duration_min, n_nurses, max_hours, stop_early):
+    """Hours above max_hours in each nurse's calendar weeks"""
+    out = np.zeros(n_nurses)
+    k = len(nurse_idx)
+    if k == 0:
+        return out
+    
+    week_minutes = 0
+    for i in range(k + 1):
+        if i > 0 and (i == k or nurse_idx[i] != nurse_idx[i - 1] or week[i] != week[i - 1]):
+            week_hours = week_minutes / 60.0
+            if week_hours > max_hours:
+                out[nurse_idx[i - 1]] += week_hours - max_hours
+                if stop_early:
+                    return out
+            week_minutes = 0
+        
+        if i < k:
+            week_minutes += duration_min[i]
+    
+    return out
+
+
+# Columns of the fused per-nurse statistics
+FUSED_CONSECUTIVE = 0
+FUSED_REST = 1
+FUSED_WEEKLY = 2
+FUSED_FRIDAYS = 3
+FUSED_RAMADAN_NIGHTS = 4
+FUSED_RAMADAN_LONG = 5
+FUSED_HOURS = 6
+FUSED_COLUMNS = 7
+
+
+@njit(cache=True, nogil=True)
+def fused_nurse_pass(nurse_idx, date_ord, date_us, start_abs, end_abs, duration_min,
+                     week, is_night, n_nurses, max_days, min_hours, max_hours,
+                     ramadan_start_us, ramadan_end_us):
+    """
+    Single sweep over all shifts accumulating every per-nurse statistic
+    used by the hard and Egyptian-specific soft constraints.
+    
+    Returns an (n_nurses, FUSED_COLUMNS) array.
+    """
+    out = np.zeros((n_nurses, FUSED_COLUMNS))
+    k = len(nurse_idx)
+    if k == 0:
+        return out
+    
+    consecutive = 1
+    max_consecutive = 1
+    week_minutes = 0
+    for i in range(k):
+        n = nurse_idx[i]
+        same_nurse = i > 0 and nurse_idx[i - 1] == n
+        
+        if same_nurse:
+            # Consecutive days
+            if date_ord[i] - date_ord[i - 1] == 1:
+                consecutive += 1
+                if consecutive > max_consecutive:
+                    max_consecutive = consecutive
+            else:
+                consecutive = 1
+            
+            # Rest between adjacent shifts
+            rest_hours = (start_abs[i] - end_abs[i - 1]) / 60.0
+            if rest_hours < min_hours:
+                out[n, FUSED_REST] += min_hours - rest_hours
+        
+        # Weekly hours (flush the previous week when it ends)
+        if i > 0 and (not same_nurse or week[i] != week[i - 1]):
+            week_hours = week_minutes / 60.0
+            if week_hours > max_hours:
+                out[nurse_idx[i - 1], FUSED_WEEKLY] += week_hours - max_hours
+            week_minutes = 0
+        week_minutes += duration_min[i]
+        
+        # Consecutive days (flush the previous nurse)
+        if i > 0 and not same_nurse:
+            if max_consecutive > max_days:
+                out[nurse_idx[i - 1], FUSED_CONSECUTIVE] = max_consecutive - max_days
+            consecutive = 1
+            max_consecutive = 1
+        
+        # Friday is weekday 4; day ordinal 1 is a Monday
+        if (date_ord[i] + 6) % 7 == 4:
+            out[n, FUSED_FRIDAYS] += 1
+        
+        if ramadan_start_us <= date_us[i] <= ramadan_end_us:
+            if is_night[i]:
+                out[n, FUSED_RAMADAN_NIGHTS] += 1
+            if duration_min[i] > 360:
+                out[n, FUSED_RAMADAN_LONG] += 1
+        
+        out[n, FUSED_HOURS] += duration_min[i] / 60.0
+    
+    # Flush the last nurse
+    week_hours = week_minutes / 60.0
+    if week_hours > max_hours:
+        out[nurse_idx[k - 1], FUSED_WEEKLY] += week_hours - max_hours
+    if max_consecutive > max_days:
+        out[nurse_idx[k - 1], FUSED_CONSECUTIVE] = max_consecutive - max_days
+    
+    return out
@@ -0,0 +1,54 @@
+"""
+Numeric kernels for rotation costing.
+
+A rotation is passed as its per-type shift counts (indexed by
+models._SHIFT_TYPE_INDEX) and nurse preferences as integer bitmasks over
+those indices, so the kernels never touch Python objects.
+"""
+
+import numpy as np
+
+from core._jit import njit, HAS_NUMBA
+
+
+@njit(cache=True)
+def rotation_cost(type_counts, total_hours, n_shifts, max_hours, max_consecutive,
+                  avoided, not_preferred, night_id, max_night, fatigue):
+    """Cost of one rotation; mirrors Rotation.get_cost term by term"""
+    preference = 0.0
+    for t in range(len(type_counts)):
+        if (avoided >> t) & 1:
+            preference += 30 * type_counts[t]
+        if (not_preferred >> t) & 1:
+            preference += 10 * type_counts[t]
+    nights = type_counts[night_id]
+    
+    cost = 0.0
+    
+    # Overtime penalty
+    if total_hours > max_hours:
+        cost += (total_hours - max_hours) * 50
+    
+    # Consecutive days penalty
+    if n_shifts > max_consecutive:
+        cost += 200
+    
+    # Shift preference penalties
+    cost += preference
+    
+    # Night shift penalties
+    if nights > max_night:
+        cost += (nights - max_night) * 40
+    
+    # Fatigue penalty
+    cost += total_hours * fatigue * 10
+    
+    return cost
+
+
+if HAS_NUMBA:
+    # Compile (or load from cache) at import so the first real call is fast
+    rotation_cost(
+        np.zeros(5, dtype=np.int64), 0.0, 0, 0.0, 0,
+        0, 0, 0, 0, 0.0
+    )
@@ -0,0 +1,21 @@
+"""
+Numba JIT helpers.
+Falls back to plain Python when numba is not installed so the kernels
+still run (slowly) on minimal installs.
+"""
+
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+    
+    def njit(*args, **kwargs):
+        """No-op replacement for numba.njit"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        
+        def decorator(func):
+            return func
+        
+        return decorator
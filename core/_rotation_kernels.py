@@ -0,0 +1,46 @@
+"""
+Numeric kernels for rotation generation.
+
+A nurse's workable shifts are passed as their dates in absolute
+microseconds, sorted ascending, and candidate rotations come back as
+(start, length) windows into that sorted list, so Python only builds
+Rotation objects for windows that pass every check.
+"""
+
+import numpy as np
+
+from core._jit import njit
+
+DAY_US = 86_400_000_000
+
+
+@njit(cache=True, nogil=True)
+def rotation_windows(date_us, max_consecutive, max_rotations):
+    """
+    Consecutive-day windows in AIEnhancedOptimizer.generate_rotations order:
+    all 1-3 shift windows by start, then all 4-6 shift windows by start,
+    none longer than max_consecutive, cut off after max_rotations.
+    """
+    n = len(date_us)
+    
+    # reach[i]: shifts in the run of consecutive days starting at shift i
+    reach = np.ones(n, dtype=np.int64)
+    for i in range(n - 2, -1, -1):
+        if (date_us[i + 1] - date_us[i]) // DAY_US == 1:
+            reach[i] = reach[i + 1] + 1
+    
+    capacity = max(0, min(max_rotations, 6 * n))
+    out = np.empty((capacity, 2), dtype=np.int64)
+    count = 0
+    for phase in range(2):
+        min_length = 1 if phase == 0 else 4
+        max_length = min(3 if phase == 0 else 6, max_consecutive)
+        for start in range(n):
+            for length in range(min_length, min(max_length, reach[start]) + 1):
+                if count == capacity:
+                    return out
+                out[count, 0] = start
+                out[count, 1] = length
+                count += 1
+    
+    return out[:count]
@@ -4,248 +4,610 @@ Implements both hard and soft constraints per Egyptian regulations.
 """
 
 from abc import ABC, abstractmethod
-from typing import List, Dict, Optional
-from datetime import datetime, timedelta
-from core.models import Nurse, Shift, Rotation, Schedule, ShiftType
+from dataclasses import dataclass, field, replace
+from typing import Iterable, List, Dict, Optional, Tuple
+from datetime import datetime
+import math
+from core.models import Nurse, Shift, Rotation, Schedule, ShiftType, _SHIFT_TYPE_INDEX
+from core import _constraint_kernels as kernels
 import numpy as np
 
 
+@dataclass(slots=True)
+class PackedShifts:
+    """
+    Flat int64 arrays of all assigned shifts, grouped by nurse index and
+    sorted by date within each nurse. Times are absolute minutes.
+    """
+    nurse_idx: np.ndarray
+    date_ord: np.ndarray
+    start_abs: np.ndarray
+    end_abs: np.ndarray
+    duration_min: np.ndarray
+    week: np.ndarray
+    date_us: np.ndarray  # Shift datetime as absolute microseconds
+    is_night: np.ndarray
+    n_nurses: int
+
+
+@dataclass(slots=True)
+class ShiftColumns:
+    """Per-shift columns of schedule.shifts, in schedule order"""
+    required: np.ndarray  # int32
+    assigned: np.ndarray  # int32
+    complexity: np.ndarray  # float64
+    is_rest: np.ndarray  # bool
+
+
+@dataclass(slots=True)
+class ScheduleView:
+    """
+    Per-nurse index over a schedule.
+    Built once per evaluation pass and shared by all constraints.
+    """
+    shifts_by_nurse: Dict[str, List[Shift]]  # Sorted by date
+    rotations_by_nurse: Dict[str, List[Rotation]]
+    shifts: List[Shift]  # schedule.shifts, in schedule order
+    nurses_by_id: Dict[str, Nurse]
+    _packed: Optional[PackedShifts] = field(default=None, init=False, repr=False)
+    _columns: Optional[ShiftColumns] = field(default=None, init=False, repr=False)
+    _nurse_hours: Optional[np.ndarray] = field(default=None, init=False, repr=False)
+    _shift_counts: Optional[Dict[int, int]] = field(default=None, init=False, repr=False)
+    
+    @classmethod
+    def build(cls, schedule: Schedule) -> 'ScheduleView':
+        """Group rotations and shifts by nurse in a single pass"""
+        rotations_by_nurse = {n.id: [] for n in schedule.nurses}
+        for rotation in schedule.rotations:
+            if rotation.nurse_id in rotations_by_nurse:
+                rotations_by_nurse[rotation.nurse_id].append(rotation)
+        
+        shifts_by_nurse = {}
+        for nurse_id, rotations in rotations_by_nurse.items():
+            nurse_shifts = [s for rotation in rotations for s in rotation.shifts]
+            nurse_shifts.sort(key=lambda s: s.date)
+            shifts_by_nurse[nurse_id] = nurse_shifts
+        
+        return cls(
+            shifts_by_nurse=shifts_by_nurse,
+            rotations_by_nurse=rotations_by_nurse,
+            shifts=schedule.shifts,
+            nurses_by_id={n.id: n for n in schedule.nurses}
+        )
+    
+    @property
+    def packed(self) -> PackedShifts:
+        """Packed arrays for the numeric kernels, built on first access"""
+        if self._packed is None:
+            self._packed = _pack(self)
+        return self._packed
+    
+    @property
+    def nurse_hours(self) -> np.ndarray:
+        """Total assigned hours per nurse, in view order"""
+        if self._nurse_hours is None:
+            packed = self.packed
+            self._nurse_hours = np.bincount(
+                packed.nurse_idx, weights=packed.duration_min, minlength=packed.n_nurses
+            ) / 60.0
+        return self._nurse_hours
+    
+    @property
+    def shift_counts(self) -> Dict[int, int]:
+        """Occurrences of each shift object (by id) in schedule.shifts"""
+        if self._shift_counts is None:
+            counts: Dict[int, int] = {}
+            for shift in self.shifts:
+                counts[id(shift)] = counts.get(id(shift), 0) + 1
+            self._shift_counts = counts
+        return self._shift_counts
+    
+    def nurse_position(self, nurse_id: str) -> int:
+        """Index of a nurse in the view (and in the packed arrays)"""
+        return list(self.shifts_by_nurse).index(nurse_id)
+    
+    @property
+    def columns(self) -> ShiftColumns:
+        """Per-shift coverage columns, built on first access"""
+        if self._columns is None:
+            shifts = self.shifts
+            self._columns = ShiftColumns(
+                required=np.fromiter((s.required_nurses for s in shifts),
+                                     dtype=np.int32, count=len(shifts)),
+                assigned=np.fromiter((len(s.assigned_nurses) for s in shifts),
+                                     dtype=np.int32, count=len(shifts)),
+                complexity=np.fromiter((s.complexity_score for s in shifts),
+                                       dtype=np.float64, count=len(shifts)),
+                is_rest=np.fromiter((s.shift_type == ShiftType.REST for s in shifts),
+                                    dtype=np.bool_, count=len(shifts))
+            )
+        return self._columns
+
+
+def _pack(view: ScheduleView) -> PackedShifts:
+    """Flatten the per-nurse shift lists into contiguous arrays"""
+    return _pack_shift_lists(list(view.shifts_by_nurse.values()))
+
+
+def _pack_shift_lists(shift_lists: List[List[Shift]]) -> PackedShifts:
+    """Pack date-sorted shift lists, one per nurse index"""
+    total = sum(len(shifts) for shifts in shift_lists)
+    nurse_idx = np.empty(total, dtype=np.int64)
+    date_ord = np.empty(total, dtype=np.int64)
+    start_abs = np.empty(total, dtype=np.int64)
+    end_abs = np.empty(total, dtype=np.int64)
+    duration_min = np.empty(total, dtype=np.int64)
+    date_us = np.empty(total, dtype=np.int64)
+    is_night = np.empty(total, dtype=np.bool_)
+    
+    i = 0
+    for n, nurse_shifts in enumerate(shift_lists):
+        for shift in nurse_shifts:
+            ordinal = shift.date.toordinal()
+            start = ordinal * 1440 + shift.start_time.hour * 60 + shift.start_time.minute
+            end = ordinal * 1440 + shift.end_time.hour * 60 + shift.end_time.minute
+            if shift.end_time < shift.start_time:
+                end += 1440  # Crosses midnight
+            
+            nurse_idx[i] = n
+            date_ord[i] = ordinal
+            start_abs[i] = start
+            end_abs[i] = end
+            duration_min[i] = 0 if shift.shift_type == ShiftType.REST else end - start
+            date_us[i] = _absolute_us(shift.date)
+            is_night[i] = shift.shift_type == ShiftType.NIGHT
+            i += 1
+    
+    # Monday-aligned week buckets (day ordinal 1 is a Monday); same grouping
+    # as ISO weeks without building an isocalendar tuple per shift
+    week = (date_ord - 1) // 7
+    
+    return PackedShifts(
+        nurse_idx=nurse_idx,
+        date_ord=date_ord,
+        start_abs=start_abs,
+        end_abs=end_abs,
+        duration_min=duration_min,
+        week=week,
+        date_us=date_us,
+        is_night=is_night,
+        n_nurses=len(shift_lists)
+    )
+
+
+def _absolute_us(dt: datetime) -> int:
+    """Datetime as microseconds since day ordinal 0, for integer comparisons"""
+    seconds = dt.hour * 3600 + dt.minute * 60 + dt.second
+    return (dt.toordinal() * 86400 + seconds) * 1_000_000 + dt.microsecond
+
+
+def _sorted_shifts(rotations: List[Rotation]) -> List[Shift]:
+    """All shifts of the given rotations, sorted by date (stable)"""
+    shifts = [s for rotation in rotations for s in rotation.shifts]
+    shifts.sort(key=lambda s: s.date)
+    return shifts
+
+
+def _assignment_changes(view: ScheduleView, nurse_id: str,
+                        new_rotations: List[Rotation]) -> List[Tuple[Shift, bool]]:
+    """
+    Shifts whose assignment of nurse_id flips when the nurse's rotations
+    are replaced by new_rotations, paired with the new assignment state.
+    """
+    new_ids = {id(s) for rotation in new_rotations for s in rotation.shifts}
+    changes = []
+    seen = set()
+    affected = view.shifts_by_nurse[nurse_id] + _sorted_shifts(new_rotations)
+    for shift in affected:
+        if id(shift) in seen:
+            continue
+        seen.add(id(shift))
+        assigned = id(shift) in new_ids
+        if (nurse_id in shift.assigned_nurses) != assigned:
+            changes.append((shift, assigned))
+    return changes
+
+
+def _with_nurse_rotations(schedule: Schedule, view: ScheduleView, nurse_id: str,
+                          new_rotations: List[Rotation]) -> Schedule:
+    """
+    Copy of the schedule with nurse_id's rotations replaced by new_rotations
+    and shift assignments updated to match. Only the shifts whose
+    assignment flips (and rotations holding them) are copied.
+    """
+    replaced: Dict[int, Shift] = {}
+    for shift, assigned in _assignment_changes(view, nurse_id, new_rotations):
+        if assigned:
+            assigned_nurses = shift.assigned_nurses + [nurse_id]
+        else:
+            assigned_nurses = [nid for nid in shift.assigned_nurses if nid != nurse_id]
+        replaced[id(shift)] = replace(shift, assigned_nurses=assigned_nurses)
+    
+    def remap(rotation: Rotation) -> Rotation:
+        if not any(id(s) in replaced for s in rotation.shifts):
+            return rotation
+        return Rotation(nurse_id=rotation.nurse_id,
+                        shifts=[replaced.get(id(s), s) for s in rotation.shifts])
+    
+    rotations = [remap(r) for r in schedule.rotations if r.nurse_id != nurse_id]
+    rotations += [remap(r) for r in new_rotations]
+    return replace(schedule,
+                   shifts=[replaced.get(id(s), s) for s in schedule.shifts],
+                   rotations=rotations)
+
+
 class Constraint(ABC):
     """Abstract base class for constraints"""
     
+    __slots__ = ("weight", "is_hard")
+    
     def __init__(self, weight: float = 1.0, is_hard: bool = True):
         self.weight = weight
         self.is_hard = is_hard
     
     @abstractmethod
-    def evaluate(self, schedule: Schedule) -> float:
+    def evaluate(self, schedule: Schedule, view: Optional[ScheduleView] = None) -> float:
         """
         Evaluate constraint violation.
         Returns 0 if satisfied, positive value for violations.
+        
+        Args:
+            schedule: Schedule to evaluate
+            view: Precomputed per-nurse index (built from schedule if omitted)
         """
         pass
     
     @abstractmethod
-    def is_satisfied(self, schedule: Schedule) -> bool:
+    def is_satisfied(self, schedule: Schedule, view: Optional[ScheduleView] = None) -> bool:
         """Check if constraint is satisfied"""
         pass
     
-    def get_penalty(self, schedule: Schedule) -> float:
+    def violates(self, schedule: Schedule, view: Optional[ScheduleView] = None) -> bool:
+        """
+        Check for any violation, stopping at the first one found.
+        Subclasses override this to exit their inner loops early.
+        """
+        return not self.is_satisfied(schedule, view)
+    
+    def get_penalty(self, schedule: Schedule, view: Optional[ScheduleView] = None) -> float:
         """Get weighted penalty for constraint violation"""
-        return self.weight * self.evaluate(schedule)
+        return self.weight * self.evaluate(schedule, view)
+    
+    def delta(self, schedule: Schedule, view: ScheduleView, nurse_id: str,
+              new_rotations: List[Rotation]) -> float:
+        """
+        Change in violation if nurse_id's rotations were replaced by
+        new_rotations (and shift assignments updated to match).
+        
+        The base implementation evaluates a modified copy of the schedule,
+        so it costs two full evaluations; subclasses override this to
+        touch only the affected nurse/shifts.
+        """
+        modified = _with_nurse_rotations(schedule, view, nurse_id, new_rotations)
+        return self.evaluate(modified) - self.evaluate(schedule, view)
 
 
 class MaxConsecutiveDaysConstraint(Constraint):
     """Maximum consecutive working days (Egyptian labor law: typically 6 days)"""
     
+    __slots__ = ("max_days",)
+    
     def __init__(self, max_days: int = 6, weight: float = 100.0, is_hard: bool = True):
         super().__init__(weight, is_hard)
         self.max_days = max_days
     
-    def evaluate(self, schedule: Schedule) -> float:
-        total_violation = 0.0
+    def evaluate(self, schedule: Schedule, view: Optional[ScheduleView] = None) -> float:
+        if view is None:
+            view = ScheduleView.build(schedule)
+        packed = view.packed
         
-        for nurse in schedule.nurses:
-            nurse_shifts = []
-            for rotation in schedule.rotations:
-                if rotation.nurse_id == nurse.id:
-                    nurse_shifts.extend(rotation.shifts)
-            
-            # Sort by date
-            nurse_shifts.sort(key=lambda s: s.date)
-            
-            # Count consecutive days
-            if not nurse_shifts:
-                continue
-            
-            consecutive = 1
-            max_consecutive = 1
-            
-            for i in range(1, len(nurse_shifts)):
-                days_diff = (nurse_shifts[i].date - nurse_shifts[i-1].date).days
-                
-                if days_diff == 1:
-                    consecutive += 1
-                    max_consecutive = max(max_consecutive, consecutive)
-                else:
-                    consecutive = 1
-            
-            if max_consecutive > self.max_days:
-                total_violation += (max_consecutive - self.max_days)
+        per_nurse = kernels.max_consecutive_violation(
+            packed.nurse_idx, packed.date_ord, packed.n_nurses, self.max_days, False
+        )
+        return float(per_nurse.sum())
+    
+    def violates(self, schedule: Schedule, view: Optional[ScheduleView] = None) -> bool:
+        if view is None:
+            view = ScheduleView.build(schedule)
+        packed = view.packed
         
-        return total_violation
-    
-    def is_satisfied(self, schedule: Schedule) -> bool:
-        return self.evaluate(schedule) == 0
+        per_nurse = kernels.max_consecutive_violation(
+            packed.nurse_idx, packed.date_ord, packed.n_nurses, self.max_days, True
+        )
+        return bool(per_nurse.any())
+    
+    def _evaluate_fused(self, schedule: Schedule, view: ScheduleView,
+                        stats: np.ndarray) -> float:
+        return float(stats[:, kernels.FUSED_CONSECUTIVE].sum())
+    
+    def delta(self, schedule: Schedule, view: ScheduleView, nurse_id: str,
+              new_rotations: List[Rotation]) -> float:
+        packed = _pack_shift_lists([view.shifts_by_nurse[nurse_id],
+                                    _sorted_shifts(new_rotations)])
+        old, new = kernels.max_consecutive_violation(
+            packed.nurse_idx, packed.date_ord, 2, self.max_days, False
+        )
+        return float(new - old)
+    
+    def is_satisfied(self, schedule: Schedule, view: Optional[ScheduleView] = None) -> bool:
+        return self.evaluate(schedule, view) == 0
 
 
 class MinRestPeriodConstraint(Constraint):
     """Minimum rest period between shifts (Egyptian law: 11 hours)"""
     
+    __slots__ = ("min_hours",)
+    
     def __init__(self, min_hours: int = 11, weight: float = 200.0, is_hard: bool = True):
         super().__init__(weight, is_hard)
         self.min_hours = min_hours
     
-    def evaluate(self, schedule: Schedule) -> float:
-        total_violation = 0.0
+    def evaluate(self, schedule: Schedule, view: Optional[ScheduleView] = None) -> float:
+        if view is None:
+            view = ScheduleView.build(schedule)
+        packed = view.packed
         
-        for nurse in schedule.nurses:
-            nurse_shifts = []
-            for rotation in schedule.rotations:
-                if rotation.nurse_id == nurse.id:
-                    nurse_shifts.extend(rotation.shifts)
-            
-            nurse_shifts.sort(key=lambda s: s.date)
-            
-            for i in range(len(nurse_shifts) - 1):
-                shift1 = nurse_shifts[i]
-                shift2 = nurse_shifts[i + 1]
-                
-                # Calculate rest period
-                end_time1 = datetime.combine(shift1.date, shift1.end_time)
-                start_time2 = datetime.combine(shift2.date, shift2.start_time)
-                
-                # Handle shifts crossing midnight
-                if shift1.end_time < shift1.start_time:
-                    end_time1 += timedelta(days=1)
-                
-                rest_hours = (start_time2 - end_time1).total_seconds() / 3600
-                
-                if rest_hours < self.min_hours:
-                    total_violation += (self.min_hours - rest_hours)
+        per_nurse = kernels.min_rest_violation(
+            packed.nurse_idx, packed.start_abs, packed.end_abs,
+            packed.n_nurses, float(self.min_hours), False
+        )
+        return float(per_nurse.sum())
+    
+    def violates(self, schedule: Schedule, view: Optional[ScheduleView] = None) -> bool:
+        if view is None:
+            view = ScheduleView.build(schedule)
+        packed = view.packed
         
-        return total_violation
-    
-    def is_satisfied(self, schedule: Schedule) -> bool:
-        return self.evaluate(schedule) == 0
+        per_nurse = kernels.min_rest_violation(
+            packed.nurse_idx, packed.start_abs, packed.end_abs,
+            packed.n_nurses, float(self.min_hours), True
+        )
+        return bool(per_nurse.any())
+    
+    def _evaluate_fused(self, schedule: Schedule, view: ScheduleView,
+                        stats: np.ndarray) -> float:
+        return float(stats[:, kernels.FUSED_REST].sum())
+    
+    def delta(self, schedule: Schedule, view: ScheduleView, nurse_id: str,
+              new_rotations: List[Rotation]) -> float:
+        packed = _pack_shift_lists([view.shifts_by_nurse[nurse_id],
+                                    _sorted_shifts(new_rotations)])
+        old, new = kernels.min_rest_violation(
+            packed.nurse_idx, packed.start_abs, packed.end_abs, 2, float(self.min_hours), False
+        )
+        return float(new - old)
+    
+    def is_satisfied(self, schedule: Schedule, view: Optional[ScheduleView] = None) -> bool:
+        return self.evaluate(schedule, view) == 0
 
 
 class MaxWeeklyHoursConstraint(Constraint):
     """Maximum weekly hours (Egyptian labor law: 48 hours standard)"""
     
+    __slots__ = ("max_hours",)
+    
     def __init__(self, max_hours: float = 48.0, weight: float = 50.0, is_hard: bool = True):
         super().__init__(weight, is_hard)
         self.max_hours = max_hours
     
-    def evaluate(self, schedule: Schedule) -> float:
-        total_violation = 0.0
+    def evaluate(self, schedule: Schedule, view: Optional[ScheduleView] = None) -> float:
+        if view is None:
+            view = ScheduleView.build(schedule)
+        packed = view.packed
         
-        for nurse in schedule.nurses:
-            nurse_shifts = []
-            for rotation in schedule.rotations:
-                if rotation.nurse_id == nurse.id:
-                    nurse_shifts.extend(rotation.shifts)
-            
-            # Group by week
-            weeks = {}
-            for shift in nurse_shifts:
-                week_num = shift.date.isocalendar()[1]
-                if week_num not in weeks:
-                    weeks[week_num] = []
-                weeks[week_num].append(shift)
-            
-            # Check each week
-            for week_shifts in weeks.values():
-                total_hours = sum(s.get_duration_hours() for s in week_shifts)
-                
-                if total_hours > self.max_hours:
-                    total_violation += (total_hours - self.max_hours)
+        per_nurse = kernels.weekly_hours_violation(
+            packed.nurse_idx, packed.week, packed.duration_min,
+            packed.n_nurses, float(self.max_hours), False
+        )
+        return float(per_nurse.sum())
+    
+    def violates(self, schedule: Schedule, view: Optional[ScheduleView] = None) -> bool:
+        if view is None:
+            view = ScheduleView.build(schedule)
+        packed = view.packed
         
-        return total_violation
-    
-    def is_satisfied(self, schedule: Schedule) -> bool:
-        return self.evaluate(schedule) == 0
+        per_nurse = kernels.weekly_hours_violation(
+            packed.nurse_idx, packed.week, packed.duration_min,
+            packed.n_nurses, float(self.max_hours), True
+        )
+        return bool(per_nurse.any())
+    
+    def _evaluate_fused(self, schedule: Schedule, view: ScheduleView,
+                        stats: np.ndarray) -> float:
+        return float(stats[:, kernels.FUSED_WEEKLY].sum())
+    
+    def delta(self, schedule: Schedule, view: ScheduleView, nurse_id: str,
+              new_rotations: List[Rotation]) -> float:
+        packed = _pack_shift_lists([view.shifts_by_nurse[nurse_id],
+                                    _sorted_shifts(new_rotations)])
+        old, new = kernels.weekly_hours_violation(
+            packed.nurse_idx, packed.week, packed.duration_min, 2, float(self.max_hours), False
+        )
+        return float(new - old)
+    
+    def is_satisfied(self, schedule: Schedule, view: Optional[ScheduleView] = None) -> bool:
+        return self.evaluate(schedule, view) == 0
 
 
 class ShiftCoverageConstraint(Constraint):
     """All shifts must have required number of nurses"""
     
+    __slots__ = ()
+    
     def __init__(self, weight: float = 500.0, is_hard: bool = True):
         super().__init__(weight, is_hard)
     
-    def evaluate(self, schedule: Schedule) -> float:
-        total_violation = 0.0
+    def evaluate(self, schedule: Schedule, view: Optional[ScheduleView] = None) -> float:
+        if view is None:
+            view = ScheduleView.build(schedule)
         
+        columns = view.columns
+        shortage = np.maximum(0, columns.required - columns.assigned)
+        return float((shortage * columns.complexity)[~columns.is_rest].sum())
+    
+    def violates(self, schedule: Schedule, view: Optional[ScheduleView] = None) -> bool:
         for shift in schedule.shifts:
             if shift.shift_type == ShiftType.REST:
                 continue
             
             shortage = max(0, shift.required_nurses - len(shift.assigned_nurses))
-            total_violation += shortage * shift.complexity_score
+            if shortage * shift.complexity_score > 0:
+                return True
         
-        return total_violation
+        return False
+    
+    def delta(self, schedule: Schedule, view: ScheduleView, nurse_id: str,
+              new_rotations: List[Rotation]) -> float:
+        total_delta = 0.0
+        for shift, assigned in _assignment_changes(view, nurse_id, new_rotations):
+            occurrences = view.shift_counts.get(id(shift), 0)
+            if not occurrences or shift.shift_type == ShiftType.REST:
+                continue
+            
+            count = len(shift.assigned_nurses)
+            if assigned:
+                new_count = count + 1
+            else:
+                new_count = count - shift.assigned_nurses.count(nurse_id)
+            
+            old_shortage = max(0, shift.required_nurses - count)
+            new_shortage = max(0, shift.required_nurses - new_count)
+            total_delta += (new_shortage - old_shortage) * shift.complexity_score * occurrences
+        
+        return total_delta
     
-    def is_satisfied(self, schedule: Schedule) -> bool:
-        return self.evaluate(schedule) == 0
+    def is_satisfied(self, schedule: Schedule, view: Optional[ScheduleView] = None) -> bool:
+        return self.evaluate(schedule, view) == 0
 
 
 class SkillMixConstraint(Constraint):
     """Each shift must have appropriate skill mix"""
     
+    __slots__ = ()
+    
     def __init__(self, weight: float = 100.0, is_hard: bool = False):
         super().__init__(weight, is_hard)
     
-    def evaluate(self, schedule: Schedule) -> float:
+    def evaluate(self, schedule: Schedule, view: Optional[ScheduleView] = None) -> float:
+        if view is None:
+            view = ScheduleView.build(schedule)
         total_violation = 0.0
-        nurse_dict = {n.id: n for n in schedule.nurses}
         
         for shift in schedule.shifts:
-            if shift.shift_type == ShiftType.REST or not shift.required_skills:
+            total_violation += self._shift_violation(shift, shift.assigned_nurses,
+                                                     view.nurses_by_id)
+        
+        return total_violation
+    
+    def violates(self, schedule: Schedule, view: Optional[ScheduleView] = None) -> bool:
+        if view is None:
+            view = ScheduleView.build(schedule)
+        return any(
+            self._shift_violation(shift, shift.assigned_nurses, view.nurses_by_id) > 0
+            for shift in schedule.shifts
+        )
+    
+    def _shift_violation(self, shift: Shift, assigned_nurses: List[str],
+                         nurse_dict: Dict[str, Nurse]) -> float:
+        """Number of required skills missing from the assigned nurses"""
+        if shift.shift_type == ShiftType.REST or not shift.required_skills:
+            return 0.0
+        
+        assigned_skills = {
+            nurse_dict[nid].skill_level 
+            for nid in assigned_nurses 
+            if nid in nurse_dict
+        }
+        
+        # Check if required skills are present
+        return float(sum(
+            1 for required_skill in shift.required_skills
+            if required_skill not in assigned_skills
+        ))
+    
+    def delta(self, schedule: Schedule, view: ScheduleView, nurse_id: str,
+              new_rotations: List[Rotation]) -> float:
+        nurse_dict = view.nurses_by_id
+        total_delta = 0.0
+        
+        for shift, assigned in _assignment_changes(view, nurse_id, new_rotations):
+            occurrences = view.shift_counts.get(id(shift), 0)
+            if not occurrences:
                 continue
             
-            assigned_skills = [
-                nurse_dict[nid].skill_level 
-                for nid in shift.assigned_nurses 
-                if nid in nurse_dict
-            ]
+            if assigned:
+                new_assigned = shift.assigned_nurses + [nurse_id]
+            else:
+                new_assigned = [nid for nid in shift.assigned_nurses if nid != nurse_id]
             
-            # Check if required skills are present
-            for required_skill in shift.required_skills:
-                if required_skill not in assigned_skills:
-                    total_violation += 1
+            total_delta += occurrences * (
+                self._shift_violation(shift, new_assigned, nurse_dict)
+                - self._shift_violation(shift, shift.assigned_nurses, nurse_dict)
+            )
         
-        return total_violation
+        return total_delta
     
-    def is_satisfied(self, schedule: Schedule) -> bool:
-        return self.evaluate(schedule) == 0
+    def is_satisfied(self, schedule: Schedule, view: Optional[ScheduleView] = None) -> bool:
+        return self.evaluate(schedule, view) == 0
 
 
 class PreferenceConstraint(Constraint):
     """Soft constraint for nurse preferences"""
     
+    __slots__ = ()
+    
     def __init__(self, weight: float = 10.0, is_hard: bool = False):
         super().__init__(weight, is_hard)
     
-    def evaluate(self, schedule: Schedule) -> float:
+    def evaluate(self, schedule: Schedule, view: Optional[ScheduleView] = None) -> float:
+        if view is None:
+            view = ScheduleView.build(schedule)
         total_violation = 0.0
-        nurse_dict = {n.id: n for n in schedule.nurses}
         
         for rotation in schedule.rotations:
-            nurse = nurse_dict.get(rotation.nurse_id)
+            nurse = view.nurses_by_id.get(rotation.nurse_id)
             if not nurse:
                 continue
             
-            for shift in rotation.shifts:
-                # Avoided shifts
-                if shift.shift_type in nurse.preferences.avoided_shifts:
-                    total_violation += 3
-                
-                # Not preferred shifts
-                if nurse.preferences.preferred_shifts and \
-                   shift.shift_type not in nurse.preferences.preferred_shifts:
-                    total_violation += 1
-                
-                # Night shift limits
-                night_shifts = sum(
-                    1 for s in rotation.shifts 
-                    if s.shift_type == ShiftType.NIGHT
-                )
-                if night_shifts > nurse.preferences.max_night_shifts_per_week:
-                    total_violation += (night_shifts - nurse.preferences.max_night_shifts_per_week)
+            total_violation += self._rotation_violation(nurse, rotation)
         
         return total_violation
     
-    def is_satisfied(self, schedule: Schedule) -> bool:
+    def _rotation_violation(self, nurse: Nurse, rotation: Rotation) -> float:
+        """Preference violation of a single rotation"""
+        violation = 0.0
+        
+        # Night shift limits (counted once per rotation)
+        night_shifts = sum(
+            1 for s in rotation.shifts 
+            if s.shift_type == ShiftType.NIGHT
+        )
+        if night_shifts > nurse.preferences.max_night_shifts_per_week:
+            violation += (night_shifts - nurse.preferences.max_night_shifts_per_week)
+        
+        avoided_mask = nurse.preferences.avoided_mask
+        not_preferred_mask = nurse.preferences.not_preferred_mask
+        for shift in rotation.shifts:
+            bit = 1 << _SHIFT_TYPE_INDEX[shift.shift_type]
+            
+            # Avoided shifts
+            if avoided_mask & bit:
+                violation += 3
+            
+            # Not preferred shifts
+            if not_preferred_mask & bit:
+                violation += 1
+        
+        return violation
+    
+    def delta(self, schedule: Schedule, view: ScheduleView, nurse_id: str,
+              new_rotations: List[Rotation]) -> float:
+        nurse = view.nurses_by_id[nurse_id]
+        old = sum(self._rotation_violation(nurse, r) for r in view.rotations_by_nurse[nurse_id])
+        new = sum(self._rotation_violation(nurse, r) for r in new_rotations)
+        return float(new - old)
+    
+    def is_satisfied(self, schedule: Schedule, view: Optional[ScheduleView] = None) -> bool:
         # Soft constraint, always "satisfied" but with penalty
         return True
 
@@ -253,21 +615,21 @@ class PreferenceConstraint(Constraint):
 class FridayOffConstraint(Constraint):
     """Preference for Friday off (Jumu'ah prayer) - Egyptian specific"""
     
+    __slots__ = ()
+    
     def __init__(self, weight: float = 20.0, is_hard: bool = False):
         super().__init__(weight, is_hard)
     
-    def evaluate(self, schedule: Schedule) -> float:
+    def evaluate(self, schedule: Schedule, view: Optional[ScheduleView] = None) -> float:
+        if view is None:
+            view = ScheduleView.build(schedule)
         total_violation = 0.0
-        nurse_dict = {n.id: n for n in schedule.nurses}
         
         for nurse in schedule.nurses:
             if not nurse.preferences.prefer_friday_off:
                 continue
             
-            nurse_shifts = []
-            for rotation in schedule.rotations:
-                if rotation.nurse_id == nurse.id:
-                    nurse_shifts.extend(rotation.shifts)
+            nurse_shifts = view.shifts_by_nurse[nurse.id]
             
             # Check Fridays
             friday_shifts = [
@@ -279,75 +641,143 @@ class FridayOffConstraint(Constraint):
         
         return total_violation
     
-    def is_satisfied(self, schedule: Schedule) -> bool:
+    def _evaluate_fused(self, schedule: Schedule, view: ScheduleView,
+                        stats: np.ndarray) -> float:
+        nurses_by_id = view.nurses_by_id
+        prefers_off = np.array([
+            nurses_by_id[nurse_id].preferences.prefer_friday_off
+            for nurse_id in view.shifts_by_nurse
+        ], dtype=bool)
+        return float(stats[prefers_off, kernels.FUSED_FRIDAYS].sum())
+    
+    def delta(self, schedule: Schedule, view: ScheduleView, nurse_id: str,
+              new_rotations: List[Rotation]) -> float:
+        if not view.nurses_by_id[nurse_id].preferences.prefer_friday_off:
+            return 0.0
+        
+        old = sum(1 for s in view.shifts_by_nurse[nurse_id] if s.date.weekday() == 4)
+        new = sum(1 for s in _sorted_shifts(new_rotations) if s.date.weekday() == 4)
+        return float(new - old)
+    
+    def is_satisfied(self, schedule: Schedule, view: Optional[ScheduleView] = None) -> bool:
         return True  # Soft constraint
 
 
 class RamadanConstraint(Constraint):
     """Ramadan-specific scheduling constraints - Egyptian specific"""
     
+    __slots__ = ("ramadan_start", "ramadan_end")
+    
     def __init__(self, ramadan_start: datetime, ramadan_end: datetime, 
                  weight: float = 15.0, is_hard: bool = False):
         super().__init__(weight, is_hard)
         self.ramadan_start = ramadan_start
         self.ramadan_end = ramadan_end
     
-    def evaluate(self, schedule: Schedule) -> float:
+    def evaluate(self, schedule: Schedule, view: Optional[ScheduleView] = None) -> float:
+        if view is None:
+            view = ScheduleView.build(schedule)
         total_violation = 0.0
-        nurse_dict = {n.id: n for n in schedule.nurses}
         
         for rotation in schedule.rotations:
-            nurse = nurse_dict.get(rotation.nurse_id)
+            nurse = view.nurses_by_id.get(rotation.nurse_id)
             if not nurse:
                 continue
             
             for shift in rotation.shifts:
-                # Check if shift is during Ramadan
-                if self.ramadan_start <= shift.date <= self.ramadan_end:
-                    # Prefer no night shifts during Ramadan
-                    if nurse.preferences.avoid_night_shifts_ramadan and \
-                       shift.shift_type == ShiftType.NIGHT:
-                        total_violation += 2
-                    
-                    # Reduced hours preference
-                    if nurse.preferences.ramadan_reduced_hours:
-                        if shift.get_duration_hours() > 6:
-                            total_violation += 1
+                total_violation += self._shift_violation(nurse, shift)
         
         return total_violation
     
-    def is_satisfied(self, schedule: Schedule) -> bool:
+    def _shift_violation(self, nurse: Nurse, shift: Shift) -> float:
+        """Ramadan preference violation of a single shift"""
+        violation = 0.0
+        
+        # Check if shift is during Ramadan
+        if self.ramadan_start <= shift.date <= self.ramadan_end:
+            # Prefer no night shifts during Ramadan
+            if nurse.preferences.avoid_night_shifts_ramadan and \
+               shift.shift_type == ShiftType.NIGHT:
+                violation += 2
+            
+            # Reduced hours preference
+            if nurse.preferences.ramadan_reduced_hours:
+                if shift.get_duration_hours() > 6:
+                    violation += 1
+        
+        return violation
+    
+    def delta(self, schedule: Schedule, view: ScheduleView, nurse_id: str,
+              new_rotations: List[Rotation]) -> float:
+        nurse = view.nurses_by_id[nurse_id]
+        old = sum(self._shift_violation(nurse, s) for s in view.shifts_by_nurse[nurse_id])
+        new = sum(self._shift_violation(nurse, s) for s in _sorted_shifts(new_rotations))
+        return float(new - old)
+    
+    def _evaluate_fused(self, schedule: Schedule, view: ScheduleView,
+                        stats: np.ndarray) -> float:
+        total_violation = 0.0
+        for n, nurse_id in enumerate(view.shifts_by_nurse):
+            prefs = view.nurses_by_id[nurse_id].preferences
+            if prefs.avoid_night_shifts_ramadan:
+                total_violation += 2 * stats[n, kernels.FUSED_RAMADAN_NIGHTS]
+            if prefs.ramadan_reduced_hours:
+                total_violation += stats[n, kernels.FUSED_RAMADAN_LONG]
+        return float(total_violation)
+    
+    def is_satisfied(self, schedule: Schedule, view: Optional[ScheduleView] = None) -> bool:
         return True  # Soft constraint
 
 
 class FairnessConstraint(Constraint):
     """Ensure fair distribution of workload and undesirable shifts"""
     
+    __slots__ = ()
+    
     def __init__(self, weight: float = 25.0, is_hard: bool = False):
         super().__init__(weight, is_hard)
     
-    def evaluate(self, schedule: Schedule) -> float:
-        # Calculate workload variance
-        nurse_hours = {}
+    def evaluate(self, schedule: Schedule, view: Optional[ScheduleView] = None) -> float:
+        if view is None:
+            view = ScheduleView.build(schedule)
         
-        for nurse in schedule.nurses:
-            total_hours = 0.0
-            for rotation in schedule.rotations:
-                if rotation.nurse_id == nurse.id:
-                    total_hours += rotation.get_total_hours()
-            nurse_hours[nurse.id] = total_hours
+        # Calculate workload variance (penalize unfair distribution)
+        return self._spread(
+            sum(rotation.get_total_hours() for rotation in rotations)
+            for rotations in view.rotations_by_nurse.values()
+        )
+    
+    def _evaluate_fused(self, schedule: Schedule, view: ScheduleView,
+                        stats: np.ndarray) -> float:
+        return self._spread(stats[:, kernels.FUSED_HOURS].tolist())
+    
+    @staticmethod
+    def _spread(hours: Iterable[float]) -> float:
+        """
+        Coefficient of variation of per-nurse hours, in percent.
+        Single Welford pass; cheaper than np.mean/np.std for ward-sized inputs.
+        """
+        n = 0
+        mean = 0.0
+        m2 = 0.0
+        for h in hours:
+            n += 1
+            delta = h - mean
+            mean += delta / n
+            m2 += delta * (h - mean)
         
-        if not nurse_hours:
+        if n == 0:
             return 0.0
-        
-        hours_list = list(nurse_hours.values())
-        mean_hours = np.mean(hours_list)
-        std_hours = np.std(hours_list)
-        
-        # Penalize high variance (unfair distribution)
-        return std_hours / (mean_hours + 1e-6) * 100
+        return math.sqrt(m2 / n) / (mean + 1e-6) * 100
     
-    def is_satisfied(self, schedule: Schedule) -> bool:
+    def delta(self, schedule: Schedule, view: ScheduleView, nurse_id: str,
+              new_rotations: List[Rotation]) -> float:
+        hours = view.nurse_hours.tolist()
+        new_hours = list(hours)
+        new_hours[view.nurse_position(nurse_id)] = sum(r.get_total_hours() for r in new_rotations)
+        return self._spread(new_hours) - self._spread(hours)
+    
+    def is_satisfied(self, schedule: Schedule, view: Optional[ScheduleView] = None) -> bool:
         return True  # Soft constraint
 
 
@@ -387,41 +817,155 @@ class ConstraintEngine:
                 RamadanConstraint(ramadan_start, ramadan_end, weight=15.0, is_hard=False)
             )
     
-    def is_feasible(self, schedule: Schedule) -> bool:
+    def is_feasible(self, schedule: Schedule, view: Optional[ScheduleView] = None) -> bool:
         """Check if schedule satisfies all hard constraints"""
-        return all(c.is_satisfied(schedule) for c in self.hard_constraints)
+        if view is None:
+            view = ScheduleView.build(schedule)
+        return not any(c.violates(schedule, view) for c in self.hard_constraints)
+    
+    def _penalties(self, schedule: Schedule,
+                   view: Optional[ScheduleView] = None) -> Dict[Constraint, float]:
+        """Weighted penalty per constraint, building the view if needed"""
+        if view is None:
+            view = ScheduleView.build(schedule)
+        return self._fused_penalties(schedule, view)
+    
+    def _fused_penalties(self, schedule: Schedule,
+                         view: ScheduleView) -> Dict[Constraint, float]:
+        """
+        Weighted penalty per constraint.
+        
+        The per-nurse constraints are evaluated together in a single sweep
+        over the packed shifts; the rest fall back to their own evaluate.
+        When a constraint type is registered more than once, only the first
+        instance is fused.
+        """
+        constraints = self.hard_constraints + self.soft_constraints
+        fused: Dict[type, Constraint] = {}
+        for constraint in constraints:
+            if type(constraint) in _FUSED_TYPES and type(constraint) not in fused:
+                fused[type(constraint)] = constraint
+        
+        stats = self._fused_pass(schedule, view, fused) if fused else None
+        fused_constraints = set(fused.values())
+        
+        penalties: Dict[Constraint, float] = {}
+        for constraint in constraints:
+            if constraint in fused_constraints:
+                penalties[constraint] = constraint.weight * constraint._evaluate_fused(
+                    schedule, view, stats
+                )
+            else:
+                penalties[constraint] = constraint.get_penalty(schedule, view)
+        
+        return penalties
     
-    def evaluate_hard_constraints(self, schedule: Schedule) -> float:
+    def _fused_pass(self, schedule: Schedule, view: ScheduleView,
+                    fused: Dict[type, Constraint]) -> np.ndarray:
+        """Run the fused kernel with the parameters of the fused constraints"""
+        packed = view.packed
+        
+        consecutive = fused.get(MaxConsecutiveDaysConstraint)
+        rest = fused.get(MinRestPeriodConstraint)
+        weekly = fused.get(MaxWeeklyHoursConstraint)
+        ramadan = fused.get(RamadanConstraint)
+        
+        if ramadan is not None:
+            ramadan_start_us = _absolute_us(ramadan.ramadan_start)
+            ramadan_end_us = _absolute_us(ramadan.ramadan_end)
+        else:
+            ramadan_start_us, ramadan_end_us = 1, 0  # Empty range
+        
+        return kernels.fused_nurse_pass(
+            packed.nurse_idx, packed.date_ord, packed.date_us,
+            packed.start_abs, packed.end_abs, packed.duration_min,
+            packed.week, packed.is_night, packed.n_nurses,
+            consecutive.max_days if consecutive else np.iinfo(np.int64).max,
+            float(rest.min_hours) if rest else -np.inf,
+            float(weekly.max_hours) if weekly else np.inf,
+            ramadan_start_us, ramadan_end_us
+        )
+    
+    def delta_evaluate(self, schedule: Schedule, nurse_id: str, new_rotation: Rotation,
+                       view: Optional[ScheduleView] = None) -> float:
+        """
+        Change in total penalty if nurse_id's rotations were replaced by
+        new_rotation, with shift assignments updated to match.
+        
+        Only the affected nurse and the shifts whose assignment flips are
+        re-evaluated, so the cost scales with the column, not the schedule.
+        Pass the same view across calls on an unchanged schedule.
+        """
+        if view is None:
+            view = ScheduleView.build(schedule)
+        
+        new_rotations = [new_rotation]
+        return sum(
+            constraint.weight * constraint.delta(schedule, view, nurse_id, new_rotations)
+            for constraint in self.hard_constraints + self.soft_constraints
+        )
+    
+    def evaluate_fused(self, schedule: Schedule,
+                       view: Optional[ScheduleView] = None) -> Dict[str, float]:
+        """Get weighted penalty per constraint name from a single fused pass"""
+        result: Dict[str, float] = {}
+        for constraint, penalty in self._penalties(schedule, view).items():
+            name = constraint.__class__.__name__
+            result[name] = result.get(name, 0.0) + penalty
+        return result
+    
+    def evaluate_hard_constraints(self, schedule: Schedule,
+                                  view: Optional[ScheduleView] = None) -> float:
         """Get total penalty from hard constraint violations"""
-        return sum(c.get_penalty(schedule) for c in self.hard_constraints)
+        penalties = self._penalties(schedule, view)
+        return sum(penalties[c] for c in self.hard_constraints)
     
-    def evaluate_soft_constraints(self, schedule: Schedule) -> float:
+    def evaluate_soft_constraints(self, schedule: Schedule,
+                                  view: Optional[ScheduleView] = None) -> float:
         """Get total penalty from soft constraint violations"""
-        return sum(c.get_penalty(schedule) for c in self.soft_constraints)
+        penalties = self._penalties(schedule, view)
+        return sum(penalties[c] for c in self.soft_constraints)
     
-    def evaluate_total(self, schedule: Schedule) -> float:
+    def evaluate_total(self, schedule: Schedule, view: Optional[ScheduleView] = None) -> float:
         """Get total constraint penalty"""
-        return (self.evaluate_hard_constraints(schedule) + 
-                self.evaluate_soft_constraints(schedule))
+        return sum(self._penalties(schedule, view).values())
     
-    def get_constraint_violations(self, schedule: Schedule) -> Dict[str, float]:
+    def get_constraint_violations(self, schedule: Schedule,
+                                  view: Optional[ScheduleView] = None) -> Dict[str, float]:
         """Get detailed breakdown of constraint violations"""
-        violations = {}
-        
-        for constraint in self.hard_constraints + self.soft_constraints:
-            constraint_name = constraint.__class__.__name__
-            penalty = constraint.get_penalty(schedule)
-            if penalty > 0:
-                violations[constraint_name] = penalty
-        
-        return violations
+        return {
+            name: penalty
+            for name, penalty in self.evaluate_fused(schedule, view).items()
+            if penalty > 0
+        }
     
     def get_metrics(self, schedule: Schedule) -> Dict:
         """Get comprehensive constraint metrics"""
+        view = ScheduleView.build(schedule)
+        penalties = self._penalties(schedule, view)
+        hard_penalty = sum(penalties[c] for c in self.hard_constraints)
+        soft_penalty = sum(penalties[c] for c in self.soft_constraints)
+        
+        violations = {}
+        for constraint, penalty in penalties.items():
+            name = constraint.__class__.__name__
+            violations[name] = violations.get(name, 0.0) + penalty
+        
         return {
-            "is_feasible": self.is_feasible(schedule),
-            "hard_constraint_penalty": self.evaluate_hard_constraints(schedule),
-            "soft_constraint_penalty": self.evaluate_soft_constraints(schedule),
-            "total_penalty": self.evaluate_total(schedule),
-            "constraint_violations": self.get_constraint_violations(schedule)
+            "is_feasible": self.is_feasible(schedule, view),
+            "hard_constraint_penalty": hard_penalty,
+            "soft_constraint_penalty": soft_penalty,
+            "total_penalty": hard_penalty + soft_penalty,
+            "constraint_violations": {k: v for k, v in violations.items() if v > 0}
         }
+
+
+# Constraints evaluated by ConstraintEngine's fused per-nurse pass
+_FUSED_TYPES = (
+    MaxConsecutiveDaysConstraint,
+    MinRestPeriodConstraint,
+    MaxWeeklyHoursConstraint,
+    FridayOffConstraint,
+    RamadanConstraint,
+    FairnessConstraint,
+)
\ No newline at end of file
@@ -5,27 +5,81 @@ Designed for Egyptian healthcare context.
 
 from dataclasses import dataclass, field
 from datetime import datetime, time, timedelta
-from enum import Enum
-from typing import List, Dict, Optional, Set
+from enum import Enum, IntEnum
+from typing import List, Dict, Optional, Set, Tuple
+import sys
 import numpy as np
 
 
-class ShiftType(Enum):
+class ShiftType(IntEnum):
     """Shift types common in Egyptian hospitals"""
-    MORNING = "morning"      # 7:00 - 15:00
-    AFTERNOON = "afternoon"  # 15:00 - 23:00
-    NIGHT = "night"         # 23:00 - 7:00
-    EXTENDED = "extended"    # 12-hour shifts
-    REST = "rest"           # Day off
+    MORNING = 0      # 7:00 - 15:00
+    AFTERNOON = 1    # 15:00 - 23:00
+    NIGHT = 2        # 23:00 - 7:00
+    EXTENDED = 3     # 12-hour shifts
+    REST = 4         # Day off
+    
+    @property
+    def label(self) -> str:
+        """String form used in ids, config and reports (e.g. "morning")"""
+        return self.name.lower()
+
+
+# Standard shift hours used by SchedulingProblem.generate_shifts
+_STANDARD_SHIFT_TIMES = {
+    ShiftType.MORNING: (time(7, 0), time(15, 0)),
+    ShiftType.AFTERNOON: (time(15, 0), time(23, 0)),
+    ShiftType.NIGHT: (time(23, 0), time(7, 0)),
+    ShiftType.EXTENDED: (time(7, 0), time(19, 0)),
+}
+
+# Durations of the standard shifts, so they skip the time arithmetic
+_SHIFT_DURATION_HOURS = {
+    ShiftType.MORNING: 8.0,
+    ShiftType.AFTERNOON: 8.0,
+    ShiftType.NIGHT: 8.0,
+    ShiftType.EXTENDED: 12.0,
+    ShiftType.REST: 0.0,
+}
+
+# Column index of each shift type in the per-type lookup tables (and bit
+# position in the preference masks); equal to the IntEnum value
+_SHIFT_TYPE_INDEX = {shift_type: int(shift_type) for shift_type in ShiftType}
+
+# Mask with every shift type's bit set
+_ALL_SHIFT_TYPES_MASK = (1 << len(ShiftType)) - 1
+
 
+def _shift_mask(shift_types) -> int:
+    """Bitmask with bit _SHIFT_TYPE_INDEX[t] set for each given shift type"""
+    mask = 0
+    for shift_type in shift_types:
+        mask |= 1 << _SHIFT_TYPE_INDEX[shift_type]
+    return mask
 
-class SkillLevel(Enum):
+
+class SkillLevel(IntEnum):
     """Nurse skill levels per Egyptian Medical Syndicate"""
-    JUNIOR = "junior"           # < 2 years experience
-    INTERMEDIATE = "intermediate"  # 2-5 years
-    SENIOR = "senior"           # 5-10 years
-    SPECIALIST = "specialist"   # > 10 years or specialized
-    HEAD_NURSE = "head_nurse"   # Supervisory
+    JUNIOR = 0          # < 2 years experience
+    INTERMEDIATE = 1    # 2-5 years
+    SENIOR = 2          # 5-10 years
+    SPECIALIST = 3      # > 10 years or specialized
+    HEAD_NURSE = 4      # Supervisory
+    
+    @property
+    def label(self) -> str:
+        """String form used in config and reports (e.g. "head_nurse")"""
+        return self.name.lower()
+
+
+# Workload multiplier per skill level (see Nurse.get_skill_multiplier)
+_SKILL_MULTIPLIERS = {
+    SkillLevel.JUNIOR: 0.8,
+    SkillLevel.INTERMEDIATE: 1.0,
+    SkillLevel.SENIOR: 1.2,
+    SkillLevel.SPECIALIST: 1.3,
+    SkillLevel.HEAD_NURSE: 1.5
+}
 
 
 class ContractType(Enum):
@@ -36,7 +90,7 @@ class ContractType(Enum):
     ON_CALL = "on_call"
 
 
-@dataclass
+@dataclass(slots=True)
 class NursePreferences:
     """Nurse scheduling preferences"""
     preferred_shifts: List[ShiftType] = field(default_factory=list)
@@ -54,9 +108,29 @@ class NursePreferences:
     has_childcare_constraints: bool = False
     prefers_morning: bool = False
     max_night_shifts_per_week: int = 3
+    
+    # Bitmask views of preferred_shifts/avoided_shifts (bit = _SHIFT_TYPE_INDEX),
+    # derived on every read so in-place list edits are always seen
+    @property
+    def preferred_mask(self) -> int:
+        """Preferred shift types as a bitmask"""
+        return _shift_mask(self.preferred_shifts)
+    
+    @property
+    def avoided_mask(self) -> int:
+        """Avoided shift types as a bitmask"""
+        return _shift_mask(self.avoided_shifts)
+    
+    @property
+    def not_preferred_mask(self) -> int:
+        """Shift types outside a non-empty preferred list"""
+        preferred_mask = self.preferred_mask
+        if not preferred_mask:
+            return 0
+        return _ALL_SHIFT_TYPES_MASK & ~preferred_mask
 
 
-@dataclass
+@dataclass(slots=True)
 class Nurse:
     """Nurse entity with Egyptian healthcare context"""
     id: str
@@ -85,29 +159,51 @@ class Nurse:
     unavailable_dates: Set[datetime] = field(default_factory=set)
     vacation_dates: Set[datetime] = field(default_factory=set)
     
+    def _blocked_days(self) -> Set[int]:
+        """Day ordinals of every unavailable or vacation date"""
+        return {d.toordinal() for d in self.unavailable_dates} | {d.toordinal() for d in self.vacation_dates}
+    
     def is_available(self, date: datetime) -> bool:
-        """Check if nurse is available on a specific date"""
-        return date not in self.unavailable_dates and date not in self.vacation_dates
+        """Check if nurse is available on a specific date (day granularity)"""
+        ordinal = date.toordinal()
+        return not (any(d.toordinal() == ordinal for d in self.unavailable_dates)
+                    or any(d.toordinal() == ordinal for d in self.vacation_dates))
+    
+    def is_available_on(self, day_ordinals: np.ndarray) -> np.ndarray:
+        """is_available for an array of day ordinals"""
+        if not self.unavailable_dates and not self.vacation_dates:
+            return np.ones(len(day_ordinals), dtype=bool)
+        blocked = np.fromiter(self._blocked_days(), dtype=np.int64)
+        return np.isin(day_ordinals, blocked, invert=True)
     
     def can_work_shift(self, shift_type: ShiftType) -> bool:
         """Check if nurse can work a specific shift type"""
-        if shift_type in self.preferences.avoided_shifts:
+        if (self.preferences.avoided_mask >> _SHIFT_TYPE_INDEX[shift_type]) & 1:
             return False
         return True
     
     def get_skill_multiplier(self) -> float:
         """Get skill level multiplier for workload calculation"""
-        multipliers = {
-            SkillLevel.JUNIOR: 0.8,
-            SkillLevel.INTERMEDIATE: 1.0,
-            SkillLevel.SENIOR: 1.2,
-            SkillLevel.SPECIALIST: 1.3,
-            SkillLevel.HEAD_NURSE: 1.5
-        }
-        return multipliers.get(self.skill_level, 1.0)
+        return _SKILL_MULTIPLIERS.get(self.skill_level, 1.0)
+    
+    def get_cost_profile(self) -> Tuple:
+        """Every nurse field Rotation.get_cost depends on, as a hashable key"""
+        prefs = self.preferences
+        return (self.max_hours_per_week, self.max_consecutive_days, self.fatigue_score,
+                prefs.preferred_mask, prefs.avoided_mask, prefs.max_night_shifts_per_week)
+    
+    @property
+    def has_default_cost_profile(self) -> bool:
+        """
+        True when the nurse has no fatigue and no shift-type preferences,
+        so rotation costs reduce to the overtime, length and night terms.
+        """
+        prefs = self.preferences
+        return (self.fatigue_score == 0
+                and not prefs.preferred_mask and not prefs.avoided_mask)
 
 
-@dataclass
+@dataclass(slots=True)
 class Shift:
     """Work shift definition"""
     id: str
@@ -128,19 +224,35 @@ class Shift:
     # Assigned nurses
     assigned_nurses: List[str] = field(default_factory=list)  # Nurse IDs
     
-    def get_duration_hours(self) -> float:
+    # Derived from shift_type/start_time/end_time in __post_init__
+    duration_hours: float = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        self.duration_hours = self._compute_duration_hours()
+    
+    def _compute_duration_hours(self) -> float:
         """Calculate shift duration in hours"""
         if self.shift_type == ShiftType.REST:
             return 0.0
         
-        # Handle shifts crossing midnight
-        start = datetime.combine(datetime.today(), self.start_time)
-        end = datetime.combine(datetime.today(), self.end_time)
+        if _STANDARD_SHIFT_TIMES.get(self.shift_type) == (self.start_time, self.end_time):
+            return _SHIFT_DURATION_HOURS[self.shift_type]
         
+        # Non-standard hours: seconds since midnight, without building datetime objects
+        start = (self.start_time.hour * 3600 + self.start_time.minute * 60
+                 + self.start_time.second + self.start_time.microsecond / 1e6)
+        end = (self.end_time.hour * 3600 + self.end_time.minute * 60
+               + self.end_time.second + self.end_time.microsecond / 1e6)
+        
+        # Handle shifts crossing midnight
         if end < start:
-            end += timedelta(days=1)
+            end += 86400
         
-        return (end - start).total_seconds() / 3600
+        return (end - start) / 3600
+    
+    def get_duration_hours(self) -> float:
+        """Shift duration in hours (precomputed on construction)"""
+        return self.duration_hours
     
     def is_fully_staffed(self) -> bool:
         """Check if shift has enough nurses assigned"""
@@ -155,7 +267,7 @@ class Shift:
         return shortage * self.complexity_score * 100  # High penalty
 
 
-@dataclass
+@dataclass(slots=True)
 class Rotation:
     """
     A rotation is a sequence of consecutive working days for a nurse.
@@ -164,9 +276,67 @@ class Rotation:
     nurse_id: str
     shifts: List[Shift] = field(default_factory=list)
     
+    # Memoized get_total_hours(), get_type_counts(), get_shift_ids() and
+    # the last get_cost() as (nurse cost profile, cost); reset when shifts changes
+    _total_hours_cache: Optional[float] = field(default=None, init=False, repr=False, compare=False)
+    _type_counts: Optional[np.ndarray] = field(default=None, init=False, repr=False, compare=False)
+    _shift_ids: Optional[Tuple[str, ...]] = field(default=None, init=False, repr=False, compare=False)
+    _cost_cache: Optional[Tuple[Tuple, float]] = field(default=None, init=False, repr=False, compare=False)
+    
+    def __setattr__(self, name, value):
+        object.__setattr__(self, name, value)
+        if name == 'shifts':
+            self.invalidate()
+    
+    def add_shift(self, shift: Shift):
+        """Append a shift, keeping cached totals in sync"""
+        self.shifts.append(shift)
+        object.__setattr__(self, '_total_hours_cache', None)
+        object.__setattr__(self, '_shift_ids', None)
+        object.__setattr__(self, '_cost_cache', None)
+        if self._type_counts is not None:
+            self._type_counts[_SHIFT_TYPE_INDEX[shift.shift_type]] += 1
+    
+    def remove_shift(self, shift: Shift):
+        """Remove a shift, keeping cached totals in sync"""
+        self.shifts.remove(shift)
+        object.__setattr__(self, '_total_hours_cache', None)
+        object.__setattr__(self, '_shift_ids', None)
+        object.__setattr__(self, '_cost_cache', None)
+        if self._type_counts is not None:
+            self._type_counts[_SHIFT_TYPE_INDEX[shift.shift_type]] -= 1
+    
+    def invalidate(self):
+        """
+        Drop cached totals. Call after mutating self.shifts in place
+        (reassigning the list is tracked automatically).
+        """
+        object.__setattr__(self, '_total_hours_cache', None)
+        object.__setattr__(self, '_type_counts', None)
+        object.__setattr__(self, '_shift_ids', None)
+        object.__setattr__(self, '_cost_cache', None)
+    
     def get_total_hours(self) -> float:
         """Get total hours in this rotation"""
-        return sum(shift.get_duration_hours() for shift in self.shifts)
+        if self._total_hours_cache is None:
+            self._total_hours_cache = sum(shift.get_duration_hours() for shift in self.shifts)
+        return self._total_hours_cache
+    
+    def get_type_counts(self) -> np.ndarray:
+        """Number of shifts of each type, indexed by _SHIFT_TYPE_INDEX"""
+        if self._type_counts is None:
+            self._type_counts = np.bincount(
+                np.fromiter((_SHIFT_TYPE_INDEX[s.shift_type] for s in self.shifts),
+                            dtype=np.int64, count=len(self.shifts)),
+                minlength=len(_SHIFT_TYPE_INDEX)
+            )
+        return self._type_counts
+    
+    def get_shift_ids(self) -> Tuple[str, ...]:
+        """Ids of the rotation's shifts, in rotation order"""
+        if self._shift_ids is None:
+            self._shift_ids = tuple(s.id for s in self.shifts)
+        return self._shift_ids
     
     def get_duration_days(self) -> int:
         """Get number of consecutive days worked"""
@@ -185,43 +355,82 @@ class Rotation:
         - Overtime
         - Fatigue
         - Constraint violations
+        
+        Evaluated by a compiled kernel over the rotation's cached per-type
+        shift counts and total hours and the nurse's preference bitmasks.
+        Nurses with a default cost profile take a shorter pure-Python path.
+        The result is kept until the shifts or the nurse's cost profile change.
         """
+        profile = nurse.get_cost_profile()
+        cached = self._cost_cache
+        if cached is not None and cached[0] == profile:
+            return cached[1]
+        
+        if nurse.has_default_cost_profile:
+            cost = self._get_cost_simple(nurse)
+        else:
+            cost = self._get_cost_kernel(nurse)
+        self._cost_cache = (profile, cost)
+        return cost
+    
+    def _get_cost_kernel(self, nurse: Nurse) -> float:
+        """get_cost through the compiled kernel"""
+        # Imported here so the numba compile/cache load is paid on first
+        # costing, not by every importer of the data models
+        from core import _cost_kernels
+        
+        prefs = nurse.preferences
+        return float(_cost_kernels.rotation_cost(
+            self.get_type_counts(), self.get_total_hours(), len(self.shifts),
+            float(nurse.max_hours_per_week),  # Simplified: rotation hours vs weekly limit
+            nurse.max_consecutive_days,
+            prefs.avoided_mask, prefs.not_preferred_mask,
+            _SHIFT_TYPE_INDEX[ShiftType.NIGHT],
+            prefs.max_night_shifts_per_week,
+            float(nurse.fatigue_score)
+        ))
+    
+    def _get_cost_simple(self, nurse: Nurse) -> float:
+        """get_cost for a nurse without fatigue or shift-type preferences"""
         cost = 0.0
         
-        # Base hours cost
+        # Overtime penalty
         total_hours = self.get_total_hours()
-        
-        # Overtime penalty (Egyptian labor law: 48h/week standard)
-        weekly_hours = total_hours  # Simplified
-        if weekly_hours > nurse.max_hours_per_week:
-            overtime = weekly_hours - nurse.max_hours_per_week
-            cost += overtime * 50  # Overtime penalty
+        if total_hours > nurse.max_hours_per_week:
+            cost += (total_hours - nurse.max_hours_per_week) * 50
         
         # Consecutive days penalty
-        if self.violates_max_consecutive(nurse.max_consecutive_days):
+        if len(self.shifts) > nurse.max_consecutive_days:
             cost += 200
         
-        # Shift preference penalties
-        for shift in self.shifts:
-            if shift.shift_type in nurse.preferences.avoided_shifts:
-                cost += 30
-            if shift.shift_type not in nurse.preferences.preferred_shifts and \
-               len(nurse.preferences.preferred_shifts) > 0:
-                cost += 10
-        
-        # Night shift penalties
-        night_shifts = sum(1 for s in self.shifts if s.shift_type == ShiftType.NIGHT)
-        if night_shifts > nurse.preferences.max_night_shifts_per_week:
-            cost += (night_shifts - nurse.preferences.max_night_shifts_per_week) * 40
-        
-        # Fatigue penalty (increases with existing fatigue)
-        fatigue_penalty = total_hours * nurse.fatigue_score * 10
-        cost += fatigue_penalty
+        # Night shift penalties (only possible with more shifts than the limit)
+        max_night = nurse.preferences.max_night_shifts_per_week
+        if len(self.shifts) > max_night:
+            nights = int(self.get_type_counts()[_SHIFT_TYPE_INDEX[ShiftType.NIGHT]])
+            if nights > max_night:
+                cost += (nights - max_night) * 40
         
         return cost
 
 
-@dataclass
+@dataclass(slots=True)
+class _ScheduleArrays:
+    """
+    Struct-of-arrays view of a schedule, used by the vectorized cost rollup.
+    Rotations of unknown nurses are left out.
+    """
+    nurse_ids: List[str]            # Row order of the per-nurse tables
+    rotation_nurse: np.ndarray      # Nurse row per rotation
+    rotation_length: np.ndarray     # Shifts per rotation
+    shift_rotation: np.ndarray      # Rotation index per rotation shift
+    shift_hours: np.ndarray         # Duration per rotation shift
+    shift_type: np.ndarray          # _SHIFT_TYPE_INDEX per rotation shift
+    required: np.ndarray            # Per schedule shift
+    assigned: np.ndarray            # Per schedule shift
+    complexity: np.ndarray          # Per schedule shift
+
+
+@dataclass(slots=True)
 class Schedule:
     """Complete nurse schedule for a planning horizon"""
     start_date: datetime
@@ -235,21 +444,110 @@ class Schedule:
     department: str = ""
     created_at: datetime = field(default_factory=datetime.now)
     
+    # Nurse lookups built by _nurse_maps(): id -> Nurse and id -> row index
+    _nurse_by_id: Dict[str, Nurse] = field(default_factory=dict, init=False, repr=False, compare=False)
+    _nurse_idx: Dict[str, int] = field(default_factory=dict, init=False, repr=False, compare=False)
+    _nurse_maps_key: Optional[tuple] = field(default=None, init=False, repr=False, compare=False)
+    
+    def _nurse_maps(self) -> Tuple[Dict[str, Nurse], Dict[str, int]]:
+        """
+        Nurse lookups shared by the cost, feasibility and metrics methods,
+        rebuilt whenever the nurse list or a nurse id changes.
+        
+        Returns:
+            (nurse by id, row index by id); with duplicate ids the last
+            nurse wins and the row is that of the first occurrence
+        """
+        key = tuple((id(n), n.id) for n in self.nurses)
+        if self._nurse_maps_key != key:
+            self._nurse_by_id = {n.id: n for n in self.nurses}
+            self._nurse_idx = {nurse_id: i for i, nurse_id in
+                               enumerate(dict.fromkeys(n.id for n in self.nurses))}
+            self._nurse_maps_key = key
+        return self._nurse_by_id, self._nurse_idx
+    
+    def _materialize(self) -> _ScheduleArrays:
+        """
+        Flatten rotations and shifts into arrays. Rebuilt on every call:
+        rotations, shifts and the nurse list can all be edited in place.
+        """
+        nurse_row = self._nurse_maps()[1]
+        rotations = [r for r in self.rotations if r.nurse_id in nurse_row]
+        rotation_shifts = [s for r in rotations for s in r.shifts]
+        rotation_length = np.fromiter((len(r.shifts) for r in rotations),
+                                      dtype=np.int64, count=len(rotations))
+        
+        arrays = _ScheduleArrays(
+            nurse_ids=list(nurse_row),
+            rotation_nurse=np.fromiter((nurse_row[r.nurse_id] for r in rotations),
+                                       dtype=np.int64, count=len(rotations)),
+            rotation_length=rotation_length,
+            shift_rotation=np.repeat(np.arange(len(rotations)), rotation_length),
+            shift_hours=np.fromiter((s.duration_hours for s in rotation_shifts),
+                                    dtype=np.float64, count=len(rotation_shifts)),
+            shift_type=np.fromiter((_SHIFT_TYPE_INDEX[s.shift_type] for s in rotation_shifts),
+                                   dtype=np.int8, count=len(rotation_shifts)),
+            required=np.fromiter((s.required_nurses for s in self.shifts),
+                                 dtype=np.int64, count=len(self.shifts)),
+            assigned=np.fromiter((len(s.assigned_nurses) for s in self.shifts),
+                                 dtype=np.int64, count=len(self.shifts)),
+            complexity=np.fromiter((s.complexity_score for s in self.shifts),
+                                   dtype=np.float64, count=len(self.shifts))
+        )
+        return arrays
+    
     def get_total_cost(self) -> float:
-        """Calculate total schedule cost"""
-        cost = 0.0
+        """
+        Calculate total schedule cost.
+        Same rollup as summing Rotation.get_cost and the per-shift
+        understaffing penalties, computed over the materialized arrays.
+        """
+        arrays = self._materialize()
+        nurse_dict = self._nurse_maps()[0]
+        nurses = [nurse_dict[nurse_id] for nurse_id in arrays.nurse_ids]
+        
+        # Per-nurse parameters and shift-type preference tables
+        max_hours = np.array([n.max_hours_per_week for n in nurses], dtype=np.float64)
+        max_consecutive = np.array([n.max_consecutive_days for n in nurses], dtype=np.int64)
+        max_nights = np.array([n.preferences.max_night_shifts_per_week for n in nurses],
+                              dtype=np.float64)
         
         # Rotation costs
-        nurse_dict = {n.id: n for n in self.nurses}
-        for rotation in self.rotations:
-            if rotation.nurse_id in nurse_dict:
-                cost += rotation.get_cost(nurse_dict[rotation.nurse_id])
+        n_rotations = len(arrays.rotation_nurse)
+        rows = arrays.rotation_nurse
+        hours = np.bincount(arrays.shift_rotation, weights=arrays.shift_hours,
+                            minlength=n_rotations)
+        nights = np.bincount(arrays.shift_rotation,
+                             weights=arrays.shift_type == _SHIFT_TYPE_INDEX[ShiftType.NIGHT],
+                             minlength=n_rotations)
+        
+        rotation_cost = (
+            np.maximum(0, hours - max_hours[rows]) * 50  # Overtime
+            + (arrays.rotation_length > max_consecutive[rows]) * 200
+            + np.maximum(0, nights - max_nights[rows]) * 40
+        )
+        
+        # Preference and fatigue terms are zero for default-profile nurses,
+        # so they are skipped when every nurse has that profile
+        if not all(n.has_default_cost_profile for n in nurses):
+            fatigue = np.array([n.fatigue_score for n in nurses], dtype=np.float64)
+            avoided = np.array([n.preferences.avoided_mask for n in nurses], dtype=np.int64)
+            not_preferred = np.array([n.preferences.not_preferred_mask for n in nurses],
+                                     dtype=np.int64)
+            type_bits = np.arange(len(_SHIFT_TYPE_INDEX))
+            type_penalty = (((avoided[:, None] >> type_bits) & 1) * 30
+                            + ((not_preferred[:, None] >> type_bits) & 1) * 10)
+            
+            preference = np.bincount(arrays.shift_rotation,
+                                     weights=type_penalty[rows[arrays.shift_rotation], arrays.shift_type],
+                                     minlength=n_rotations)
+            rotation_cost += preference + hours * fatigue[rows] * 10  # Fatigue
         
         # Understaffing penalties
-        for shift in self.shifts:
-            cost += shift.get_understaffing_penalty()
+        shortage = np.maximum(0, arrays.required - arrays.assigned)
+        understaffing = shortage * arrays.complexity * 100
         
-        return cost
+        return float(rotation_cost.sum() + understaffing.sum())
     
     def is_feasible(self) -> bool:
         """Check if schedule satisfies all hard constraints"""
@@ -258,74 +556,93 @@ class Schedule:
             if shift.shift_type != ShiftType.REST and not shift.is_fully_staffed():
                 return False
         
-        # Check nurse constraints
-        nurse_assignments = {n.id: [] for n in self.nurses}
+        # Group rotations by nurse; hours are memoized per rotation, so the
+        # max hours check is cheap and runs before any date work
+        nurse_idx = self._nurse_maps()[1]
+        nurse_rotations = [[] for _ in nurse_idx]
+        nurse_hours = [0.0] * len(nurse_idx)
         for rotation in self.rotations:
-            for shift in rotation.shifts:
-                nurse_assignments[rotation.nurse_id].append(shift)
+            row = nurse_idx[rotation.nurse_id]
+            nurse_rotations[row].append(rotation)
+            nurse_hours[row] += rotation.get_total_hours()
         
+        # Check max hours
         for nurse in self.nurses:
-            assignments = nurse_assignments[nurse.id]
-            
-            # Check max hours
-            total_hours = sum(s.get_duration_hours() for s in assignments)
-            if total_hours > nurse.max_hours_per_week * 4:  # 4 weeks
+            if nurse_hours[nurse_idx[nurse.id]] > nurse.max_hours_per_week * 4:  # 4 weeks
+                return False
+        
+        # Check rest periods, one nurse at a time
+        for nurse in self.nurses:
+            rotations = nurse_rotations[nurse_idx[nurse.id]]
+            if not rotations:
+                continue
+            dates = np.sort(np.array([s.date for r in rotations for s in r.shifts],
+                                     dtype='datetime64[us]'))
+            gaps_hours = np.diff(dates) / np.timedelta64(1, 'h')
+            if (gaps_hours < nurse.min_hours_between_shifts).any():
                 return False
-            
-            # Check rest periods
-            sorted_shifts = sorted(assignments, key=lambda s: s.date)
-            for i in range(len(sorted_shifts) - 1):
-                time_diff = (sorted_shifts[i+1].date - sorted_shifts[i].date).total_seconds() / 3600
-                if time_diff < nurse.min_hours_between_shifts:
-                    return False
         
         return True
     
-    def get_nurse_satisfaction(self) -> Dict[str, float]:
-        """Calculate satisfaction score for each nurse"""
-        satisfaction = {}
-        nurse_dict = {n.id: n for n in self.nurses}
+    def _compute_metrics_pass(self):
+        """
+        Walk the rotations once, accumulating per-nurse hours and
+        preference satisfaction together.
         
-        for nurse in self.nurses:
-            nurse_rotations = [r for r in self.rotations if r.nurse_id == nurse.id]
-            
-            if not nurse_rotations:
-                satisfaction[nurse.id] = 1.0
+        Returns:
+            (hours per nurse id, satisfaction per nurse id)
+        """
+        nurse_by_id = self._nurse_maps()[0]
+        hours = dict.fromkeys(nurse_by_id, 0.0)
+        shift_counts = dict.fromkeys(nurse_by_id, 0)
+        matches = dict.fromkeys(nurse_by_id, 0)
+        
+        for rotation in self.rotations:
+            nurse = nurse_by_id.get(rotation.nurse_id)
+            if nurse is None:
                 continue
             
-            # Calculate based on preference matching
-            total_shifts = sum(len(r.shifts) for r in nurse_rotations)
-            preference_matches = 0
-            
-            for rotation in nurse_rotations:
-                for shift in rotation.shifts:
-                    if shift.shift_type in nurse.preferences.preferred_shifts:
-                        preference_matches += 1
-            
-            if total_shifts > 0:
-                satisfaction[nurse.id] = preference_matches / total_shifts
-            else:
-                satisfaction[nurse.id] = 1.0
+            preferred_mask = nurse.preferences.preferred_mask
+            hours[nurse.id] += rotation.get_total_hours()
+            shift_counts[nurse.id] += len(rotation.shifts)
+            matches[nurse.id] += sum(
+                1 for shift in rotation.shifts
+                if (preferred_mask >> _SHIFT_TYPE_INDEX[shift.shift_type]) & 1
+            )
         
-        return satisfaction
+        # Calculate based on preference matching (no shifts = fully satisfied)
+        satisfaction = {
+            nurse_id: matches[nurse_id] / count if count > 0 else 1.0
+            for nurse_id, count in shift_counts.items()
+        }
+        
+        return hours, satisfaction
+    
+    def get_nurse_satisfaction(self) -> Dict[str, float]:
+        """Calculate satisfaction score for each nurse"""
+        return self._compute_metrics_pass()[1]
     
     def get_metrics(self) -> Dict:
         """Get comprehensive schedule metrics"""
+        hours, satisfaction = self._compute_metrics_pass()
+        
         return {
             "total_cost": self.get_total_cost(),
             "is_feasible": self.is_feasible(),
-            "nurse_satisfaction": np.mean(list(self.get_nurse_satisfaction().values())),
+            "nurse_satisfaction": (
+                sum(satisfaction.values()) / len(satisfaction) if satisfaction else float('nan')
+            ),
             "total_nurses": len(self.nurses),
             "total_shifts": len(self.shifts),
             "total_rotations": len(self.rotations),
-            "average_hours_per_nurse": np.mean([
-                sum(s.get_duration_hours() for r in self.rotations if r.nurse_id == n.id 
-                    for s in r.shifts) for n in self.nurses
-            ])
+            "average_hours_per_nurse": (
+                sum(hours[n.id] for n in self.nurses) / len(self.nurses)
+                if self.nurses else float('nan')
+            )
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class SchedulingProblem:
     """Complete scheduling problem definition"""
     nurses: List[Nurse]
@@ -335,45 +652,65 @@ class SchedulingProblem:
     
     # Demand (can be forecasted)
     daily_demand: Dict[ShiftType, int]  # Required nurses per shift type
+    # Per-day overrides: row = day offset from start_date, column = ShiftType
+    demand_array: Optional[np.ndarray] = None
     
     # Egyptian-specific
     ramadan_start: Optional[datetime] = None
     ramadan_end: Optional[datetime] = None
     public_holidays: List[datetime] = field(default_factory=list)
     
+    def get_demand_array(self) -> np.ndarray:
+        """
+        Required nurses per (day, ShiftType) over the planning horizon:
+        daily_demand, overridden by demand_array for the days it covers.
+        """
+        demand = np.empty((self.planning_horizon_days, len(ShiftType)), dtype=np.int32)
+        demand[:] = [self.daily_demand.get(t, 1) for t in ShiftType]
+        if self.demand_array is not None:
+            days = min(len(self.demand_array), self.planning_horizon_days)
+            demand[:days] = self.demand_array[:days]
+        return demand
+    
     def generate_shifts(self) -> List[Shift]:
         """Generate all shifts for the planning horizon"""
-        shifts = []
-        shift_times = {
-            ShiftType.MORNING: (time(7, 0), time(15, 0)),
-            ShiftType.AFTERNOON: (time(15, 0), time(23, 0)),
-            ShiftType.NIGHT: (time(23, 0), time(7, 0)),
-            ShiftType.EXTENDED: (time(7, 0), time(19, 0)),
-        }
+        # Per-type values hoisted out of the day loop
+        shift_types = [t for t in self.shifts_per_day if t != ShiftType.REST]
+        templates = [
+            (shift_type, *_STANDARD_SHIFT_TIMES[shift_type], f"_{shift_type.label}")
+            for shift_type in shift_types
+        ]
+        demand = self.get_demand_array().tolist()
         
-        for day in range(self.planning_horizon_days):
-            current_date = self.start_date + timedelta(days=day)
+        dates = [self.start_date + timedelta(days=day)
+                 for day in range(self.planning_horizon_days)]
+        if self.ramadan_start and self.ramadan_end:
+            in_ramadan = [self.ramadan_start <= d <= self.ramadan_end for d in dates]
+        else:
+            in_ramadan = [False] * len(dates)
+        
+        shifts: List[Shift] = [None] * (len(dates) * len(templates))
+        i = 0
+        for current_date, ramadan_day, day_demand in zip(dates, in_ramadan, demand):
+            date_str = current_date.date().isoformat()
             
-            for shift_type in self.shifts_per_day:
-                if shift_type == ShiftType.REST:
-                    continue
-                
-                start_time, end_time = shift_times[shift_type]
-                
+            for shift_type, start_time, end_time, id_suffix in templates:
+                # Interned so regenerated horizons share id strings and id
+                # comparisons/dict lookups hit the identity fast path
                 shift = Shift(
-                    id=f"{current_date.date()}_{shift_type.value}",
+                    id=sys.intern(date_str + id_suffix),
                     shift_type=shift_type,
                     start_time=start_time,
                     end_time=end_time,
                     date=current_date,
-                    required_nurses=self.daily_demand.get(shift_type, 1)
+                    required_nurses=day_demand[shift_type]
                 )
                 
                 # Adjust for Ramadan
-                if self.ramadan_start and self.ramadan_end:
-                    if self.ramadan_start <= current_date <= self.ramadan_end:
-                        shift.complexity_score = 1.2  # Higher complexity during Ramadan
+                if ramadan_day:
+                    shift.complexity_score = 1.2  # Higher complexity during Ramadan
                 
-                shifts.append(shift)
+                shifts[i] = shift
+                i += 1
         
         return shifts
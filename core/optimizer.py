@@ -4,20 +4,66 @@ Integrates demand forecasting, fatigue prediction, and RL-based branching.
 """
 
 import numpy as np
+from dataclasses import asdict
 from typing import List, Dict, Optional, Tuple
 from datetime import datetime, timedelta
+from bisect import bisect_left
 from pulp import *
+import scipy.sparse as sp
+from scipy.optimize import linprog
+import logging
+import sys
 import time
 
 from core.models import (
-    Nurse, Shift, Rotation, Schedule, SchedulingProblem,
-    ShiftType, SkillLevel
+    Nurse, NursePreferences, Shift, Rotation, Schedule, SchedulingProblem,
+    ShiftType, SkillLevel, _SHIFT_TYPE_INDEX
 )
 from core.constraints import ConstraintEngine
+from core import _rotation_kernels as rotation_kernels
 from ml.demand_forecaster import DemandForecaster
 from ml.fatigue_predictor import FatiguePredictor
 from ml.rl_agent import RLBranchingAgent, SchedulingEnvironment
 
+logger = logging.getLogger(__name__)
+
+
+def _verbosity_logger(verbose: Optional[bool]) -> logging.Logger:
+    """
+    Logger for one optimizer's verbose flag, so optimizers don't change
+    each other's output: True logs from DEBUG and False only warnings and
+    up, through a child of the module logger whose own level replaces the
+    module logger's; None uses the module logger as configured.
+    """
+    if verbose is None:
+        return logger
+    child = logger.getChild('verbose' if verbose else 'quiet')
+    child.setLevel(logging.DEBUG if verbose else logging.WARNING)
+    return child
+
+
+class _ColumnPool:
+    """
+    Every rotation generated during a solve, deduplicated by
+    AIEnhancedOptimizer._rotation_key, in the order they were added.
+    """
+    
+    def __init__(self):
+        self.rotations: List[Rotation] = []
+        self.keys: set = set()
+    
+    def __len__(self) -> int:
+        return len(self.rotations)
+    
+    def add(self, rotation: Rotation) -> bool:
+        """Add a rotation unless an identical one is pooled; True if added"""
+        key = AIEnhancedOptimizer._rotation_key(rotation)
+        if key in self.keys:
+            return False
+        self.keys.add(key)
+        self.rotations.append(rotation)
+        return True
+
 
 class AIEnhancedOptimizer:
     """
@@ -31,14 +77,18 @@ class AIEnhancedOptimizer:
     - Egyptian healthcare context awareness
     """
     
-    def __init__(self, use_ml: bool = True, use_rl: bool = False):
+    def __init__(self, use_ml: bool = True, use_rl: bool = False,
+                 verbose: Optional[bool] = None):
         """
         Args:
             use_ml: Enable ML features (demand forecasting, fatigue prediction)
             use_rl: Enable RL-based branching (requires trained agent)
+            verbose: Log progress including every iteration (True), only
+                warnings (False), or follow the module logger's configuration (None)
         """
         self.use_ml = use_ml
         self.use_rl = use_rl
+        self.logger = _verbosity_logger(verbose)
         
         # ML components
         self.demand_forecaster = DemandForecaster() if use_ml else None
@@ -48,6 +98,20 @@ class AIEnhancedOptimizer:
         # Constraint engine
         self.constraint_engine = ConstraintEngine()
         
+        # Re-solve the final master as an integer program with CBC, started
+        # from the rounded LP solution
+        self.integer_polish = True
+        
+        # Wentges dual smoothing weight on the stabilization center (0 = raw duals)
+        self.dual_smoothing = 0.5
+        
+        # Restricted master LP, kept across column generation iterations
+        self._reset_master_problem()
+        
+        # Per-nurse indices of workable shifts, see _build_availability()
+        self._availability_shifts: Optional[List[Shift]] = None
+        self._available_idx: Dict[int, np.ndarray] = {}
+        
         # Statistics
         self.stats = {
             'solve_time': 0,
@@ -64,23 +128,24 @@ class AIEnhancedOptimizer:
     def load_ml_models(self, demand_model_path: str, fatigue_model_path: str):
         """Load pre-trained ML models"""
         if self.use_ml:
-            print("Loading ML models...")
+            self.logger.info("Loading ML models...")
             self.demand_forecaster.load(demand_model_path)
             self.fatigue_predictor.load(fatigue_model_path)
-            print("ML models loaded successfully!")
+            self.logger.info("ML models loaded successfully!")
     
     def load_rl_agent(self, agent_path: str):
         """Load pre-trained RL agent"""
         if self.use_rl:
-            print("Loading RL agent...")
+            self.logger.info("Loading RL agent...")
             # Would load trained agent here
-            print("RL agent loaded successfully!")
+            self.logger.info("RL agent loaded successfully!")
     
     def generate_rotations(self, nurse: Nurse, shifts: List[Shift], 
                           max_rotations: int = 100) -> List[Rotation]:
         """
         Generate candidate rotations for a nurse.
-        This is the pricing subproblem in column generation.
+        Used to seed column generation; later columns come from
+        _price_subproblem.
         
         Args:
             nurse: Nurse to generate rotations for
@@ -91,58 +156,152 @@ class AIEnhancedOptimizer:
             List of feasible rotations
         """
         rotations = []
+        available_shifts = self._available_shifts(nurse, shifts)
+        
+        # Consecutive-day windows within the nurse's limit, as (start, length)
+        dates = np.array([s.date for s in available_shifts], dtype='datetime64[us]')
+        windows = rotation_kernels.rotation_windows(
+            dates.view(np.int64), nurse.max_consecutive_days, max_rotations
+        )
         
+        for start_idx, length in windows.tolist():
+            rotation_shifts = available_shifts[start_idx:start_idx + length]
+            rotations.append(Rotation(nurse_id=nurse.id, shifts=rotation_shifts))
+        
+        return rotations
+    
+    def _available_shifts(self, nurse: Nurse, shifts: List[Shift]) -> List[Shift]:
+        """Shifts the nurse can work, sorted by date"""
         # Filter shifts nurse can work
-        available_shifts = [
-            s for s in shifts 
-            if nurse.is_available(s.date) and nurse.can_work_shift(s.shift_type)
-        ]
+        available_idx = (self._available_idx.get(id(nurse))
+                         if shifts is self._availability_shifts else None)
+        if available_idx is not None:
+            available_shifts = [shifts[i] for i in available_idx.tolist()]
+        else:
+            available_shifts = [
+                s for s in shifts 
+                if nurse.is_available(s.date) and nurse.can_work_shift(s.shift_type)
+            ]
         
         # Sort by date
         available_shifts.sort(key=lambda s: s.date)
+        return available_shifts
+    
+    def _price_subproblem(self, nurse: Nurse, shifts: List[Shift],
+                          shift_duals: Dict[str, float], nurse_dual: float,
+                          max_columns: int = 5, max_length: int = 6,
+                          known_keys: Optional[set] = None) -> List[Rotation]:
+        """
+        Pricing subproblem: the nurse's rotations with the most negative
+        reduced cost.
+        
+        Shifts the nurse can work form a DAG with an edge from each shift to
+        every shift on the next day. A label-setting pass in date order keeps,
+        per shift and (length, night shifts, hours) state, the cheapest path
+        under the additive part of the cost (preferences, fatigue, minus the
+        shift duals). The state determines the overtime and night penalties,
+        so each label's reduced cost is exact.
+        
+        Args:
+            nurse: Nurse to price rotations for
+            shifts: Shifts to cover
+            shift_duals: Coverage row duals by shift id
+            nurse_dual: Convexity row dual of the nurse
+            max_columns: Maximum number of rotations to return
+            max_length: Longest rotation considered (also capped by
+                max_consecutive_days)
+            known_keys: _rotation_key()s of rotations to skip (already in
+                the master problem); they don't count towards max_columns
+        
+        Returns:
+            Rotations with negative reduced cost, most negative first
+        """
+        available_shifts = self._available_shifts(nurse, shifts)
+        max_length = min(max_length, nurse.max_consecutive_days)
+        if not available_shifts or max_length < 1:
+            return []
+        
+        prefs = nurse.preferences
+        night_id = _SHIFT_TYPE_INDEX[ShiftType.NIGHT]
+        dates_us = np.array([s.date for s in available_shifts],
+                            dtype='datetime64[us]').view(np.int64).tolist()
+        type_ids = [_SHIFT_TYPE_INDEX[s.shift_type] for s in available_shifts]
+        hours = [s.duration_hours for s in available_shifts]
+        nights = [int(t == night_id) for t in type_ids]
+        weights = [
+            30 * ((prefs.avoided_mask >> t) & 1)
+            + 10 * ((prefs.not_preferred_mask >> t) & 1)
+            + h * nurse.fatigue_score * 10
+            - shift_duals.get(s.id, 0.0)
+            for s, t, h in zip(available_shifts, type_ids, hours)
+        ]
         
-        # Generate rotations using dynamic programming approach
-        # For simplicity, we'll use a greedy heuristic here
-        
-        # Short rotations (1-3 days)
-        for start_idx in range(len(available_shifts)):
-            for length in range(1, min(4, len(available_shifts) - start_idx + 1)):
-                rotation_shifts = available_shifts[start_idx:start_idx + length]
-                
-                # Check if consecutive
-                is_consecutive = True
-                for i in range(len(rotation_shifts) - 1):
-                    days_diff = (rotation_shifts[i+1].date - rotation_shifts[i].date).days
-                    if days_diff != 1:
-                        is_consecutive = False
-                        break
-                
-                if is_consecutive:
-                    rotation = Rotation(nurse_id=nurse.id, shifts=rotation_shifts)
-                    
-                    # Check if rotation is feasible
-                    if not rotation.violates_max_consecutive(nurse.max_consecutive_days):
-                        rotations.append(rotation)
-        
-        # Medium rotations (4-6 days)
-        for start_idx in range(len(available_shifts)):
-            for length in range(4, min(7, len(available_shifts) - start_idx + 1)):
-                rotation_shifts = available_shifts[start_idx:start_idx + length]
-                
-                is_consecutive = True
-                for i in range(len(rotation_shifts) - 1):
-                    days_diff = (rotation_shifts[i+1].date - rotation_shifts[i].date).days
-                    if days_diff != 1:
-                        is_consecutive = False
-                        break
-                
-                if is_consecutive:
-                    rotation = Rotation(nurse_id=nurse.id, shifts=rotation_shifts)
-                    if not rotation.violates_max_consecutive(nurse.max_consecutive_days):
-                        rotations.append(rotation)
-        
-        # Limit number of rotations
-        return rotations[:max_rotations]
+        # labels[i]: {(length, nights, hours): (additive cost, i, previous label)}
+        day_us = rotation_kernels.DAY_US
+        labels = [{(1, nights[i], hours[i]): (weights[i], i, None)}
+                  for i in range(len(available_shifts))]
+        for i, node_labels in enumerate(labels):
+            # Successors: shifts whose date is one (floored) day later
+            lo = bisect_left(dates_us, dates_us[i] + day_us, i + 1)
+            hi = bisect_left(dates_us, dates_us[i] + 2 * day_us, lo)
+            if lo == hi:
+                continue
+            for (length, night_count, total_hours), label in node_labels.items():
+                if length >= max_length:
+                    continue
+                for j in range(lo, hi):
+                    key = (length + 1, night_count + nights[j], total_hours + hours[j])
+                    cost = label[0] + weights[j]
+                    best = labels[j].get(key)
+                    if best is None or cost < best[0]:
+                        labels[j][key] = (cost, j, label)
+        
+        # Reduced cost of every label, adding the state-dependent penalties
+        priced = []
+        for node_labels in labels:
+            for (length, night_count, total_hours), label in node_labels.items():
+                reduced = (
+                    label[0]
+                    + max(0, total_hours - nurse.max_hours_per_week) * 50  # Overtime
+                    + max(0, night_count - prefs.max_night_shifts_per_week) * 40
+                    - nurse_dual
+                )
+                if reduced < -1e-6:
+                    priced.append((reduced, label))
+        priced.sort(key=lambda item: item[0])
+        
+        # Rotations are only built for new paths
+        rotations = []
+        for _, label in priced:
+            if len(rotations) == max_columns:
+                break
+            path = []
+            while label is not None:
+                path.append(available_shifts[label[1]])
+                label = label[2]
+            path.reverse()
+            if known_keys and (nurse.id, tuple(s.id for s in path)) in known_keys:
+                continue
+            rotations.append(Rotation(nurse_id=nurse.id, shifts=path))
+        return rotations
+    
+    def _build_availability(self, nurses: List[Nurse], shifts: List[Shift]):
+        """
+        Precompute, for each nurse, the indices of the shifts they can work
+        (available that day and not an avoided shift type), so repeated
+        generate_rotations calls over the same shift list skip the filter.
+        """
+        shift_days = np.fromiter((s.date.toordinal() for s in shifts),
+                                 dtype=np.int64, count=len(shifts))
+        shift_types = np.fromiter((_SHIFT_TYPE_INDEX[s.shift_type] for s in shifts),
+                                  dtype=np.int64, count=len(shifts))
+        
+        self._availability_shifts = shifts
+        self._available_idx = {}
+        for nurse in nurses:
+            mask = nurse.is_available_on(shift_days)
+            mask &= ((nurse.preferences.avoided_mask >> shift_types) & 1) == 0
+            self._available_idx[id(nurse)] = np.flatnonzero(mask)
     
     def solve_master_problem(self, nurses: List[Nurse], shifts: List[Shift],
                             rotations: List[Rotation]) -> Tuple[Dict, float]:
@@ -157,57 +316,205 @@ class AIEnhancedOptimizer:
         Returns:
             Solution dictionary and objective value
         """
-        # Create LP problem
-        prob = LpProblem("NurseScheduling", LpMinimize)
+        # The LP is built column-wise and kept between calls; only rotations
+        # appended since the last call are added to it
+        if self._master_rotations is not rotations or len(rotations) < len(self._column_cost):
+            self._build_master_problem(nurses, shifts, rotations)
+        
+        for i in range(len(self._column_cost), len(rotations)):
+            self._add_rotation_column(i, rotations[i])
+        
+        # Solve: coverage rows are negated into <= form for linprog
+        n_cover = len(self._required)
+        n_columns = len(self._column_cost)
+        rows = np.concatenate(self._column_rows) if self._column_rows else np.empty(0, dtype=np.int32)
+        cols = np.repeat(np.arange(n_columns), [len(r) for r in self._column_rows])
+        data = np.where(rows < n_cover, -1.0, 1.0)
+        
+        # Shortage columns follow the rotation columns
+        shortage = np.arange(n_cover)
+        A_ub = sp.csr_matrix(
+            (np.concatenate([data, np.full(n_cover, -1.0)]),
+             (np.concatenate([rows, shortage]), np.concatenate([cols, n_columns + shortage]))),
+            shape=(n_cover + len(self._nurse_index), n_columns + n_cover)
+        )
+        b_ub = np.concatenate([-self._required, np.ones(len(self._nurse_index))])
+        c = np.concatenate([self._column_cost, self._shortage_cost])
+        bounds = np.concatenate([
+            np.tile([0.0, 1.0], (n_columns, 1)),
+            np.tile([0.0, np.inf], (n_cover, 1))
+        ])
         
-        # Decision variables: which rotations to use
-        rotation_vars = {}
-        for i, rotation in enumerate(rotations):
-            rotation_vars[i] = LpVariable(f"rotation_{i}", lowBound=0, upBound=1, cat='Continuous')
+        res = linprog(c, A_ub=A_ub, b_ub=b_ub, bounds=bounds, method='highs-ds')
+        if res.x is None:
+            raise RuntimeError(f"Master LP failed: {res.message}")
         
-        # Objective: minimize total cost
-        prob += lpSum([
-            rotation_vars[i] * rotations[i].get_cost(
-                next(n for n in nurses if n.id == rotations[i].nurse_id)
-            )
-            for i in range(len(rotations))
-        ])
+        # Extract solution
+        solution = {i: float(x) for i, x in enumerate(res.x[:n_columns]) if x > 0.01}
         
-        # Constraints: Each shift must be covered
-        shift_coverage = {}
-        for shift in shifts:
-            if shift.shift_type == ShiftType.REST:
-                continue
-            
-            shift_coverage[shift.id] = []
-            for i, rotation in enumerate(rotations):
-                if shift in rotation.shifts:
-                    shift_coverage[shift.id].append(rotation_vars[i])
-            
-            if shift_coverage[shift.id]:
-                prob += lpSum(shift_coverage[shift.id]) >= shift.required_nurses
+        # Row duals for pricing new columns
+        marginals = res.ineqlin.marginals
+        self.shift_duals = {
+            shift_id: -float(marginals[k]) for shift_id, k in self._shift_index.items()
+        }
+        self.nurse_duals = {
+            nurse_id: float(marginals[n_cover + k]) for nurse_id, k in self._nurse_index.items()
+        }
         
-        # Convexity constraints: Each nurse used at most once per time period
-        nurse_usage = {nurse.id: [] for nurse in nurses}
-        for i, rotation in enumerate(rotations):
-            nurse_usage[rotation.nurse_id].append(rotation_vars[i])
+        objective = float(res.fun)
         
-        for nurse_id, vars_list in nurse_usage.items():
-            if vars_list:
-                prob += lpSum(vars_list) <= 1
+        return solution, objective
+    
+    def _reset_master_problem(self):
+        """Drop the cached master LP"""
+        self._master_rotations = None
+        self._master_nurses: Dict[str, Nurse] = {}
+        
+        # Coverage/convexity rows by shift/nurse id; convexity rows are
+        # numbered after the coverage rows in the constraint matrix
+        self._shift_index: Dict[str, int] = {}
+        self._nurse_index: Dict[str, int] = {}
+        self._required = np.empty(0)
+        self._shortage_cost = np.empty(0)
+        
+        # Per column: int32 coverage row indices, convexity row index,
+        # all constraint rows (coverage then convexity) and objective cost
+        self._column_shifts: List[np.ndarray] = []
+        self._column_nurse: List[int] = []
+        self._column_rows: List[np.ndarray] = []
+        self._column_cost: List[float] = []
+        self.shift_duals: Dict[str, float] = {}
+        self.nurse_duals: Dict[str, float] = {}
+        self._dual_center: Optional[Tuple[Dict[str, float], Dict[str, float]]] = None
+    
+    def _build_master_problem(self, nurses: List[Nurse], shifts: List[Shift],
+                              rotations: List[Rotation]):
+        """
+        Create an empty master LP with one coverage row per shift and one
+        convexity row per nurse. Each coverage row gets a shortage column
+        priced like Shift.get_understaffing_penalty, so the LP stays
+        feasible and its duals are usable for pricing.
+        """
+        self._reset_master_problem()
+        self._master_rotations = rotations
+        self._master_nurses = {n.id: n for n in reversed(nurses)}  # First match wins
         
-        # Solve
-        prob.solve(PULP_CBC_CMD(msg=0))
+        # Constraints: Each shift must be covered (or pay for the shortage)
+        required, shortage_cost = [], []
+        for shift in shifts:
+            if shift.shift_type != ShiftType.REST:
+                self._shift_index[shift.id] = len(required)
+                required.append(shift.required_nurses)
+                shortage_cost.append(shift.complexity_score * 100)
+        self._required = np.array(required, dtype=np.float64)
+        self._shortage_cost = np.array(shortage_cost, dtype=np.float64)
         
-        # Extract solution
-        solution = {}
-        for i, var in rotation_vars.items():
-            if var.varValue and var.varValue > 0.01:
-                solution[i] = var.varValue
+        # Convexity constraints: Each nurse used at most once per time period
+        for i, nurse_id in enumerate(dict.fromkeys(n.id for n in nurses)):
+            self._nurse_index[nurse_id] = i
+    
+    def _smoothed_duals(self) -> Tuple[Dict[str, float], Dict[str, float]]:
+        """
+        Wentges-smoothed duals of the last master solve:
+        dual_smoothing * center + (1 - dual_smoothing) * current duals.
+        The first solve's duals become the initial stabilization center.
+        """
+        if self._dual_center is None:
+            self._dual_center = (dict(self.shift_duals), dict(self.nurse_duals))
+            return self._dual_center
+        
+        alpha = self.dual_smoothing
+        center_shift, center_nurse = self._dual_center
+        shift_duals = {
+            shift_id: alpha * center_shift.get(shift_id, 0.0) + (1 - alpha) * pi
+            for shift_id, pi in self.shift_duals.items()
+        }
+        nurse_duals = {
+            nurse_id: alpha * center_nurse.get(nurse_id, 0.0) + (1 - alpha) * mu
+            for nurse_id, mu in self.nurse_duals.items()
+        }
+        return shift_duals, nurse_duals
+    
+    def _price_columns(self, nurses: List[Nurse], shifts: List[Shift],
+                       known_keys: set) -> List[Rotation]:
+        """
+        New columns that improve the master LP (negative reduced cost),
+        from each nurse's pricing subproblem.
+        Pricing uses the smoothed duals first; if that misprices every
+        column, the raw duals are tried before giving up. Whichever duals
+        priced a column become the new stabilization center.
+        """
+        for shift_duals, nurse_duals in (self._smoothed_duals(),
+                                         (self.shift_duals, self.nurse_duals)):
+            priced = [
+                rot
+                for nurse in nurses
+                for rot in self._price_subproblem(nurse, shifts, shift_duals,
+                                                  nurse_duals.get(nurse.id, 0.0),
+                                                  known_keys=known_keys)
+            ]
+            if priced:
+                self._dual_center = (shift_duals, nurse_duals)
+                return priced
+        return []
+    
+    def _add_rotation_column(self, i: int, rotation: Rotation):
+        """Add rotation i as a new column of the master LP"""
+        shift_rows = np.fromiter(
+            dict.fromkeys(self._shift_index[shift_id] for shift_id in rotation.get_shift_ids()
+                          if shift_id in self._shift_index),
+            dtype=np.int32
+        )
+        nurse_row = self._nurse_index[rotation.nurse_id]
+        self._column_shifts.append(shift_rows)
+        self._column_nurse.append(nurse_row)
+        self._column_rows.append(np.append(shift_rows, np.int32(len(self._required) + nurse_row)))
         
-        objective = value(prob.objective)
+        # Objective: minimize total cost
+        self._column_cost.append(rotation.get_cost(self._master_nurses[rotation.nurse_id]))
+    
+    def _polish_integer(self, selected: List[int], time_limit: float) -> List[int]:
+        """
+        Solve the last master LP's columns as an integer program with CBC.
+        The rounded LP selection is feasible (at most one column per nurse
+        is above 0.5 and shortages absorb any gap), so it is passed as a
+        MIP start covering every variable. Falls back to the rounded
+        selection if CBC finds nothing better.
+        """
+        prob = LpProblem("NurseSchedulingIP", LpMinimize)
+        x = [LpVariable(f"rotation_{j}", cat='Binary') for j in range(len(self._column_cost))]
+        shortage = [LpVariable(f"shortage_{k}", lowBound=0) for k in range(len(self._required))]
         
-        return solution, objective
+        prob += LpAffineExpression(
+            list(zip(x, self._column_cost)) + list(zip(shortage, self._shortage_cost.tolist()))
+        )
+        
+        cover = [[(shortage[k], 1)] for k in range(len(shortage))]
+        convexity = [[] for _ in self._nurse_index]
+        for j, shift_rows in enumerate(self._column_shifts):
+            for k in shift_rows.tolist():
+                cover[k].append((x[j], 1))
+            convexity[self._column_nurse[j]].append((x[j], 1))
+        for k, terms in enumerate(cover):
+            prob += LpAffineExpression(terms) >= self._required[k], f"cover_{k}"
+        for i, terms in enumerate(convexity):
+            if terms:
+                prob += LpAffineExpression(terms) <= 1, f"nurse_{i}"
+        
+        # MIP start: every variable gets a value, else CBC ignores the hint
+        chosen = set(selected)
+        covered = np.zeros(len(shortage))
+        for j in chosen:
+            covered[self._column_shifts[j]] += 1
+        for j, var in enumerate(x):
+            var.setInitialValue(1 if j in chosen else 0)
+        for var, gap in zip(shortage, np.maximum(self._required - covered, 0).tolist()):
+            var.setInitialValue(gap)
+        
+        prob.solve(PULP_CBC_CMD(msg=0, warmStart=True, timeLimit=time_limit))
+        if prob.sol_status not in (LpSolutionOptimal, LpSolutionIntegerFeasible):
+            return selected
+        return [j for j, var in enumerate(x) if var.varValue and var.varValue > 0.5]
     
     def optimize(self, problem: SchedulingProblem, 
                 max_iterations: int = 10, 
@@ -224,13 +531,13 @@ class AIEnhancedOptimizer:
             Optimized schedule
         """
         start_time = time.time()
-        print("=" * 60)
-        print("AI-Enhanced Nurse Scheduler")
-        print("=" * 60)
+        self.logger.info("=" * 60)
+        self.logger.info("AI-Enhanced Nurse Scheduler")
+        self.logger.info("=" * 60)
         
         # Step 1: Demand Forecasting (if ML enabled)
         if self.use_ml and self.demand_forecaster.is_trained:
-            print("\n[1/5] Forecasting demand...")
+            self.logger.info("\n[1/5] Forecasting demand...")
             ml_start = time.time()
             
             demand_forecast = self.demand_forecaster.predict(
@@ -238,30 +545,35 @@ class AIEnhancedOptimizer:
                 problem.planning_horizon_days
             )
             
-            # Update daily demand based on forecast
+            # Update each day's demand based on the forecast
+            demand = problem.get_demand_array()
+            forecast_types = [ShiftType.MORNING, ShiftType.AFTERNOON, ShiftType.NIGHT]
             for date, demands in demand_forecast.items():
-                problem.daily_demand[ShiftType.MORNING] = demands['morning']
-                problem.daily_demand[ShiftType.AFTERNOON] = demands['afternoon']
-                problem.daily_demand[ShiftType.NIGHT] = demands['night']
+                day = (date - problem.start_date).days
+                if 0 <= day < len(demand):
+                    demand[day, forecast_types] = (
+                        demands['morning'], demands['afternoon'], demands['night']
+                    )
+            problem.demand_array = demand
             
             self.stats['ml_time'] += time.time() - ml_start
-            print(f"   Demand forecasting completed in {time.time() - ml_start:.2f}s")
+            self.logger.info(f"   Demand forecasting completed in {time.time() - ml_start:.2f}s")
         else:
-            print("\n[1/5] Using default demand (ML not enabled)")
+            self.logger.info("\n[1/5] Using default demand (ML not enabled)")
         
         # Step 2: Generate shifts
-        print("\n[2/5] Generating shifts...")
+        self.logger.info("\n[2/5] Generating shifts...")
         shifts = problem.generate_shifts()
-        print(f"   Generated {len(shifts)} shifts over {problem.planning_horizon_days} days")
+        self.logger.info(f"   Generated {len(shifts)} shifts over {problem.planning_horizon_days} days")
         
         # Step 3: Predict fatigue (if ML enabled)
         if self.use_ml and self.fatigue_predictor.is_trained:
-            print("\n[3/5] Predicting nurse fatigue...")
+            self.logger.info("\n[3/5] Predicting nurse fatigue...")
             ml_start = time.time()
             
-            for nurse in problem.nurses:
-                # Simulate nurse history
-                nurse_history = {
+            # Simulate nurse histories and predict them in one batch
+            nurse_histories = [
+                {
                     'shifts_last_week': [],
                     'shifts_last_month': [],
                     'personal_info': {
@@ -270,31 +582,38 @@ class AIEnhancedOptimizer:
                         'has_children': False,
                         'max_hours_per_week': nurse.max_hours_per_week
                     },
-                    'preferences': nurse.preferences.__dict__
+                    'preferences': asdict(nurse.preferences)
                 }
-                
-                fatigue = self.fatigue_predictor.predict(nurse_history)
-                nurse.fatigue_score = fatigue['overall_fatigue']
+                for nurse in problem.nurses
+            ]
+            
+            fatigue = self.fatigue_predictor.predict_batch(nurse_histories)
+            for nurse, nurse_fatigue in zip(problem.nurses, fatigue):
+                nurse.fatigue_score = nurse_fatigue['overall_fatigue']
             
             self.stats['ml_time'] += time.time() - ml_start
-            print(f"   Fatigue prediction completed in {time.time() - ml_start:.2f}s")
+            self.logger.info(f"   Fatigue prediction completed in {time.time() - ml_start:.2f}s")
         else:
-            print("\n[3/5] Skipping fatigue prediction (ML not enabled)")
+            self.logger.info("\n[3/5] Skipping fatigue prediction (ML not enabled)")
         
         # Step 4: Column generation
-        print("\n[4/5] Running branch-and-price optimization...")
-        print(f"   Nurses: {len(problem.nurses)}, Shifts: {len(shifts)}")
+        self.logger.info("\n[4/5] Running branch-and-price optimization...")
+        self.logger.info(f"   Nurses: {len(problem.nurses)}, Shifts: {len(shifts)}")
         
         # Initialize with some rotations
-        all_rotations = []
+        self._build_availability(problem.nurses, shifts)
+        pool = _ColumnPool()
         for nurse in problem.nurses:
-            nurse_rotations = self.generate_rotations(nurse, shifts, max_rotations=20)
-            all_rotations.extend(nurse_rotations)
+            for rotation in self.generate_rotations(nurse, shifts, max_rotations=20):
+                pool.add(rotation)
+        all_rotations = pool.rotations
         
-        print(f"   Initial rotations: {len(all_rotations)}")
+        self.logger.info(f"   Initial rotations: {len(all_rotations)}")
         
         # Column generation loop
+        self._reset_master_problem()
         best_objective = float('inf')
+        previous_objective = float('inf')
         iteration = 0
         
         while iteration < max_iterations and (time.time() - start_time) < time_limit:
@@ -305,44 +624,42 @@ class AIEnhancedOptimizer:
                 problem.nurses, shifts, all_rotations
             )
             
-            print(f"   Iteration {iteration}: Objective = {objective:.2f}")
+            self.logger.debug("   Iteration %d: Objective = %.2f", iteration, objective)
             
             if objective < best_objective:
                 best_objective = objective
                 self.stats['best_objective'] = best_objective
             
-            # Check convergence
-            if abs(objective - best_objective) < 1.0:
-                print("   Converged!")
+            # Check convergence (objective stalled since the last iteration)
+            if abs(previous_objective - objective) < 1.0:
+                self.logger.debug("   Converged!")
                 break
+            previous_objective = objective
             
-            # Generate new columns (simplified - would normally use dual values)
-            # In production, solve pricing subprobems using dual values
+            # Generate new columns from the (smoothed) duals of this solve
             new_rotations = 0
-            for nurse in problem.nurses:
-                additional = self.generate_rotations(nurse, shifts, max_rotations=5)
-                # Filter out existing rotations
-                for rot in additional:
-                    if not any(self._rotations_equal(rot, r) for r in all_rotations):
-                        all_rotations.append(rot)
-                        new_rotations += 1
+            for rot in self._price_columns(problem.nurses, shifts, pool.keys):
+                new_rotations += pool.add(rot)
             
-            print(f"   Added {new_rotations} new rotations")
+            self.logger.debug("   Added %d new rotations", new_rotations)
             
             if new_rotations == 0:
-                print("   No new rotations found!")
+                self.logger.debug("   No new rotations found!")
                 break
         
         self.stats['iterations'] = iteration
+        self._availability_shifts = None
+        self._available_idx = {}
         
         # Step 5: Construct final schedule
-        print("\n[5/5] Constructing final schedule...")
+        self.logger.info("\n[5/5] Constructing final schedule...")
         
         # Round fractional solution to integers (simplified)
-        selected_rotations = []
-        for idx, value in solution.items():
-            if value > 0.5:  # Simple rounding threshold
-                selected_rotations.append(all_rotations[idx])
+        selected = [idx for idx, value in solution.items() if value > 0.5]
+        remaining = time_limit - (time.time() - start_time)
+        if self.integer_polish and remaining > 0:
+            selected = self._polish_integer(selected, remaining)
+        selected_rotations = [all_rotations[idx] for idx in selected]
         
         # Assign shifts
         for rotation in selected_rotations:
@@ -361,35 +678,32 @@ class AIEnhancedOptimizer:
             department="General"
         )
         
-        # Evaluate with constraints
-        total_penalty = self.constraint_engine.evaluate_total(schedule)
-        is_feasible = self.constraint_engine.is_feasible(schedule)
-        
         self.stats['solve_time'] = time.time() - start_time
         
-        # Print summary
-        print("\n" + "=" * 60)
-        print("OPTIMIZATION SUMMARY")
-        print("=" * 60)
-        print(f"Solve Time:        {self.stats['solve_time']:.2f}s")
-        print(f"ML Time:           {self.stats['ml_time']:.2f}s")
-        print(f"Iterations:        {self.stats['iterations']}")
-        print(f"Objective Value:   {best_objective:.2f}")
-        print(f"Total Penalty:     {total_penalty:.2f}")
-        print(f"Is Feasible:       {is_feasible}")
-        print(f"Rotations Used:    {len(selected_rotations)}")
-        print(f"Nurse Satisfaction: {schedule.get_metrics()['nurse_satisfaction']:.2%}")
-        print("=" * 60)
+        # Print summary (the constraint evaluation is only needed for it)
+        if self.logger.isEnabledFor(logging.INFO):
+            total_penalty = self.constraint_engine.evaluate_total(schedule)
+            is_feasible = self.constraint_engine.is_feasible(schedule)
+            
+            self.logger.info("\n" + "=" * 60)
+            self.logger.info("OPTIMIZATION SUMMARY")
+            self.logger.info("=" * 60)
+            self.logger.info(f"Solve Time:        {self.stats['solve_time']:.2f}s")
+            self.logger.info(f"ML Time:           {self.stats['ml_time']:.2f}s")
+            self.logger.info(f"Iterations:        {self.stats['iterations']}")
+            self.logger.info(f"Objective Value:   {best_objective:.2f}")
+            self.logger.info(f"Total Penalty:     {total_penalty:.2f}")
+            self.logger.info(f"Is Feasible:       {is_feasible}")
+            self.logger.info(f"Rotations Used:    {len(selected_rotations)}")
+            self.logger.info(f"Nurse Satisfaction: {schedule.get_metrics()['nurse_satisfaction']:.2%}")
+            self.logger.info("=" * 60)
         
         return schedule
     
-    def _rotations_equal(self, r1: Rotation, r2: Rotation) -> bool:
-        """Check if two rotations are equal"""
-        if r1.nurse_id != r2.nurse_id:
-            return False
-        if len(r1.shifts) != len(r2.shifts):
-            return False
-        return all(s1.id == s2.id for s1, s2 in zip(r1.shifts, r2.shifts))
+    @staticmethod
+    def _rotation_key(rotation: Rotation) -> Tuple:
+        """Hashable identity of a rotation: nurse and ordered shift ids"""
+        return (rotation.nurse_id, rotation.get_shift_ids())
     
     def get_statistics(self) -> Dict:
         """Get optimization statistics"""
@@ -403,8 +717,6 @@ def create_sample_problem() -> SchedulingProblem:
     # Create nurses
     nurses = []
     for i in range(15):  # 15 nurses
-        from core.models import NursePreferences
-        
         prefs = NursePreferences(
             preferred_shifts=[ShiftType.MORNING] if i % 3 == 0 else [ShiftType.AFTERNOON],
             avoided_shifts=[ShiftType.NIGHT] if i % 4 == 0 else [],
@@ -440,11 +752,13 @@ def create_sample_problem() -> SchedulingProblem:
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s", stream=sys.stdout)
+    
     # Create sample problem
     problem = create_sample_problem()
     
     # Create optimizer
-    optimizer = AIEnhancedOptimizer(use_ml=False, use_rl=False)
+    optimizer = AIEnhancedOptimizer(use_ml=False, use_rl=False, verbose=True)
     
     # Setup Egyptian constraints
     optimizer.setup_egyptian_constraints()
@@ -4,6 +4,8 @@ HealthFlow RegTech - Egypt's Digital Health Infrastructure
 """
 
 import argparse
+import logging
+import sys
 import yaml
 from datetime import datetime
 from pathlib import Path
@@ -13,6 +15,9 @@ from core.optimizer import AIEnhancedOptimizer
 from utils.egyptian_calendar import get_ramadan_dates
 from utils.visualization import plot_schedule, generate_schedule_report
 
+# Config shift names ('morning', ...) to ShiftType
+_SHIFT_TYPE_BY_NAME = {t.name.lower(): t for t in ShiftType}
+
 
 def load_config(config_path: str) -> dict:
     """Load configuration from YAML file"""
@@ -29,8 +34,8 @@ def create_problem_from_config(config: dict) -> SchedulingProblem:
     nurses = []
     for nurse_data in config.get('nurses', []):
         prefs = NursePreferences(
-            preferred_shifts=[ShiftType[s.upper()] for s in nurse_data.get('preferred_shifts', [])],
-            avoided_shifts=[ShiftType[s.upper()] for s in nurse_data.get('avoided_shifts', [])],
+            preferred_shifts=[_SHIFT_TYPE_BY_NAME[s.lower()] for s in nurse_data.get('preferred_shifts', [])],
+            avoided_shifts=[_SHIFT_TYPE_BY_NAME[s.lower()] for s in nurse_data.get('avoided_shifts', [])],
             max_consecutive_days=nurse_data.get('max_consecutive_days', 5),
             prefer_friday_off=nurse_data.get('prefer_friday_off', True),
             avoid_night_shifts_ramadan=nurse_data.get('avoid_night_shifts_ramadan', False),
@@ -57,13 +62,13 @@ def create_problem_from_config(config: dict) -> SchedulingProblem:
     planning_days = schedule_config.get('planning_horizon_days', 14)
     
     # Get shift types
-    shifts_per_day = [ShiftType[s.upper()] for s in schedule_config.get('shifts_per_day', ['morning', 'afternoon', 'night'])]
+    shifts_per_day = [_SHIFT_TYPE_BY_NAME[s.lower()] for s in schedule_config.get('shifts_per_day', ['morning', 'afternoon', 'night'])]
     
     # Get demand
     daily_demand = {}
     demand_config = schedule_config.get('daily_demand', {})
     for shift_name, count in demand_config.items():
-        daily_demand[ShiftType[shift_name.upper()]] = count
+        daily_demand[_SHIFT_TYPE_BY_NAME[shift_name.lower()]] = count
     
     # Get Ramadan dates if configured
     ramadan_start = None
@@ -102,7 +107,7 @@ Examples:
   python main.py --config config/hospital_cairo.yaml
 
   # Enable ML features with pre-trained models
-  python main.py --use-ml --demand-model models/demand.pth --fatigue-model models/fatigue.pkl
+  python main.py --use-ml --demand-model models/demand.pth --fatigue-model models/fatigue.json
 
   # Generate visualization
   python main.py --visualize --output results/schedule.html
@@ -132,6 +137,9 @@ Examples:
     
     args = parser.parse_args()
     
+    # Optimizer progress is logged; show it like the rest of the CLI output
+    logging.basicConfig(level=logging.INFO, format="%(message)s", stream=sys.stdout)
+    
     # Print header
     print("=" * 70)
     print(" " * 15 + "AI-ENHANCED NURSE SCHEDULER")
@@ -160,7 +168,7 @@ Examples:
     
     # Create optimizer
     print("Initializing optimizer...")
-    optimizer = AIEnhancedOptimizer(use_ml=args.use_ml, use_rl=args.use_rl)
+    optimizer = AIEnhancedOptimizer(use_ml=args.use_ml, use_rl=args.use_rl, verbose=True)
     
     # Load ML models if specified
     if args.use_ml:
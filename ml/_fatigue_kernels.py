@@ -0,0 +1,65 @@
+"""
+Numeric kernels for fatigue feature extraction.
+
+Kernels take flat arrays of shifts from every nurse history, grouped by
+history row (and sorted by date within each row where dates matter),
+and return one value per row. Shift types are passed as small integer
+codes, so no Python objects reach the kernels.
+"""
+
+import numpy as np
+
+from core._jit import njit, HAS_NUMBA
+
+DAY_US = 86_400_000_000
+
+
+@njit(cache=True, nogil=True)
+def max_consecutive_days(row_idx, date_us, n_rows):
+    """Longest run of one-day steps per row (0 for rows without shifts)"""
+    out = np.zeros(n_rows, dtype=np.int64)
+    k = len(row_idx)
+    
+    consecutive = 0
+    for i in range(k):
+        if i > 0 and row_idx[i] == row_idx[i - 1] and (date_us[i] - date_us[i - 1]) // DAY_US == 1:
+            consecutive += 1
+        else:
+            consecutive = 1
+        if consecutive > out[row_idx[i]]:
+            out[row_idx[i]] = consecutive
+    
+    return out
+
+
+@njit(cache=True, nogil=True)
+def shift_entropy(row_idx, type_code, n_rows, n_types):
+    """Shannon entropy (bits) of each row's shift type codes"""
+    out = np.zeros(n_rows)
+    counts = np.zeros(n_types, dtype=np.int64)
+    k = len(row_idx)
+    
+    start = 0
+    for i in range(1, k + 1):
+        if i < k and row_idx[i] == row_idx[start]:
+            continue
+        
+        counts[:] = 0
+        for j in range(start, i):
+            counts[type_code[j]] += 1
+        total = i - start
+        entropy = 0.0
+        for t in range(n_types):
+            if counts[t] > 0:
+                p = counts[t] / total
+                entropy -= p * np.log2(p)
+        out[row_idx[start]] = entropy
+        start = i
+    
+    return out
+
+
+if HAS_NUMBA:
+    # Compile (or load from cache) at import so the first real call is fast
+    max_consecutive_days(np.zeros(1, dtype=np.intp), np.zeros(1, dtype=np.int64), 1)
+    shift_entropy(np.zeros(1, dtype=np.intp), np.zeros(1, dtype=np.intp), 1, 1)
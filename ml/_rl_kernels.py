@@ -0,0 +1,65 @@
+"""
+Numeric kernels for the branching environment's per-step work.
+
+Kernels take plain float arrays and scalars, so SchedulingEnvironment.step
+and state featurization never loop in Python.
+"""
+
+import numpy as np
+
+from core._jit import njit, HAS_NUMBA
+
+
+@njit(cache=True, nogil=True)
+def fractionality_stats(values):
+    """Mean, max, std and share above 0.1 of |v - round(v)| (zeros if empty)"""
+    out = np.zeros(4)
+    n = len(values)
+    if n == 0:
+        return out
+    
+    total = 0.0
+    peak = 0.0
+    above = 0
+    for i in range(n):
+        f = abs(values[i] - np.rint(values[i]))
+        total += f
+        if f > peak:
+            peak = f
+        if f > 0.1:
+            above += 1
+    mean = total / n
+    
+    # Second pass for the variance, as np.std computes it
+    squares = 0.0
+    for i in range(n):
+        d = abs(values[i] - np.rint(values[i])) - mean
+        squares += d * d
+    
+    out[0] = mean
+    out[1] = peak
+    out[2] = np.sqrt(squares / n)
+    out[3] = above / (n + 1e-6)
+    return out
+
+
+@njit(cache=True)
+def branching_reward(current_quality, new_quality, best_quality):
+    """Reward for one branching step; mirrors SchedulingEnvironment._calculate_reward"""
+    # Improvement reward (NaN, e.g. inf - inf, counts as no improvement)
+    improvement = current_quality - new_quality
+    if not improvement > 0:
+        improvement = 0.0
+    
+    # Quality bonus if near best
+    gap_to_best = (new_quality - best_quality) / (best_quality + 1e-6)
+    quality_bonus = 10.0 if gap_to_best < 0.01 else 0.0
+    
+    # Speed penalty (encourage fewer iterations)
+    return improvement * 100 - 0.1 + quality_bonus
+
+
+if HAS_NUMBA:
+    # Compile (or load from cache) at import so the first real call is fast
+    fractionality_stats(np.zeros(1))
+    branching_reward(0.0, 0.0, 0.0)
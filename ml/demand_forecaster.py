@@ -5,12 +5,16 @@ Specifically designed for Egyptian healthcare patterns.
 
 import torch
 import torch.nn as nn
+import torch.nn.functional as F
 import numpy as np
 import pandas as pd
 from typing import List, Dict, Tuple, Optional
 from datetime import datetime, timedelta
 from sklearn.preprocessing import MinMaxScaler
 import pickle
+import copy
+import inspect
+import os
 
 
 class DemandLSTM(nn.Module):
@@ -49,14 +53,20 @@ class DemandLSTM(nn.Module):
         Forward pass
         x shape: (batch_size, sequence_length, input_size)
         """
-        # LSTM forward
-        lstm_out, _ = self.lstm(x)
+        # LSTM forward (the native fused kernel on CPU and cuDNN on GPU)
+        _, (h_n, _) = self.lstm(x)
         
-        # Take the last output
-        last_output = lstm_out[:, -1, :]
+        # Take the last output: the top layer's final hidden state
+        last_output = h_n[-1]
         
-        # Fully connected layers
-        output = self.fc(last_output)
+        # Fully connected layers; in eval mode dropout is a no-op, so the
+        # head runs as two fused-bias matmuls and an in-place ReLU
+        if self.training:
+            output = self.fc(last_output)
+        else:
+            hidden, out = (layer for layer in self.fc if isinstance(layer, nn.Linear))
+            output = F.linear(F.relu_(F.linear(last_output, hidden.weight, hidden.bias)),
+                              out.weight, out.bias)
         
         return output
 
@@ -67,14 +77,21 @@ class DemandForecaster:
     Predicts required nurses per shift type for future dates.
     """
     
-    def __init__(self, sequence_length: int = 14, device: str = "cpu"):
+    def __init__(self, sequence_length: int = 14, device: str = "cpu",
+                 compile_model: bool = False, inference_dtype: torch.dtype = torch.float32):
         """
         Args:
             sequence_length: Number of historical days to use for prediction
             device: 'cpu' or 'cuda'
+            compile_model: Run predictions through torch.compile
+                (mode="reduce-overhead"), compiled and warmed up here
+            inference_dtype: Dtype predictions run in (e.g. torch.bfloat16);
+                training always runs in float32
         """
         self.sequence_length = sequence_length
         self.device = torch.device(device)
+        self.compile_model = compile_model
+        self.inference_dtype = inference_dtype
         
         # Model
         self.model = DemandLSTM(
@@ -84,12 +101,49 @@ class DemandForecaster:
             output_size=3  # Morning, Afternoon, Night shift demands
         ).to(self.device)
         
+        # Eager CUDA inference replays a captured CUDA graph per input shape
+        # (compiled "reduce-overhead" models already use CUDA graphs)
+        self.use_cuda_graphs = self.device.type == 'cuda' and not compile_model
+        self._cuda_graphs: Dict[Tuple[int, ...], Tuple[torch.cuda.CUDAGraph, torch.Tensor, torch.Tensor]] = {}
+        self._cuda_graph_pool = None
+        
+        # Model used by predict(), see _refresh_inference_model()
+        self._refresh_inference_model()
+        
+        # prepare_features() results by date ordinal
+        self._feature_cache: Dict[int, np.ndarray] = {}
+        
+        # Pinned host staging buffers for CUDA transfers, by direction
+        self._pinned: Dict[str, torch.Tensor] = {}
+        
         # Scalers
         self.feature_scaler = MinMaxScaler()
         self.target_scaler = MinMaxScaler()
         
         self.is_trained = False
     
+    def _refresh_inference_model(self):
+        """
+        Set up the model predict() runs. In float32 it shares parameters
+        with self.model, which training and checkpoints use; any other
+        inference_dtype gets a cast copy, so call this again after the
+        weights change. Compiled models are warmed up here.
+        """
+        model = self.model
+        if self.inference_dtype != torch.float32:
+            model = copy.deepcopy(self.model).to(dtype=self.inference_dtype)
+        model.eval()
+        
+        if self.compile_model:
+            model = torch.compile(model, mode="reduce-overhead")
+            with torch.inference_mode():
+                model(torch.zeros(1, self.sequence_length, 10,
+                                  device=self.device, dtype=self.inference_dtype))
+        
+        self.inference_model = model
+        self._cuda_graphs = {}
+        self._cuda_graph_pool = None
+    
     def prepare_features(self, date: datetime, 
                         historical_data: Optional[pd.DataFrame] = None) -> np.ndarray:
         """
@@ -104,30 +158,34 @@ class DemandForecaster:
         6. Week of year (normalized)
         7. Month (normalized)
         """
-        features = []
+        # Features depend only on the calendar date (historical_data is
+        # unused), so single-date calls are memoized per day
+        ordinal = date.toordinal()
+        features = self._feature_cache.get(ordinal)
+        if features is None:
+            features = self.prepare_features_batch(pd.DatetimeIndex([date]))[0]
+            self._feature_cache[ordinal] = features
+        return features.copy()
+    
+    def prepare_features_batch(self, dates: pd.DatetimeIndex) -> np.ndarray:
+        """Feature vectors (see prepare_features) for many dates, shape (N, 10)"""
+        weekdays = dates.weekday.to_numpy()
+        
+        features = np.zeros((len(dates), 10))
         
         # Day of week (one-hot)
-        day_of_week = date.weekday()
-        day_one_hot = [1 if i == day_of_week else 0 for i in range(7)]
-        features.extend(day_one_hot)
+        features[:, :7] = np.eye(7)[weekdays]
         
         # Is weekend (Friday in Egypt)
-        is_weekend = 1 if day_of_week == 4 else 0  # Friday
-        features.append(is_weekend)
+        features[:, 7] = weekdays == 4
         
         # Week of year (normalized)
-        week_of_year = date.isocalendar()[1] / 52.0
-        features.append(week_of_year)
+        features[:, 8] = dates.isocalendar().week.to_numpy(dtype=np.float64) / 52.0
         
         # Month (normalized)
-        month_normalized = date.month / 12.0
-        features.append(month_normalized)
-        
-        # If we have 10 features, pad or trim
-        while len(features) < 10:
-            features.append(0)
+        features[:, 9] = dates.month.to_numpy() / 12.0
         
-        return np.array(features[:10])
+        return features.astype(np.float32)
     
     def create_sequences(self, data: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
         """
@@ -140,31 +198,25 @@ class DemandForecaster:
             X: sequences of features (N, sequence_length, input_size)
             y: target demands (N, 3)
         """
-        X, y = [], []
-        
         # Sort by date
         data = data.sort_values('date').reset_index(drop=True)
         
-        for i in range(len(data) - self.sequence_length):
-            # Get sequence of features
-            sequence_dates = data.iloc[i:i + self.sequence_length]['date']
-            sequence_features = [
-                self.prepare_features(date) 
-                for date in sequence_dates
-            ]
-            
-            # Get target (next day's demand)
-            target_row = data.iloc[i + self.sequence_length]
-            target = [
-                target_row['morning_demand'],
-                target_row['afternoon_demand'],
-                target_row['night_demand']
-            ]
-            
-            X.append(sequence_features)
-            y.append(target)
+        # Features are computed once per date; each sequence is a window
+        # over them ending the day before its target
+        features = self.prepare_features_batch(pd.DatetimeIndex(data['date']))
+        num_sequences = max(len(data) - self.sequence_length, 0)
+        if num_sequences == 0:
+            return (np.empty((0, self.sequence_length, features.shape[1]), dtype=np.float32),
+                    np.empty((0, 3)))
         
-        return np.array(X), np.array(y)
+        X = np.lib.stride_tricks.sliding_window_view(
+            features, self.sequence_length, axis=0
+        )[:num_sequences].transpose(0, 2, 1)
+        
+        # Target: next day's demand
+        y = data[['morning_demand', 'afternoon_demand', 'night_demand']].to_numpy()[self.sequence_length:]
+        
+        return X.copy(), y
     
     def train(self, historical_data: pd.DataFrame, 
               epochs: int = 100, batch_size: int = 32, 
@@ -183,7 +235,8 @@ class DemandForecaster:
         # Create sequences
         X, y = self.create_sequences(historical_data)
         
-        # Scale targets
+        # Scale features (per day, across all sequences) and targets
+        X = self.feature_scaler.fit_transform(X.reshape(-1, X.shape[-1])).reshape(X.shape)
         y = self.target_scaler.fit_transform(y)
         
         # Split train/validation
@@ -191,11 +244,18 @@ class DemandForecaster:
         X_train, X_val = X[:split_idx], X[split_idx:]
         y_train, y_val = y[:split_idx], y[split_idx:]
         
-        # Convert to tensors
-        X_train = torch.FloatTensor(X_train).to(self.device)
-        y_train = torch.FloatTensor(y_train).to(self.device)
-        X_val = torch.FloatTensor(X_val).to(self.device)
-        y_val = torch.FloatTensor(y_val).to(self.device)
+        # Convert to tensors, kept on the device for the whole run so each
+        # minibatch is an index gather rather than a host-to-device copy;
+        # on CUDA the one upload goes through pinned memory asynchronously
+        pin = self.device.type == 'cuda'
+        X_train, y_train, X_val, y_val = (
+            torch.from_numpy(np.ascontiguousarray(a, dtype=np.float32))
+            for a in (X_train, y_train, X_val, y_val)
+        )
+        X_train, y_train, X_val, y_val = (
+            t.pin_memory().to(self.device, non_blocking=True) if pin else t.to(self.device)
+            for t in (X_train, y_train, X_val, y_val)
+        )
         
         # Training setup
         criterion = nn.MSELoss()
@@ -204,28 +264,41 @@ class DemandForecaster:
             optimizer, mode='min', factor=0.5, patience=10
         )
         
+        # Mixed precision on CUDA: bfloat16 where supported, else float16
+        # with loss scaling
+        use_amp = self.device.type == 'cuda'
+        amp_dtype = torch.bfloat16 if use_amp and torch.cuda.is_bf16_supported() else torch.float16
+        grad_scaler = _cuda_grad_scaler(enabled=use_amp and amp_dtype == torch.float16)
+        
         # Training loop
         best_val_loss = float('inf')
+        best_state = None
         train_losses, val_losses = [], []
         
         for epoch in range(epochs):
             # Training
             self.model.train()
-            train_loss = 0.0
+            batch_losses = []
             
+            # Minibatches in a fresh random order each epoch
+            perm = torch.randperm(len(X_train), device=self.device)
             for i in range(0, len(X_train), batch_size):
-                batch_X = X_train[i:i + batch_size]
-                batch_y = y_train[i:i + batch_size]
+                idx = perm[i:i + batch_size]
+                batch_X = X_train[idx]
+                batch_y = y_train[idx]
                 
-                optimizer.zero_grad()
-                outputs = self.model(batch_X)
-                loss = criterion(outputs, batch_y)
-                loss.backward()
-                optimizer.step()
+                optimizer.zero_grad(set_to_none=True)
+                with torch.autocast(device_type=self.device.type, dtype=amp_dtype, enabled=use_amp):
+                    outputs = self.model(batch_X)
+                    loss = criterion(outputs.float(), batch_y)
+                grad_scaler.scale(loss).backward()
+                grad_scaler.step(optimizer)
+                grad_scaler.update()
                 
-                train_loss += loss.item()
+                batch_losses.append(loss.detach())
             
-            train_loss /= (len(X_train) / batch_size)
+            # One device sync per epoch rather than one per batch
+            train_loss = torch.stack(batch_losses).sum().item() / (len(X_train) / batch_size)
             train_losses.append(train_loss)
             
             # Validation
@@ -238,16 +311,22 @@ class DemandForecaster:
             # Learning rate scheduling
             scheduler.step(val_loss)
             
-            # Save best model
+            # Keep the best weights in memory; written once after training
             if val_loss < best_val_loss:
                 best_val_loss = val_loss
-                torch.save(self.model.state_dict(), 'best_demand_model.pth')
+                best_state = {k: v.detach().clone() for k, v in self.model.state_dict().items()}
             
             if (epoch + 1) % 10 == 0:
                 print(f"Epoch {epoch+1}/{epochs} - "
                       f"Train Loss: {train_loss:.4f}, Val Loss: {val_loss:.4f}")
         
+        if best_state is not None:
+            torch.save(best_state, 'best_demand_model.pth')
+            self.model.load_state_dict(best_state)
+        
         self.is_trained = True
+        if self.inference_dtype != torch.float32:
+            self._refresh_inference_model()
         print(f"Training completed. Best validation loss: {best_val_loss:.4f}")
         
         return train_losses, val_losses
@@ -269,127 +348,212 @@ class DemandForecaster:
             # Return default demands if not trained
             return self._default_predictions(start_date, num_days)
         
-        self.model.eval()
-        predictions = {}
+        # No eval() here: the inference model is put in eval mode by
+        # _refresh_inference_model() and training ends each epoch in eval
+        if num_days <= 0:
+            return {}
+        
+        # Features depend only on the calendar, so every day's input
+        # sequence (the sequence_length days before it) is a window over
+        # one feature matrix and all days run in a single forward pass
+        feature_dates = pd.date_range(
+            start_date - timedelta(days=self.sequence_length),
+            periods=num_days + self.sequence_length - 1, freq='D'
+        )
+        features = self.prepare_features_batch(feature_dates)
+        if hasattr(self.feature_scaler, 'scale_'):  # Unfitted in checkpoints from before feature scaling
+            features = self.feature_scaler.transform(features).astype(np.float32)
+        sequences = np.lib.stride_tricks.sliding_window_view(
+            features, self.sequence_length, axis=0
+        ).transpose(0, 2, 1)
+        
+        with torch.inference_mode():
+            sequence_tensor = self._to_device(sequences)
+            if self.use_cuda_graphs:
+                output = self._replay_cuda_graph(sequence_tensor)
+            else:
+                output = self.inference_model(sequence_tensor)
+            output_np = self._to_host(output)
         
-        with torch.no_grad():
-            current_date = start_date
-            
-            for _ in range(num_days):
-                # Prepare sequence
-                sequence = []
-                for i in range(self.sequence_length):
-                    seq_date = current_date - timedelta(days=self.sequence_length - i)
-                    features = self.prepare_features(seq_date, historical_data)
-                    sequence.append(features)
-                
-                # Convert to tensor
-                sequence_tensor = torch.FloatTensor([sequence]).to(self.device)
-                
-                # Predict
-                output = self.model(sequence_tensor)
-                output_np = output.cpu().numpy()
-                
-                # Inverse transform
-                output_scaled = self.target_scaler.inverse_transform(output_np)[0]
-                
-                # Round to integers
-                morning_demand = max(1, int(round(output_scaled[0])))
-                afternoon_demand = max(1, int(round(output_scaled[1])))
-                night_demand = max(1, int(round(output_scaled[2])))
-                
-                predictions[current_date] = {
-                    'morning': morning_demand,
-                    'afternoon': afternoon_demand,
-                    'night': night_demand
-                }
-                
-                current_date += timedelta(days=1)
+        # Inverse transform, then round to integers (at least one nurse)
+        output_scaled = self.target_scaler.inverse_transform(output_np)
+        demands = np.maximum(np.rint(output_scaled).astype(np.int32), 1).tolist()
+        
+        dates = [start_date + timedelta(days=day) for day in range(num_days)]
+        predictions = dict(zip(dates, [
+            {'morning': morning, 'afternoon': afternoon, 'night': night}
+            for morning, afternoon, night in demands
+        ]))
         
         return predictions
     
+    def _pinned_buffer(self, name: str, shape: Tuple[int, ...]) -> torch.Tensor:
+        """Pinned host tensor of this shape, reused while the shape holds"""
+        buffer = self._pinned.get(name)
+        if buffer is None or tuple(buffer.shape) != shape:
+            buffer = torch.empty(shape, pin_memory=True)
+            self._pinned[name] = buffer
+        return buffer
+    
+    def _to_device(self, array: np.ndarray) -> torch.Tensor:
+        """Model input tensor; on CUDA staged through pinned memory asynchronously"""
+        if self.device.type != 'cuda':
+            return torch.from_numpy(np.array(array, dtype=np.float32)).to(self.device, self.inference_dtype)
+        
+        staging = self._pinned_buffer('in', array.shape)
+        staging.numpy()[:] = array
+        return staging.to(self.device, self.inference_dtype, non_blocking=True)
+    
+    def _to_host(self, output: torch.Tensor) -> np.ndarray:
+        """Model output as numpy; on CUDA one pinned copy and one sync"""
+        if self.device.type != 'cuda':
+            return output.float().cpu().numpy()
+        
+        staging = self._pinned_buffer('out', tuple(output.shape))
+        staging.copy_(output, non_blocking=True)  # Casts back to float32
+        torch.cuda.current_stream(self.device).synchronize()
+        return staging.numpy().copy()
+    
+    def _build_cuda_graph(self, shape: Tuple[int, ...]):
+        """
+        Capture an eval-mode forward pass for inputs of this shape. Graphs
+        share one memory pool; parameters are read in place, so training
+        and load() stay visible to the captured graph.
+        """
+        static_in = torch.zeros(shape, device=self.device, dtype=self.inference_dtype)
+        
+        # Warm up on a side stream before capture
+        side_stream = torch.cuda.Stream()
+        side_stream.wait_stream(torch.cuda.current_stream())
+        with torch.cuda.stream(side_stream), torch.inference_mode():
+            for _ in range(3):
+                self.inference_model(static_in)
+        torch.cuda.current_stream().wait_stream(side_stream)
+        
+        graph = torch.cuda.CUDAGraph()
+        with torch.inference_mode(), torch.cuda.graph(graph, pool=self._cuda_graph_pool):
+            static_out = self.inference_model(static_in)
+        self._cuda_graph_pool = graph.pool()
+        self._cuda_graphs[shape] = (graph, static_in, static_out)
+    
+    def _replay_cuda_graph(self, x: torch.Tensor) -> torch.Tensor:
+        """Eval-mode forward pass through the CUDA graph captured for x's shape"""
+        shape = tuple(x.shape)
+        if shape not in self._cuda_graphs:
+            self._build_cuda_graph(shape)
+        graph, static_in, static_out = self._cuda_graphs[shape]
+        static_in.copy_(x)
+        graph.replay()
+        return static_out
+    
     def _default_predictions(self, start_date: datetime, num_days: int) -> Dict[datetime, Dict[str, int]]:
         """Provide default predictions when model is not trained"""
-        predictions = {}
-        current_date = start_date
+        dates = [start_date + timedelta(days=day) for day in range(max(num_days, 0))]
         
-        for _ in range(num_days):
-            # Simple heuristic: higher demand on weekdays, lower on weekends
-            day_of_week = current_date.weekday()
-            
-            if day_of_week in [4, 5]:  # Friday, Saturday in Egypt
-                base_demand = 3
-            else:
-                base_demand = 5
-            
-            predictions[current_date] = {
-                'morning': base_demand + 1,
-                'afternoon': base_demand,
-                'night': base_demand - 1
-            }
-            
-            current_date += timedelta(days=1)
+        # Simple heuristic: higher demand on weekdays, lower on weekends
+        day_of_week = (start_date.weekday() + np.arange(len(dates))) % 7
+        base_demand = np.where(np.isin(day_of_week, [4, 5]), 3, 5).tolist()  # Friday, Saturday in Egypt
+        
+        predictions = dict(zip(dates, [
+            {'morning': base + 1, 'afternoon': base, 'night': base - 1}
+            for base in base_demand
+        ]))
         
         return predictions
     
     def save(self, path: str):
-        """Save model and scalers"""
+        """
+        Save model and scalers. The checkpoint at path holds only tensors
+        and plain values (loadable with weights_only=True and mmap); the
+        scalers' fitted arrays go to path + '.scalers.npz'.
+        """
         checkpoint = {
             'model_state': self.model.state_dict(),
-            'feature_scaler': self.feature_scaler,
-            'target_scaler': self.target_scaler,
             'sequence_length': self.sequence_length,
             'is_trained': self.is_trained
         }
         torch.save(checkpoint, path)
+        
+        scalers = {}
+        for prefix, scaler in (('feature', self.feature_scaler), ('target', self.target_scaler)):
+            if hasattr(scaler, 'scale_'):
+                for attr in _SCALER_ATTRS:
+                    scalers[f'{prefix}_{attr}'] = np.asarray(getattr(scaler, attr))
+        np.savez(path + '.scalers.npz', **scalers)
         print(f"Model saved to {path}")
     
     def load(self, path: str):
         """Load model and scalers"""
-        checkpoint = torch.load(path, map_location=self.device)
+        scalers_path = path + '.scalers.npz'
+        if os.path.exists(scalers_path):
+            load_kwargs = {'mmap': True} if _TORCH_LOAD_MMAP else {}
+            checkpoint = torch.load(path, map_location=self.device, weights_only=True, **load_kwargs)
+            with np.load(scalers_path) as scalers:
+                self.feature_scaler = _load_scaler(scalers, 'feature')
+                self.target_scaler = _load_scaler(scalers, 'target')
+        else:
+            # Older checkpoints pickle the scalers inside the checkpoint
+            checkpoint = torch.load(path, map_location=self.device, weights_only=False)
+            self.feature_scaler = checkpoint['feature_scaler']
+            self.target_scaler = checkpoint['target_scaler']
+        
         self.model.load_state_dict(checkpoint['model_state'])
-        self.feature_scaler = checkpoint['feature_scaler']
-        self.target_scaler = checkpoint['target_scaler']
         self.sequence_length = checkpoint['sequence_length']
         self.is_trained = checkpoint['is_trained']
+        if self.inference_dtype != torch.float32:
+            self._refresh_inference_model()
         print(f"Model loaded from {path}")
 
 
+# torch.load gained mmap= in torch 2.1; older versions read the file eagerly
+_TORCH_LOAD_MMAP = 'mmap' in inspect.signature(torch.load).parameters
+
+
+def _cuda_grad_scaler(enabled: bool):
+    """CUDA GradScaler; torch.amp.GradScaler is torch 2.3+, older versions use torch.cuda.amp"""
+    if hasattr(torch.amp, 'GradScaler'):
+        return torch.amp.GradScaler('cuda', enabled=enabled)
+    return torch.cuda.amp.GradScaler(enabled=enabled)
+
+
+# Fitted MinMaxScaler state saved alongside forecaster checkpoints
+_SCALER_ATTRS = ('min_', 'scale_', 'data_min_', 'data_max_', 'data_range_',
+                 'n_samples_seen_', 'n_features_in_')
+
+
+def _load_scaler(scalers, prefix: str) -> MinMaxScaler:
+    """MinMaxScaler restored from save()'s arrays (unfitted if none were saved)"""
+    scaler = MinMaxScaler()
+    if f'{prefix}_scale_' in scalers:
+        for attr in _SCALER_ATTRS:
+            value = scalers[f'{prefix}_{attr}']
+            setattr(scaler, attr, value if value.ndim else value.item())
+    return scaler
+
 def generate_sample_data(num_days: int = 365) -> pd.DataFrame:
     """
     Generate sample historical data for testing.
     Simulates Egyptian hospital patterns.
     """
-    dates = [datetime.now() - timedelta(days=i) for i in range(num_days, 0, -1)]
-    data = []
+    dates = pd.date_range(end=datetime.now() - timedelta(days=1), periods=num_days, freq='D')
     
-    for date in dates:
-        day_of_week = date.weekday()
-        
-        # Base demands
-        if day_of_week in [4, 5]:  # Weekend in Egypt
-            morning = np.random.randint(3, 5)
-            afternoon = np.random.randint(2, 4)
-            night = np.random.randint(2, 3)
-        else:
-            morning = np.random.randint(5, 8)
-            afternoon = np.random.randint(4, 7)
-            night = np.random.randint(3, 5)
-        
-        # Add seasonal variation
-        month = date.month
-        if month in [6, 7, 8]:  # Summer - potentially higher demand
-            morning += 1
-            afternoon += 1
-        
-        data.append({
-            'date': date,
-            'morning_demand': morning,
-            'afternoon_demand': afternoon,
-            'night_demand': night
-        })
+    # Base demands: [low, high) bounds per day
+    is_weekend = np.isin(dates.weekday, [4, 5])  # Weekend in Egypt
+    morning = np.random.randint(np.where(is_weekend, 3, 5), np.where(is_weekend, 5, 8))
+    afternoon = np.random.randint(np.where(is_weekend, 2, 4), np.where(is_weekend, 4, 7))
+    night = np.random.randint(np.where(is_weekend, 2, 3), np.where(is_weekend, 3, 5))
+    
+    # Add seasonal variation
+    summer = np.isin(dates.month, [6, 7, 8])  # Summer - potentially higher demand
+    morning += summer
+    afternoon += summer
     
-    return pd.DataFrame(data)
+    return pd.DataFrame({
+        'date': dates,
+        'morning_demand': morning,
+        'afternoon_demand': afternoon,
+        'night_demand': night
+    })
 
 
 if __name__ == "__main__":
@@ -12,6 +12,10 @@ from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import LabelEncoder
 from sklearn.metrics import mean_squared_error, r2_score
 import pickle
+import json
+import os
+
+from ml import _fatigue_kernels as fatigue_kernels
 
 
 class FatiguePredictor:
@@ -29,6 +33,14 @@ class FatiguePredictor:
         self.feature_names = []
         self.is_trained = False
         self.label_encoders = {}
+        
+        # extract_features() results by nurse_id: (history_version, features)
+        self._feature_cache: Dict[str, Tuple[object, Dict]] = {}
+        
+        # Prediction state, see _cache_boosters()
+        self._boosters = []
+        self._feature_index = {}
+        self._feature_row = None
     
     def extract_features(self, nurse_history: Dict) -> Dict:
         """
@@ -41,56 +53,82 @@ class FatiguePredictor:
                 - shifts_last_month: List[Dict]
                 - personal_info: Dict (age, experience, etc.)
                 - preferences: Dict
+                - history_version: optional; bumped by the caller whenever
+                  the nurse's history changes. Histories with a nurse_id
+                  and a history_version are memoized per nurse.
         
         Returns:
             Dictionary of features
         """
+        nurse_id = nurse_history.get('nurse_id')
+        version = nurse_history.get('history_version')
+        if nurse_id is None or version is None:
+            return self._extract_features(nurse_history)
+        
+        cached = self._feature_cache.get(nurse_id)
+        if cached is None or cached[0] != version:
+            cached = (version, self._extract_features(nurse_history))
+            self._feature_cache[nurse_id] = cached
+        return dict(cached[1])
+    
+    def _extract_features(self, nurse_history: Dict) -> Dict:
+        """extract_features() without memoization"""
         features = {}
         
         # Work intensity features
         last_week_shifts = nurse_history.get('shifts_last_week', [])
         last_month_shifts = nurse_history.get('shifts_last_month', [])
+        prefs = nurse_history.get('preferences', {})
+        preferred_shifts = set(prefs.get('preferred_shifts', []))
+        avoided_shifts = set(prefs.get('avoided_shifts', []))
+        
+        # One pass over last week's shifts gathers everything the
+        # week features need
+        hours_week = 0
+        night_shifts_week = 0
+        matches = 0
+        dates = []
+        type_codes = {}
+        shift_codes = []
+        for s in last_week_shifts:
+            shift_type = s.get('shift_type')
+            hours_week += s.get('duration', 0)
+            dates.append(s['date'])
+            shift_codes.append(type_codes.setdefault(s.get('shift_type', 'unknown'), len(type_codes)))
+            if shift_type == 'night':
+                night_shifts_week += 1
+            if shift_type in preferred_shifts:
+                matches += 1
+            elif shift_type in avoided_shifts:
+                matches -= 1
+        
+        hours_month = 0
+        weekend_shifts_month = 0
+        for s in last_month_shifts:
+            hours_month += s.get('duration', 0)
+            if s['date'].weekday() in (4, 5):  # Friday, Saturday
+                weekend_shifts_month += 1
         
         # Hours worked
-        features['hours_last_week'] = sum(
-            s.get('duration', 0) for s in last_week_shifts
-        )
-        features['hours_last_month'] = sum(
-            s.get('duration', 0) for s in last_month_shifts
-        )
+        features['hours_last_week'] = hours_week
+        features['hours_last_month'] = hours_month
+        
+        # Dates as sorted int64 microseconds
+        dates_us = np.sort(np.array(dates, dtype='datetime64[us]').view(np.int64))
         
         # Consecutive working days
-        if last_week_shifts:
-            dates = sorted([s['date'] for s in last_week_shifts])
-            consecutive = 1
-            max_consecutive = 1
-            for i in range(1, len(dates)):
-                if (dates[i] - dates[i-1]).days == 1:
-                    consecutive += 1
-                    max_consecutive = max(max_consecutive, consecutive)
-                else:
-                    consecutive = 1
-            features['max_consecutive_days'] = max_consecutive
-        else:
-            features['max_consecutive_days'] = 0
+        features['max_consecutive_days'] = int(fatigue_kernels.max_consecutive_days(
+            np.zeros(len(dates_us), dtype=np.intp), dates_us, 1
+        )[0])
         
         # Shift pattern features
-        night_shifts_week = sum(
-            1 for s in last_week_shifts 
-            if s.get('shift_type') == 'night'
-        )
         features['night_shifts_last_week'] = night_shifts_week
-        
-        weekend_shifts_month = sum(
-            1 for s in last_month_shifts
-            if s['date'].weekday() in [4, 5]  # Friday, Saturday
-        )
         features['weekend_shifts_last_month'] = weekend_shifts_month
         
         # Days since last rest
-        if last_week_shifts:
-            last_shift_date = max(s['date'] for s in last_week_shifts)
-            features['days_since_last_rest'] = (datetime.now() - last_shift_date).days
+        if len(dates_us):
+            now_us = int(np.datetime64(datetime.now(), 'us').view(np.int64))
+            features['days_since_last_rest'] = (now_us - int(dates_us[-1])) // fatigue_kernels.DAY_US
         else:
             features['days_since_last_rest'] = 7
         
@@ -101,9 +139,9 @@ class FatiguePredictor:
         features['has_children'] = 1 if personal.get('has_children', False) else 0
         
         # Preference matching
-        prefs = nurse_history.get('preferences', {})
-        features['preference_match_rate'] = self._calculate_preference_match(
-            last_week_shifts, prefs
+        n_week = len(last_week_shifts)
+        features['preference_match_rate'] = (
+            max(0, min(1, (matches + n_week) / (2 * n_week))) if n_week else 1.0
         )
         
         # Workload vs capacity
@@ -111,49 +149,135 @@ class FatiguePredictor:
         features['workload_ratio'] = features['hours_last_week'] / max_hours
         
         # Shift variety (entropy of shift types)
-        shift_types = [s.get('shift_type', 'unknown') for s in last_week_shifts]
-        features['shift_variety'] = self._calculate_entropy(shift_types)
+        features['shift_variety'] = self._calculate_entropy(shift_codes)
         
         return features
     
-    def _calculate_preference_match(self, shifts: List[Dict], 
-                                    preferences: Dict) -> float:
-        """Calculate how well shifts match nurse preferences"""
-        if not shifts:
-            return 1.0
+    def extract_features_batch(self, nurse_histories: List[Dict]) -> pd.DataFrame:
+        """extract_features() for many histories, one row per history"""
+        return pd.DataFrame(self._feature_columns(nurse_histories))
+    
+    def _feature_columns(self, nurse_histories: List[Dict]) -> Dict[str, np.ndarray]:
+        """
+        Feature columns for many histories, keyed by feature name.
+        Shifts from every history are flattened into parallel arrays
+        tagged with their row, so each feature is one NumPy pass.
+        """
+        n = len(nurse_histories)
+        
+        # Flatten shifts (last week: row, hours, date, type code, preference match)
+        week_row, week_hours, week_date, week_type, week_match = [], [], [], [], []
+        month_row, month_hours, month_date = [], [], []
+        type_codes = {}
+        ages, experience, has_children, max_hours = [], [], [], []
+        for row, history in enumerate(nurse_histories):
+            prefs = history.get('preferences', {})
+            preferred_shifts = set(prefs.get('preferred_shifts', []))
+            avoided_shifts = set(prefs.get('avoided_shifts', []))
+            
+            for shift in history.get('shifts_last_week', []):
+                shift_type = shift.get('shift_type')
+                week_row.append(row)
+                week_hours.append(shift.get('duration', 0))
+                week_date.append(shift['date'])
+                week_type.append(type_codes.setdefault(
+                    shift.get('shift_type', 'unknown'), len(type_codes)
+                ))
+                if shift_type in preferred_shifts:
+                    week_match.append(1)
+                elif shift_type in avoided_shifts:
+                    week_match.append(-1)
+                else:
+                    week_match.append(0)
+            
+            for shift in history.get('shifts_last_month', []):
+                month_row.append(row)
+                month_hours.append(shift.get('duration', 0))
+                month_date.append(shift['date'])
+            
+            personal = history.get('personal_info', {})
+            ages.append(personal.get('age', 30))
+            experience.append(personal.get('experience', 5))
+            has_children.append(1 if personal.get('has_children', False) else 0)
+            max_hours.append(personal.get('max_hours_per_week', 48))
+        
+        week_row = np.array(week_row, dtype=np.intp)
+        week_us = np.array(week_date, dtype='datetime64[us]').view(np.int64)
+        week_type = np.array(week_type, dtype=np.intp)
+        month_row = np.array(month_row, dtype=np.intp)
+        month_us = np.array(month_date, dtype='datetime64[us]').view(np.int64)
+        week_counts = np.bincount(week_row, minlength=n)
         
-        preferred_shifts = set(preferences.get('preferred_shifts', []))
-        avoided_shifts = set(preferences.get('avoided_shifts', []))
+        # Hours worked
+        hours_last_week = np.bincount(week_row, weights=np.array(week_hours, dtype=float), minlength=n)
+        hours_last_month = np.bincount(month_row, weights=np.array(month_hours, dtype=float), minlength=n)
         
-        matches = 0
-        for shift in shifts:
-            shift_type = shift.get('shift_type')
-            if shift_type in preferred_shifts:
-                matches += 1
-            elif shift_type in avoided_shifts:
-                matches -= 1
+        # Consecutive working days (shifts sorted by date within each row)
+        order = np.lexsort((week_us, week_row))
+        max_consecutive_days = fatigue_kernels.max_consecutive_days(
+            week_row[order], week_us[order], n
+        )
+        
+        # Shift pattern features
+        night_code = type_codes.get('night', -1)
+        night_shifts_last_week = np.bincount(week_row[week_type == night_code], minlength=n)
+        weekday = (month_us // fatigue_kernels.DAY_US + 3) % 7  # 1970-01-01 was a Thursday
+        weekend_shifts_last_month = np.bincount(
+            month_row[(weekday == 4) | (weekday == 5)], minlength=n  # Friday, Saturday
+        )
+        
+        # Days since last rest
+        last_shift_us = np.full(n, np.iinfo(np.int64).min)
+        np.maximum.at(last_shift_us, week_row, week_us)
+        now_us = np.datetime64(datetime.now(), 'us').view(np.int64)
+        days_since_last_rest = np.where(
+            week_counts > 0, (now_us - last_shift_us) // fatigue_kernels.DAY_US, 7
+        )
         
-        return max(0, min(1, (matches + len(shifts)) / (2 * len(shifts))))
+        # Preference matching
+        matches = np.bincount(week_row, weights=np.array(week_match, dtype=float), minlength=n)
+        preference_match_rate = (matches + week_counts) / (2 * np.maximum(week_counts, 1))
+        np.clip(preference_match_rate, 0, 1, out=preference_match_rate)
+        preference_match_rate[week_counts == 0] = 1.0
+        
+        # Shift variety (entropy of shift types)
+        shift_variety = fatigue_kernels.shift_entropy(week_row, week_type, n, len(type_codes))
+        
+        return {
+            'hours_last_week': hours_last_week,
+            'hours_last_month': hours_last_month,
+            'max_consecutive_days': max_consecutive_days,
+            'night_shifts_last_week': night_shifts_last_week,
+            'weekend_shifts_last_month': weekend_shifts_last_month,
+            'days_since_last_rest': days_since_last_rest,
+            'age': np.array(ages),
+            'years_experience': np.array(experience),
+            'has_children': np.array(has_children),
+            'preference_match_rate': preference_match_rate,
+            'workload_ratio': hours_last_week / np.array(max_hours, dtype=float),
+            'shift_variety': shift_variety
+        }
+    
+    def _feature_matrix(self, columns: Dict[str, np.ndarray], n: int) -> np.ndarray:
+        """float32 (n, features) matrix of feature columns in feature_names order"""
+        X = np.empty((n, len(self.feature_names)), dtype=np.float32)
+        for j, name in enumerate(self.feature_names):
+            X[:, j] = columns[name]
+        return X
     
     def _calculate_entropy(self, items: List) -> float:
         """Calculate Shannon entropy of a list"""
         if not items:
             return 0.0
         
-        from collections import Counter
-        counts = Counter(items)
-        total = len(items)
-        
-        entropy = 0
-        for count in counts.values():
-            if count > 0:
-                p = count / total
-                entropy -= p * np.log2(p)
-        
-        return entropy
+        codes = {}
+        type_code = np.array([codes.setdefault(item, len(codes)) for item in items], dtype=np.intp)
+        return float(fatigue_kernels.shift_entropy(
+            np.zeros(len(items), dtype=np.intp), type_code, 1, len(codes)
+        )[0])
     
     def prepare_training_data(self, 
-                             historical_records: List[Dict]) -> Tuple[pd.DataFrame, np.ndarray, np.ndarray]:
+                             historical_records: List[Dict]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
         """
         Prepare training data from historical records.
         
@@ -164,22 +288,18 @@ class FatiguePredictor:
                 - emotional_fatigue: float (0-1)
         
         Returns:
-            X: Feature DataFrame
+            X: float32 feature matrix, columns in self.feature_names order
             y_physical: Physical fatigue scores
             y_emotional: Emotional fatigue scores
         """
-        features_list = []
-        physical_fatigue = []
-        emotional_fatigue = []
-        
-        for record in historical_records:
-            features = self.extract_features(record['nurse_history'])
-            features_list.append(features)
-            physical_fatigue.append(record.get('physical_fatigue', 0))
-            emotional_fatigue.append(record.get('emotional_fatigue', 0))
+        columns = self._feature_columns(
+            [record['nurse_history'] for record in historical_records]
+        )
+        physical_fatigue = [record.get('physical_fatigue', 0) for record in historical_records]
+        emotional_fatigue = [record.get('emotional_fatigue', 0) for record in historical_records]
         
-        X = pd.DataFrame(features_list)
-        self.feature_names = X.columns.tolist()
+        self.feature_names = list(columns)
+        X = self._feature_matrix(columns, len(historical_records))
         
         return X, np.array(physical_fatigue), np.array(emotional_fatigue)
     
@@ -210,7 +330,12 @@ class FatiguePredictor:
             'subsample': 0.8,
             'colsample_bytree': 0.8,
             'random_state': random_state,
-            'eval_metric': 'rmse'
+            'eval_metric': 'rmse',
+            'early_stopping_rounds': 20,
+            # Histogram trees over 64 bins: features quantized to one byte
+            'tree_method': 'hist',
+            'max_bin': 64,
+            'n_jobs': -1
         }
         
         # Train physical fatigue model
@@ -219,7 +344,6 @@ class FatiguePredictor:
         self.physical_model.fit(
             X_train, y_phys_train,
             eval_set=[(X_test, y_phys_test)],
-            early_stopping_rounds=20,
             verbose=False
         )
         
@@ -235,7 +359,6 @@ class FatiguePredictor:
         self.emotional_model.fit(
             X_train, y_emot_train,
             eval_set=[(X_test, y_emot_test)],
-            early_stopping_rounds=20,
             verbose=False
         )
         
@@ -246,6 +369,7 @@ class FatiguePredictor:
         print(f"Emotional Fatigue - RMSE: {emot_rmse:.4f}, R²: {emot_r2:.4f}")
         
         self.is_trained = True
+        self._cache_boosters()
         print("\nTraining completed successfully!")
         
         return {
@@ -263,34 +387,81 @@ class FatiguePredictor:
         Returns:
             Dictionary with physical_fatigue and emotional_fatigue scores (0-1)
         """
+        if not self.is_trained:
+            return self.predict_batch([nurse_history])[0]
+        
+        # Fill the reused input row in feature_names order
+        row = self._feature_row
+        for name, value in self.extract_features(nurse_history).items():
+            row[0, self._feature_index[name]] = value
+        
+        return self._predict_features(row)[0]
+    
+    def predict_batch(self, nurse_histories: List[Dict]) -> List[Dict[str, float]]:
+        """
+        Predict fatigue levels for several nurses with one call per model.
+        
+        Args:
+            nurse_histories: Nurse work histories (as in predict)
+        
+        Returns:
+            One predict()-style dictionary per history, in input order
+        """
         if not self.is_trained:
             # Return default values if not trained
-            return {
-                'physical_fatigue': 0.5,
-                'emotional_fatigue': 0.5,
-                'overall_fatigue': 0.5
-            }
+            return [
+                {
+                    'physical_fatigue': 0.5,
+                    'emotional_fatigue': 0.5,
+                    'overall_fatigue': 0.5
+                }
+                for _ in nurse_histories
+            ]
         
-        # Extract features
-        features = self.extract_features(nurse_history)
-        X = pd.DataFrame([features])[self.feature_names]
+        if not nurse_histories:
+            return []
         
-        # Predict
-        physical = float(self.physical_model.predict(X)[0])
-        emotional = float(self.emotional_model.predict(X)[0])
+        # Extract features
+        X = self._feature_matrix(self._feature_columns(nurse_histories), len(nurse_histories))
         
-        # Clip to [0, 1]
-        physical = max(0, min(1, physical))
-        emotional = max(0, min(1, emotional))
+        return self._predict_features(X)
+    
+    def _cache_boosters(self):
+        """Booster handles and the feature layout predictions use"""
+        self._boosters = [
+            (model.get_booster(), _iteration_range(model))
+            for model in (self.physical_model, self.emotional_model)
+        ]
+        self._feature_index = {name: i for i, name in enumerate(self.feature_names)}
+        self._feature_row = np.zeros((1, len(self.feature_names)), dtype=np.float32)
+    
+    def _predict_features(self, X: np.ndarray) -> List[Dict[str, float]]:
+        """
+        Fatigue predictions for float32 feature rows in feature_names
+        order, straight from the boosters (no DMatrix or DataFrame).
+        """
+        # Predict, clipped to [0, 1] in place
+        physical, emotional = (
+            booster.inplace_predict(
+                X, iteration_range=iteration_range, validate_features=False
+            ).astype(float)
+            for booster, iteration_range in self._boosters
+        )
+        np.clip(physical, 0, 1, out=physical)
+        np.clip(emotional, 0, 1, out=emotional)
         
         # Overall fatigue (weighted average)
-        overall = 0.6 * physical + 0.4 * emotional
+        overall = 0.6 * physical
+        overall += 0.4 * emotional
         
-        return {
-            'physical_fatigue': physical,
-            'emotional_fatigue': emotional,
-            'overall_fatigue': overall
-        }
+        return [
+            {
+                'physical_fatigue': p,
+                'emotional_fatigue': e,
+                'overall_fatigue': o
+            }
+            for p, e, o in zip(physical.tolist(), emotional.tolist(), overall.tolist())
+        ]
     
     def get_feature_importance(self) -> Dict[str, Dict[str, float]]:
         """Get feature importance for both models"""
@@ -317,76 +488,109 @@ class FatiguePredictor:
         if not self.is_trained:
             raise ValueError("Cannot save untrained model")
         
+        # Boosters in XGBoost's own binary format alongside a small JSON file
+        self.physical_model.save_model(path + '.physical.ubj')
+        self.emotional_model.save_model(path + '.emotional.ubj')
         checkpoint = {
-            'physical_model': self.physical_model,
-            'emotional_model': self.emotional_model,
             'feature_names': self.feature_names,
             'is_trained': self.is_trained
         }
         
-        with open(path, 'wb') as f:
-            pickle.dump(checkpoint, f)
+        with open(path, 'w') as f:
+            json.dump(checkpoint, f)
         
         print(f"Models saved to {path}")
     
     def load(self, path: str):
         """Load models"""
-        with open(path, 'rb') as f:
-            checkpoint = pickle.load(f)
+        if os.path.exists(path + '.physical.ubj'):
+            with open(path) as f:
+                checkpoint = json.load(f)
+            self.physical_model = xgb.XGBRegressor()
+            self.physical_model.load_model(path + '.physical.ubj')
+            self.emotional_model = xgb.XGBRegressor()
+            self.emotional_model.load_model(path + '.emotional.ubj')
+        else:
+            # Older checkpoints pickle the XGBRegressor objects
+            with open(path, 'rb') as f:
+                checkpoint = pickle.load(f)
+            self.physical_model = checkpoint['physical_model']
+            self.emotional_model = checkpoint['emotional_model']
         
-        self.physical_model = checkpoint['physical_model']
-        self.emotional_model = checkpoint['emotional_model']
         self.feature_names = checkpoint['feature_names']
         self.is_trained = checkpoint['is_trained']
+        self._cache_boosters()
         
         print(f"Models loaded from {path}")
 
 
+def _iteration_range(model: xgb.XGBRegressor) -> Tuple[int, int]:
+    """Trees XGBRegressor.predict() uses: up to the best one if early stopping ran"""
+    try:
+        return 0, model.best_iteration + 1
+    except AttributeError:
+        return 0, 0  # All trees
+
+
 def generate_sample_fatigue_data(num_samples: int = 1000) -> List[Dict]:
     """Generate synthetic fatigue data for testing"""
-    records = []
+    # Generate random work histories, one draw per column
+    hours_last_week = np.random.uniform(20, 60, num_samples)
+    consecutive_days = np.random.randint(0, 8, num_samples)
+    night_shifts = np.random.randint(0, 5, num_samples)
     
-    for _ in range(num_samples):
-        # Generate random work history
-        hours_last_week = np.random.uniform(20, 60)
-        consecutive_days = np.random.randint(0, 8)
-        night_shifts = np.random.randint(0, 5)
-        
-        # Physical fatigue correlates with hours and consecutive days
-        physical = (
-            0.3 * (hours_last_week / 60) +
-            0.3 * (consecutive_days / 7) +
-            0.2 * (night_shifts / 4) +
-            0.2 * np.random.random()
-        )
-        physical = max(0, min(1, physical))
-        
-        # Emotional fatigue correlates with preference matching and variety
-        preference_match = np.random.random()
-        workload_ratio = hours_last_week / 48
-        
-        emotional = (
-            0.4 * (1 - preference_match) +
-            0.3 * workload_ratio +
-            0.3 * np.random.random()
-        )
-        emotional = max(0, min(1, emotional))
-        
+    # Physical fatigue correlates with hours and consecutive days
+    physical = (
+        0.3 * (hours_last_week / 60) +
+        0.3 * (consecutive_days / 7) +
+        0.2 * (night_shifts / 4) +
+        0.2 * np.random.random(num_samples)
+    )
+    np.clip(physical, 0, 1, out=physical)
+    
+    # Emotional fatigue correlates with preference matching and variety
+    preference_match = np.random.random(num_samples)
+    workload_ratio = hours_last_week / 48
+    
+    emotional = (
+        0.4 * (1 - preference_match) +
+        0.3 * workload_ratio +
+        0.3 * np.random.random(num_samples)
+    )
+    np.clip(emotional, 0, 1, out=emotional)
+    
+    # Shifts for every record drawn together, then split per record
+    shift_counts = (hours_last_week / 8).astype(int)
+    num_shifts = int(shift_counts.sum())
+    durations = np.random.uniform(6, 12, num_shifts).tolist()
+    shift_types = np.random.choice(['morning', 'afternoon', 'night'], num_shifts).tolist()
+    shift_starts = np.concatenate(([0], np.cumsum(shift_counts))).tolist()
+    
+    ages = np.random.randint(25, 55, num_samples).tolist()
+    experience = np.random.randint(1, 20, num_samples).tolist()
+    has_children = np.random.choice([True, False], num_samples).tolist()
+    
+    now = datetime.now()
+    shift_dates = [now - timedelta(days=i) for i in range(int(shift_counts.max(initial=0)))]
+    
+    records = []
+    for k, (physical_k, emotional_k) in enumerate(zip(physical.tolist(), emotional.tolist())):
+        start = shift_starts[k]
         record = {
             'nurse_history': {
                 'shifts_last_week': [
                     {
-                        'date': datetime.now() - timedelta(days=i),
-                        'duration': np.random.uniform(6, 12),
-                        'shift_type': np.random.choice(['morning', 'afternoon', 'night'])
+                        'date': shift_dates[i],
+                        'duration': durations[start + i],
+                        'shift_type': shift_types[start + i]
                     }
-                    for i in range(int(hours_last_week / 8))
+                    for i in range(shift_starts[k + 1] - start)
                 ],
                 'shifts_last_month': [],
                 'personal_info': {
-                    'age': np.random.randint(25, 55),
-                    'experience': np.random.randint(1, 20),
-                    'has_children': np.random.choice([True, False]),
+                    'age': ages[k],
+                    'experience': experience[k],
+                    'has_children': has_children[k],
                     'max_hours_per_week': 48
                 },
                 'preferences': {
@@ -394,8 +598,8 @@ def generate_sample_fatigue_data(num_samples: int = 1000) -> List[Dict]:
                     'avoided_shifts': ['night']
                 }
             },
-            'physical_fatigue': physical,
-            'emotional_fatigue': emotional
+            'physical_fatigue': physical_k,
+            'emotional_fatigue': emotional_k
         }
         
         records.append(record)
@@ -422,7 +626,7 @@ if __name__ == "__main__":
             print(f"  {feat}: {imp:.4f}")
     
     print("\nSaving models...")
-    predictor.save("fatigue_predictor.pkl")
+    predictor.save("fatigue_predictor.json")
     
     print("\nTesting prediction...")
     test_nurse = {
@@ -7,13 +7,16 @@ import torch
 import torch.nn as nn
 import torch.nn.functional as F
 import numpy as np
+import copy
 from typing import List, Dict, Tuple, Optional
 from stable_baselines3 import PPO
-from stable_baselines3.common.vec_env import DummyVecEnv
+from stable_baselines3.common.vec_env import DummyVecEnv, SubprocVecEnv
 from stable_baselines3.common.callbacks import BaseCallback
 import gymnasium as gym
 from gymnasium import spaces
 
+from ml import _rl_kernels as rl_kernels
+
 
 class BranchingNetwork(nn.Module):
     """
@@ -51,6 +54,68 @@ class BranchingNetwork(nn.Module):
         value = self.value_head(features)
         policy_logits = self.policy_head(features)
         return policy_logits, value
+    
+    def fused_for_inference(self) -> torch.jit.ScriptModule:
+        """
+        Frozen TorchScript copy for inference: Dropout removed and each
+        LayerNorm's affine folded into the Linear layer(s) after it.
+        Outputs match eval mode; later weight updates aren't reflected.
+        """
+        return torch.jit.freeze(torch.jit.script(_FusedBranchingNetwork(self).eval()))
+
+
+def _fold_affine(norm: nn.LayerNorm, linear: nn.Linear) -> nn.Linear:
+    """linear(norm(x)) as linear'(normalized x): W' = W diag(gamma), b' = W beta + b"""
+    fused = nn.Linear(linear.in_features, linear.out_features)
+    with torch.no_grad():
+        fused.weight.copy_(linear.weight * norm.weight)
+        fused.bias.copy_(linear.weight @ norm.bias + linear.bias)
+    return fused
+
+
+class _FusedBranchingNetwork(nn.Module):
+    """BranchingNetwork's eval-mode forward pass with LayerNorm affines folded"""
+    
+    def __init__(self, network: BranchingNetwork):
+        super(_FusedBranchingNetwork, self).__init__()
+        linear1, _, norm1, _, linear2, _, norm2 = network.feature_extractor
+        value1, _, value2 = network.value_head
+        policy1, _, policy2 = network.policy_head
+        
+        self.eps1 = norm1.eps
+        self.eps2 = norm2.eps
+        self.linear1 = copy.deepcopy(linear1)
+        self.linear2 = _fold_affine(norm1, linear2)
+        self.value1 = _fold_affine(norm2, value1)
+        self.value2 = copy.deepcopy(value2)
+        self.policy1 = _fold_affine(norm2, policy1)
+        self.policy2 = copy.deepcopy(policy2)
+    
+    def forward(self, state: torch.Tensor) -> Tuple[torch.Tensor, torch.Tensor]:
+        x = F.relu(self.linear1(state))
+        x = F.layer_norm(x, x.shape[-1:], eps=self.eps1)
+        x = F.relu(self.linear2(x))
+        x = F.layer_norm(x, x.shape[-1:], eps=self.eps2)
+        value = self.value2(F.relu(self.value1(x)))
+        policy_logits = self.policy2(F.relu(self.policy1(x)))
+        return policy_logits, value
+
+
+class _GreedyPolicy(nn.Module):
+    """
+    Deterministic action of an sb3 ActorCriticPolicy over a Discrete action
+    space, as a plain module that torch.jit.trace can compile.
+    """
+    
+    def __init__(self, policy):
+        super(_GreedyPolicy, self).__init__()
+        self.features_extractor = policy.pi_features_extractor
+        self.mlp_extractor = policy.mlp_extractor
+        self.action_net = policy.action_net
+    
+    def forward(self, obs):
+        latent_pi = self.mlp_extractor.forward_actor(self.features_extractor(obs))
+        return self.action_net(latent_pi).argmax(dim=1)
 
 
 class SchedulingEnvironment(gym.Env):
@@ -72,6 +137,10 @@ class SchedulingEnvironment(gym.Env):
             low=-np.inf, high=np.inf, shape=(state_dim,), dtype=np.float32
         )
         
+        # Scratch buffer the state features are assembled in; reset() and
+        # step() return copies, since callers such as replay buffers keep them
+        self._state_buf = np.zeros(state_dim, dtype=np.float32)
+        
         # Action space: Select which variable to branch on
         max_variables = 100  # Maximum number of rotation variables
         self.action_space = spaces.Discrete(max_variables)
@@ -95,12 +164,13 @@ class SchedulingEnvironment(gym.Env):
         # Initialize state
         self.current_state = self._get_initial_state()
         
-        return self.current_state, {}
+        return self.current_state.copy(), {}
     
     def _get_initial_state(self) -> np.ndarray:
         """Get initial state representation"""
         # This would extract features from the current LP relaxation
-        state = np.zeros(self.observation_space.shape[0], dtype=np.float32)
+        state = self._state_buf
+        state.fill(0)
         
         # Features could include:
         # - Fractionality of variables (how far from integer)
@@ -122,31 +192,21 @@ class SchedulingEnvironment(gym.Env):
         3. Constraint violation metrics
         4. Progress indicators
         5. Problem-specific features
+        
+        lp_solution['variables'] and dual_values['duals'] may be NumPy
+        arrays or {name: value} dicts.
         """
         features = []
         
         # Fractionality features
-        if 'variables' in lp_solution:
-            values = list(lp_solution['variables'].values())
-            fractionalities = [abs(v - round(v)) for v in values]
-            
-            features.extend([
-                np.mean(fractionalities) if fractionalities else 0,
-                np.max(fractionalities) if fractionalities else 0,
-                np.std(fractionalities) if fractionalities else 0,
-                sum(1 for f in fractionalities if f > 0.1) / (len(fractionalities) + 1e-6)
-            ])
-        else:
-            features.extend([0, 0, 0, 0])
+        values = _as_array(lp_solution.get('variables'))
+        features.extend(rl_kernels.fractionality_stats(values))
         
         # Dual value features
-        if 'duals' in dual_values:
-            duals = list(dual_values['duals'].values())
-            features.extend([
-                np.mean(np.abs(duals)) if duals else 0,
-                np.max(np.abs(duals)) if duals else 0,
-                np.std(duals) if duals else 0
-            ])
+        duals = _as_array(dual_values.get('duals'))
+        if len(duals):
+            abs_duals = np.abs(duals)
+            features.extend([abs_duals.mean(), abs_duals.max(), duals.std()])
         else:
             features.extend([0, 0, 0])
         
@@ -161,12 +221,13 @@ class SchedulingEnvironment(gym.Env):
               (self.best_solution_quality + 1e-6)
         features.append(max(-1, min(1, gap)))
         
-        # Pad to required dimension
-        state = np.array(features, dtype=np.float32)
-        if len(state) < self.observation_space.shape[0]:
-            state = np.pad(state, (0, self.observation_space.shape[0] - len(state)))
+        # Write into the observation buffer, zero-padded to its dimension
+        state = self._state_buf
+        k = min(len(features), len(state))
+        state[:k] = features[:k]
+        state[k:] = 0
         
-        return state[:self.observation_space.shape[0]]
+        return state.copy()
     
     def step(self, action: int):
         """
@@ -210,7 +271,7 @@ class SchedulingEnvironment(gym.Env):
             'iteration': self.current_iteration
         }
         
-        return self.current_state, reward, terminated, truncated, info
+        return self.current_state.copy(), reward, terminated, truncated, info
     
     def _calculate_reward(self, new_quality: float, action: int) -> float:
         """
@@ -221,21 +282,9 @@ class SchedulingEnvironment(gym.Env):
         2. Speed (fewer iterations better)
         3. Quality relative to best known
         """
-        # Improvement reward
-        improvement = max(0, self.current_solution_quality - new_quality)
-        improvement_reward = improvement * 100
-        
-        # Speed penalty (encourage fewer iterations)
-        speed_penalty = -0.1
-        
-        # Quality bonus if near best
-        gap_to_best = (new_quality - self.best_solution_quality) / \
-                     (self.best_solution_quality + 1e-6)
-        quality_bonus = 10 if gap_to_best < 0.01 else 0
-        
-        total_reward = improvement_reward + speed_penalty + quality_bonus
-        
-        return total_reward
+        return rl_kernels.branching_reward(
+            self.current_solution_quality, new_quality, self.best_solution_quality
+        )
     
     def render(self, mode='human'):
         """Render the environment state"""
@@ -244,20 +293,46 @@ class SchedulingEnvironment(gym.Env):
         print(f"Best Quality: {self.best_solution_quality:.2f}")
 
 
+def _as_array(values) -> np.ndarray:
+    """LP values as a float64 array; accepts an array, a {name: value} dict or None"""
+    if values is None:
+        return np.empty(0)
+    if isinstance(values, dict):
+        return np.fromiter(values.values(), dtype=np.float64, count=len(values))
+    return np.asarray(values, dtype=np.float64)
+
+
 class RLBranchingAgent:
     """
     RL agent for learning optimal branching strategies in branch-and-price.
     """
     
-    def __init__(self, environment: SchedulingEnvironment):
-        self.env = DummyVecEnv([lambda: environment])
+    def __init__(self, environment: SchedulingEnvironment, quantize_policy: bool = False,
+                 n_envs: int = 1):
+        """
+        Args:
+            environment: Environment to train in
+            quantize_policy: Select branching variables with an int8
+                dynamic-quantized copy of the trained policy's Linear layers
+            n_envs: Environments stepped in parallel worker processes
+                (copies of environment's problem); 1 steps environment in-process
+        """
+        if n_envs > 1:
+            problem_data, max_iterations = environment.problem_data, environment.max_iterations
+            self.env = SubprocVecEnv([
+                lambda: SchedulingEnvironment(problem_data, max_iterations)
+                for _ in range(n_envs)
+            ])
+        else:
+            self.env = DummyVecEnv([lambda: environment])
+        self.quantize_policy = quantize_policy
         
         # PPO agent
         self.agent = PPO(
             "MlpPolicy",
             self.env,
             learning_rate=3e-4,
-            n_steps=2048,
+            n_steps=max(2048 // n_envs, 64),  # About 2048 steps per rollout in total
             batch_size=64,
             n_epochs=10,
             gamma=0.99,
@@ -268,6 +343,34 @@ class RLBranchingAgent:
         )
         
         self.is_trained = False
+        
+        # Policy used by select_branching_variable(), see _refresh_inference_policy()
+        self.inference_policy = None
+        self._obs_buffer = None
+    
+    def _refresh_inference_policy(self):
+        """
+        Set up the policy select_branching_variable() runs: the agent's
+        greedy action (from an int8 copy with quantize_policy) traced with
+        TorchScript, plus its input buffer. Rebuilt after training and loading.
+        """
+        policy = self.agent.policy
+        if self.quantize_policy:
+            # Rebuilt from constructor arguments and weights, as
+            # BasePolicy.save/load do, since trained policies don't deepcopy
+            policy_copy = type(policy)(**policy._get_constructor_parameters())
+            policy_copy.load_state_dict(policy.state_dict())
+            policy = torch.ao.quantization.quantize_dynamic(
+                policy_copy.cpu(), {nn.Linear}, dtype=torch.qint8
+            )
+        policy.set_training_mode(False)
+        
+        device = torch.device('cpu') if self.quantize_policy else policy.device
+        self._obs_buffer = torch.zeros((1, *self.env.observation_space.shape), device=device)
+        with torch.no_grad():
+            self.inference_policy = torch.jit.trace(
+                _GreedyPolicy(policy).eval(), self._obs_buffer
+            )
     
     def train(self, total_timesteps: int = 100000, 
              callback: Optional[BaseCallback] = None):
@@ -287,6 +390,7 @@ class RLBranchingAgent:
         )
         
         self.is_trained = True
+        self._refresh_inference_policy()
         print("Training completed!")
     
     def select_branching_variable(self, state: np.ndarray) -> int:
@@ -301,10 +405,14 @@ class RLBranchingAgent:
         """
         if not self.is_trained:
             # Random selection if not trained
-            return np.random.randint(0, self.env.envs[0].action_space.n)
-        
-        action, _ = self.agent.predict(state, deterministic=True)
-        return int(action)
+            return np.random.randint(0, self.env.action_space.n)
+        
+        # Traced greedy policy on a reused input tensor, bypassing
+        # PPO.predict's per-call observation handling
+        obs = self._obs_buffer
+        with torch.inference_mode():
+            obs.copy_(torch.from_numpy(np.asarray(state, dtype=np.float32)).reshape(obs.shape))
+            return int(self.inference_policy(obs)[0])
     
     def save(self, path: str):
         """Save the trained agent"""
@@ -318,6 +426,7 @@ class RLBranchingAgent:
         """Load a trained agent"""
         self.agent = PPO.load(path, env=self.env)
         self.is_trained = True
+        self._refresh_inference_policy()
         print(f"Agent loaded from {path}")
 
 
@@ -0,0 +1,64 @@
+"""
+Tests for the constraint engine.
+"""
+
+from datetime import datetime, time
+
+from core.constraints import (
+    ConstraintEngine, FridayOffConstraint, ShiftCoverageConstraint
+)
+from core.models import Nurse, Rotation, Schedule, Shift, ShiftType
+
+
+def make_schedule(required_nurses: int = 1) -> Schedule:
+    """One nurse working the morning shift of Friday 3 January 2025"""
+    shift = Shift(id="s1", shift_type=ShiftType.MORNING, start_time=time(7),
+                  end_time=time(15), date=datetime(2025, 1, 3),
+                  required_nurses=required_nurses, assigned_nurses=["a"])
+    return Schedule(start_date=datetime(2025, 1, 1), end_date=datetime(2025, 1, 7),
+                    nurses=[Nurse(id="a", name="A")], shifts=[shift],
+                    rotations=[Rotation(nurse_id="a", shifts=[shift])])
+
+
+def test_required_nurses_edit_changes_penalty():
+    engine = ConstraintEngine()
+    coverage = ShiftCoverageConstraint(weight=500.0)
+    engine.add_constraint(coverage)
+    schedule = make_schedule(required_nurses=1)
+    assert engine.evaluate_total(schedule) == 0.0
+    assert coverage.get_penalty(schedule) == 0.0
+    
+    schedule.shifts[0].required_nurses = 3
+    
+    expected = engine.evaluate_total(make_schedule(required_nurses=3))
+    assert expected > 0
+    assert engine.evaluate_total(schedule) == expected
+    assert coverage.get_penalty(schedule) == expected
+
+
+def test_weight_change_changes_penalty():
+    engine = ConstraintEngine()
+    friday = FridayOffConstraint(weight=20.0)
+    engine.add_constraint(friday)
+    schedule = make_schedule()
+    assert engine.evaluate_total(schedule) == 20.0
+    assert friday.get_penalty(schedule) == 20.0
+    
+    friday.weight = 5.0
+    
+    assert engine.evaluate_total(schedule) == 5.0
+    assert friday.get_penalty(schedule) == 5.0
+
+
+def test_preference_edit_changes_penalty():
+    engine = ConstraintEngine()
+    friday = FridayOffConstraint(weight=20.0)
+    engine.add_constraint(friday)
+    schedule = make_schedule()
+    assert engine.evaluate_total(schedule) == 20.0
+    
+    schedule.nurses[0].preferences.prefer_friday_off = False
+    
+    assert engine.evaluate_total(schedule) == 0.0
+    assert friday.get_penalty(schedule) == 0.0
+    assert engine.get_metrics(schedule)["soft_constraint_penalty"] == 0.0
@@ -0,0 +1,30 @@
+"""
+Tests for the LSTM demand model.
+"""
+
+import torch
+import torch.nn as nn
+
+from ml.demand_forecaster import DemandLSTM
+
+
+def test_eval_forward_matches_train_forward_without_dropout():
+    torch.manual_seed(0)
+    model = DemandLSTM(input_size=10, hidden_size=64, num_layers=2, output_size=3)
+    x = torch.randn(4, 14, 10)
+    
+    model.eval()
+    with torch.no_grad():
+        eval_output = model(x)
+    
+    # Train mode runs the nn.Sequential head; with dropout off it must agree
+    model.train()
+    model.lstm.dropout = 0.0
+    for module in model.modules():
+        if isinstance(module, nn.Dropout):
+            module.p = 0.0
+    with torch.no_grad():
+        train_output = model(x)
+    
+    assert eval_output.shape == (4, 3)
+    torch.testing.assert_close(eval_output, train_output)
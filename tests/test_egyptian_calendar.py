@@ -0,0 +1,24 @@
+"""
+Tests for the Egyptian calendar utilities.
+"""
+
+from datetime import datetime
+
+from utils.egyptian_calendar import get_ramadan_dates, is_ramadan
+
+
+def test_second_ramadan_of_a_year_is_seen():
+    # 2030 starts two Ramadans: 5 January and 26 December (to 23 January 2031)
+    assert get_ramadan_dates(2030)[0] == datetime(2030, 1, 5)
+    assert is_ramadan(datetime(2030, 1, 20))
+    assert is_ramadan(datetime(2030, 12, 28))
+    assert is_ramadan(datetime(2031, 1, 10))
+    assert not is_ramadan(datetime(2030, 6, 1))
+
+
+def test_ramadan_crossing_new_year_is_seen():
+    # Ramadan 1419 AH runs from 19 December 1998 to 17 January 1999
+    assert is_ramadan(datetime(1998, 12, 31))
+    assert is_ramadan(datetime(1999, 1, 17))
+    assert not is_ramadan(datetime(1999, 1, 18))
+    assert not is_ramadan(datetime(1998, 12, 18))
@@ -0,0 +1,111 @@
+"""
+Tests for the scheduling data models.
+"""
+
+from datetime import datetime, time
+
+import numpy as np
+
+from core.models import (
+    Nurse, NursePreferences, Rotation, Schedule, Shift, ShiftType
+)
+
+
+def make_shift(shift_id: str, shift_type: ShiftType = ShiftType.MORNING,
+               day: int = 1, required_nurses: int = 1) -> Shift:
+    """Standard-hours shift on the given day of January 2025"""
+    hours = {
+        ShiftType.MORNING: (time(7), time(15)),
+        ShiftType.AFTERNOON: (time(15), time(23)),
+        ShiftType.NIGHT: (time(23), time(7)),
+    }
+    start, end = hours[shift_type]
+    return Shift(id=shift_id, shift_type=shift_type, start_time=start, end_time=end,
+                 date=datetime(2025, 1, day), required_nurses=required_nurses)
+
+
+def test_avoided_shift_appended_in_place_is_seen():
+    nurse = Nurse(id="a", name="A")
+    assert nurse.can_work_shift(ShiftType.NIGHT)
+    
+    nurse.preferences.avoided_shifts.append(ShiftType.NIGHT)
+    
+    assert not nurse.can_work_shift(ShiftType.NIGHT)
+
+
+def test_preferred_shifts_edited_in_place_change_cost_profile():
+    prefs = NursePreferences()
+    assert prefs.not_preferred_mask == 0
+    
+    prefs.preferred_shifts.append(ShiftType.MORNING)
+    
+    assert prefs.preferred_mask == 1 << int(ShiftType.MORNING)
+    assert not (prefs.not_preferred_mask >> int(ShiftType.MORNING)) & 1
+    assert (prefs.not_preferred_mask >> int(ShiftType.NIGHT)) & 1
+
+
+def test_unavailable_date_added_in_place_is_seen():
+    nurse = Nurse(id="a", name="A")
+    day = datetime(2025, 1, 3)
+    assert nurse.is_available(day)
+    
+    nurse.unavailable_dates.add(day)
+    nurse.vacation_dates.add(datetime(2025, 1, 5, 9))
+    
+    assert not nurse.is_available(day)
+    assert not nurse.is_available(datetime(2025, 1, 3, 23))  # Same calendar day
+    assert not nurse.is_available(datetime(2025, 1, 5))
+    assert nurse.is_available(datetime(2025, 1, 4))
+    
+    days = np.array([datetime(2025, 1, d).toordinal() for d in range(1, 7)])
+    assert nurse.is_available_on(days).tolist() == [True, True, False, True, False, True]
+
+
+def make_schedule(nurses, shifts, rotations) -> Schedule:
+    return Schedule(start_date=datetime(2025, 1, 1), end_date=datetime(2025, 1, 7),
+                    nurses=nurses, shifts=shifts, rotations=rotations)
+
+
+def test_total_cost_sees_required_nurses_edit():
+    shift = make_shift("s1", required_nurses=1)
+    schedule = make_schedule([Nurse(id="a", name="A")], [shift], [])
+    before = schedule.get_total_cost()
+    
+    shift.required_nurses = 3
+    
+    assert schedule.get_total_cost() > before
+    assert schedule.get_total_cost() == make_schedule(
+        [Nurse(id="a", name="A")], [make_shift("s1", required_nurses=3)], []
+    ).get_total_cost()
+
+
+def test_total_cost_sees_shift_added_to_existing_rotation():
+    first, second = make_shift("s1", day=1), make_shift("s2", day=2)
+    rotation = Rotation(nurse_id="a")
+    rotation.add_shift(first)
+    nurse = Nurse(id="a", name="A", max_hours_per_week=8)
+    schedule = make_schedule([nurse], [first, second], [rotation])
+    before = schedule.get_total_cost()
+    
+    rotation.shifts.append(second)
+    
+    expected = Rotation(nurse_id="a", shifts=[first, second])
+    assert schedule.get_total_cost() != before
+    assert schedule.get_total_cost() == make_schedule(
+        [nurse], [first, second], [expected]
+    ).get_total_cost()
+
+
+def test_appended_nurse_and_rotation_are_seen():
+    shift = make_shift("s1")
+    schedule = make_schedule([Nurse(id="a", name="A")], [shift], [])
+    before = schedule.get_total_cost()
+    
+    schedule.nurses.append(Nurse(id="b", name="B", max_hours_per_week=4))
+    rotation = Rotation(nurse_id="b")
+    rotation.add_shift(shift)
+    schedule.rotations.append(rotation)
+    
+    assert schedule.get_total_cost() != before
+    assert schedule.get_metrics()["total_nurses"] == 2
+    assert set(schedule.get_nurse_satisfaction()) == {"a", "b"}
@@ -0,0 +1,24 @@
+"""
+Tests for the branching environment.
+"""
+
+import numpy as np
+
+from ml.rl_agent import SchedulingEnvironment
+
+
+def test_observations_are_not_overwritten_by_later_steps():
+    env = SchedulingEnvironment({}, max_iterations=10)
+    first, _ = env.reset(seed=0)
+    second = env.step(0)[0]
+    assert first is not second
+    
+    features = env._extract_state_features(
+        {'variables': np.array([0.5, 0.25]), 'objective': 500.0}, {'duals': np.array([1.0])}
+    )
+    
+    assert features.any()
+    assert not first.any() and not second.any()
+    
+    first[:] = 1.0
+    assert not env.step(0)[0].any()
@@ -2,9 +2,112 @@
 Egyptian calendar utilities including Ramadan dates and public holidays.
 """
 
+import numpy as np
+from bisect import bisect_right
 from datetime import datetime, timedelta
+from functools import lru_cache
 from hijri_converter import Hijri, Gregorian
-from typing import List, Tuple
+from types import MappingProxyType
+from typing import FrozenSet, List, Mapping, Tuple
+
+# numpy.busday weekmask (Monday first): Sunday-Thursday working week
+_WORK_WEEKMASK = '1111001'
+_EPOCH_ORDINAL = datetime(1970, 1, 1).toordinal()
+_WEEKEND_DAYS = frozenset({4, 5})  # Friday and Saturday
+
+
+def _build_hijri_month_starts() -> Tuple[Mapping[Tuple[int, int], int], Mapping[Tuple[int, int], int]]:
+    """
+    Gregorian ordinal of the 1st and length in days of every Hijri month
+    hijri_converter covers (1343-1500 AH, Umm al-Qura). Built once at import.
+    """
+    months = [(year, month) for year in range(1343, 1501) for month in range(1, 13)]
+    starts = [Hijri(year, month, 1).to_gregorian().toordinal() for year, month in months]
+    starts.append(starts[-1] + Hijri(*months[-1], 1).month_length())
+    
+    return (MappingProxyType(dict(zip(months, starts))),
+            MappingProxyType({m: starts[i + 1] - starts[i] for i, m in enumerate(months)}))
+
+
+_HIJRI_MONTH_STARTS, _HIJRI_MONTH_LENGTHS = _build_hijri_month_starts()
+
+
+def hijri_to_gregorian(year: int, month: int, day: int) -> datetime:
+    """
+    Convert an Umm al-Qura Hijri date (1343-1500 AH) to a Gregorian datetime.
+    
+    Raises:
+        ValueError: If the Hijri date is out of range or invalid
+    """
+    month_length = _HIJRI_MONTH_LENGTHS.get((year, month))
+    if month_length is None or not 1 <= day <= month_length:
+        raise ValueError(f"Hijri date out of range: {year}-{month}-{day}")
+    
+    return datetime.fromordinal(_HIJRI_MONTH_STARTS[(year, month)] + day - 1)
+
+
+def _build_islamic_tables() -> Tuple[Tuple[Tuple[datetime, datetime], ...],
+                                     Mapping[int, Tuple[datetime, datetime]],
+                                     Mapping[int, Tuple[datetime, ...]]]:
+    """
+    Ramadan periods (first and last day, in order), the first Ramadan
+    starting in each Gregorian year, and Eid holidays by Gregorian year, for
+    every Hijri year in the month table (Ramadan 1925 to 2077).
+    """
+    ramadan_periods = []
+    ramadan_by_year = {}
+    eid_holidays = {}
+    for hijri_year in range(1343, 1501):
+        ramadan_start = hijri_to_gregorian(hijri_year, 9, 1)
+        eid_fitr_start = hijri_to_gregorian(hijri_year, 10, 1)
+        eid_adha_start = hijri_to_gregorian(hijri_year, 12, 10)
+        
+        # A Gregorian year can start two Ramadans; get_ramadan_dates reports the first
+        period = (ramadan_start, eid_fitr_start - timedelta(days=1))
+        ramadan_periods.append(period)
+        ramadan_by_year.setdefault(ramadan_start.year, period)
+        
+        # Eid al-Fitr (3 days from 1 Shawwal), Eid al-Adha (4 days from 10 Dhu al-Hijjah)
+        for day in ([eid_fitr_start + timedelta(days=k) for k in range(3)] +
+                    [eid_adha_start + timedelta(days=k) for k in range(4)]):
+            eid_holidays.setdefault(day.year, []).append(day)
+    
+    return (tuple(ramadan_periods),
+            MappingProxyType(ramadan_by_year),
+            MappingProxyType({year: tuple(days) for year, days in eid_holidays.items()}))
+
+
+_RAMADAN_PERIODS, _RAMADAN_DATES, _EID_HOLIDAYS = _build_islamic_tables()
+_RAMADAN_STARTS = tuple(start for start, _ in _RAMADAN_PERIODS)
+
+# Approximate prayer times per city
+# In production, calculate using proper algorithms or API
+_PRAYER_TIMES = MappingProxyType({
+    "Cairo": MappingProxyType({
+        "fajr": "04:30",
+        "sunrise": "06:00",
+        "dhuhr": "12:00",
+        "asr": "15:30",
+        "maghrib": "18:00",
+        "isha": "19:30"
+    }),
+    "Alexandria": MappingProxyType({
+        "fajr": "04:35",
+        "sunrise": "06:05",
+        "dhuhr": "12:05",
+        "asr": "15:35",
+        "maghrib": "18:05",
+        "isha": "19:35"
+    }),
+    "Giza": MappingProxyType({
+        "fajr": "04:30",
+        "sunrise": "06:00",
+        "dhuhr": "12:00",
+        "asr": "15:30",
+        "maghrib": "18:00",
+        "isha": "19:30"
+    })
+})
 
 
 def get_ramadan_dates(gregorian_year: int) -> Tuple[datetime, datetime]:
@@ -15,41 +118,28 @@ def get_ramadan_dates(gregorian_year: int) -> Tuple[datetime, datetime]:
         gregorian_year: Gregorian calendar year
     
     Returns:
-        Tuple of (ramadan_start, ramadan_end) as datetime objects
+        Tuple of (ramadan_start, ramadan_end) as datetime objects,
+        (None, None) outside 1925-2077
     """
     # Ramadan is the 9th month of Islamic calendar
-    # Approximate calculation - in production, use API or database
-    
-    # Ramadan 2025: approximately April 1 - April 30
-    # Ramadan 2026: approximately March 22 - April 20
-    
-    ramadan_estimates = {
-        2024: (datetime(2024, 3, 11), datetime(2024, 4, 9)),
-        2025: (datetime(2025, 3, 1), datetime(2025, 3, 30)),
-        2026: (datetime(2026, 2, 18), datetime(2026, 3, 19)),
-        2027: (datetime(2027, 2, 8), datetime(2027, 3, 9)),
-        2028: (datetime(2028, 1, 28), datetime(2028, 2, 26)),
-    }
-    
-    return ramadan_estimates.get(gregorian_year, (None, None))
+    return _RAMADAN_DATES.get(gregorian_year, (None, None))
 
 
 def is_ramadan(date: datetime) -> bool:
     """Check if a date falls during Ramadan"""
-    ramadan_start, ramadan_end = get_ramadan_dates(date.year)
-    
-    if ramadan_start and ramadan_end:
-        return ramadan_start <= date <= ramadan_end
-    
-    return False
+    # Latest Ramadan starting on or before the date; it may have begun the
+    # previous Gregorian year, or be the second one of the date's year
+    i = bisect_right(_RAMADAN_STARTS, date) - 1
+    return i >= 0 and date <= _RAMADAN_PERIODS[i][1]
 
 
-def get_egyptian_public_holidays(year: int) -> List[datetime]:
+@lru_cache(maxsize=16)
+def get_egyptian_public_holidays(year: int) -> Tuple[datetime, ...]:
     """
-    Get Egyptian public holidays for a given year.
+    Get Egyptian public holidays for a given year (cached per year).
     
     Returns:
-        List of datetime objects for public holidays
+        Sorted tuple of datetime objects for public holidays
     """
     holidays = [
         # Fixed holidays
@@ -62,38 +152,24 @@ def get_egyptian_public_holidays(year: int) -> List[datetime]:
         datetime(year, 10, 6),  # Armed Forces Day
     ]
     
-    # Islamic holidays (approximate - vary by lunar calendar)
-    # Eid al-Fitr (3 days after Ramadan)
-    ramadan_start, ramadan_end = get_ramadan_dates(year)
-    if ramadan_end:
-        eid_fitr_start = ramadan_end + timedelta(days=1)
-        holidays.extend([
-            eid_fitr_start,
-            eid_fitr_start + timedelta(days=1),
-            eid_fitr_start + timedelta(days=2)
-        ])
-    
-    # Eid al-Adha (approximate)
-    # About 70 days after Eid al-Fitr
-    if ramadan_end:
-        eid_adha_start = ramadan_end + timedelta(days=70)
-        holidays.extend([
-            eid_adha_start,
-            eid_adha_start + timedelta(days=1),
-            eid_adha_start + timedelta(days=2),
-            eid_adha_start + timedelta(days=3)
-        ])
+    # Islamic holidays: Eid al-Fitr and Eid al-Adha
+    holidays.extend(_EID_HOLIDAYS.get(year, ()))
     
     # Islamic New Year (approximate)
     # Mawlid an-Nabi (Prophet's Birthday - approximate)
     
-    return sorted(holidays)
+    return tuple(sorted(holidays))
+
+
+@lru_cache(maxsize=16)
+def _holiday_ordinals(year: int) -> FrozenSet[int]:
+    """Day ordinals of a year's public holidays, for O(1) lookups"""
+    return frozenset(h.toordinal() for h in get_egyptian_public_holidays(year))
 
 
 def is_public_holiday(date: datetime) -> bool:
     """Check if a date is an Egyptian public holiday"""
-    holidays = get_egyptian_public_holidays(date.year)
-    return date.date() in [h.date() for h in holidays]
+    return date.toordinal() in _holiday_ordinals(date.year)
 
 
 def is_friday(date: datetime) -> bool:
@@ -103,10 +179,36 @@ def is_friday(date: datetime) -> bool:
 
 def is_weekend(date: datetime) -> bool:
     """Check if a date is weekend in Egypt (Friday-Saturday)"""
-    return date.weekday() in [4, 5]  # Friday and Saturday
+    return date.weekday() in _WEEKEND_DAYS
 
 
-def get_prayer_times(date: datetime, city: str = "Cairo") -> dict:
+@lru_cache(maxsize=16)
+def _non_working_mask(year: int) -> Tuple[int, int]:
+    """
+    Ordinal of 1 January and the year's weekend and holiday days packed
+    into one int: bit i is set when day-of-year i + 1 is non-working.
+    """
+    jan1 = datetime(year, 1, 1)
+    jan1_ordinal = jan1.toordinal()
+    n_days = datetime(year + 1, 1, 1).toordinal() - jan1_ordinal
+    
+    mask = 0
+    for ordinal in _holiday_ordinals(year):
+        mask |= 1 << (ordinal - jan1_ordinal)
+    for day in range(n_days):
+        if is_weekend(jan1 + timedelta(days=day)):
+            mask |= 1 << day
+    
+    return jan1_ordinal, mask
+
+
+def is_non_working(date: datetime) -> bool:
+    """Check if a date is a weekend day or public holiday (one mask lookup)"""
+    jan1_ordinal, mask = _non_working_mask(date.year)
+    return bool((mask >> (date.toordinal() - jan1_ordinal)) & 1)
+
+
+def get_prayer_times(date: datetime, city: str = "Cairo") -> Mapping[str, str]:
     """
     Get prayer times for a specific date and Egyptian city.
     
@@ -120,39 +222,15 @@ def get_prayer_times(date: datetime, city: str = "Cairo") -> dict:
         city: Egyptian city name
     
     Returns:
-        Dictionary with prayer times
-    """
-    # Approximate prayer times for Cairo
-    # In production, calculate using proper algorithms or API
-    
-    prayer_times = {
-        "Cairo": {
-            "fajr": "04:30",
-            "sunrise": "06:00",
-            "dhuhr": "12:00",
-            "asr": "15:30",
-            "maghrib": "18:00",
-            "isha": "19:30"
-        },
-        "Alexandria": {
-            "fajr": "04:35",
-            "sunrise": "06:05",
-            "dhuhr": "12:05",
-            "asr": "15:35",
-            "maghrib": "18:05",
-            "isha": "19:35"
-        },
-        "Giza": {
-            "fajr": "04:30",
-            "sunrise": "06:00",
-            "dhuhr": "12:00",
-            "asr": "15:30",
-            "maghrib": "18:00",
-            "isha": "19:30"
-        }
-    }
-    
-    return prayer_times.get(city, prayer_times["Cairo"])
+        Read-only mapping of prayer name to time
+    """
+    return _prayer_times_cached(date.toordinal(), city)
+
+
+@lru_cache(maxsize=4096)
+def _prayer_times_cached(ordinal: int, city: str) -> Mapping[str, str]:
+    """Prayer times per (day, city); cached so a per-day calculation runs once"""
+    return _PRAYER_TIMES.get(city, _PRAYER_TIMES["Cairo"])
 
 
 def get_working_days(start_date: datetime, num_days: int) -> List[datetime]:
@@ -166,15 +244,22 @@ def get_working_days(start_date: datetime, num_days: int) -> List[datetime]:
     Returns:
         List of working day dates
     """
-    working_days = []
-    current_date = start_date
+    if num_days <= 0:
+        return []
+    
+    # Holidays of every year in range as datetime64 days, gathered once
+    end_year = (start_date + timedelta(days=num_days - 1)).year
+    holiday_ordinals = frozenset().union(
+        *(_holiday_ordinals(year) for year in range(start_date.year, end_year + 1))
+    )
+    holidays = (np.fromiter(holiday_ordinals, dtype=np.int64) - _EPOCH_ORDINAL).astype('datetime64[D]')
     
-    for _ in range(num_days):
-        if not is_weekend(current_date) and not is_public_holiday(current_date):
-            working_days.append(current_date)
-        current_date += timedelta(days=1)
+    days = np.datetime64(start_date, 'D') + np.arange(num_days)
+    is_working = np.is_busday(days, weekmask=_WORK_WEEKMASK, holidays=holidays)
     
-    return working_days
+    # Offsets from start_date keep its time of day; tolist() yields datetimes
+    offsets = np.flatnonzero(is_working).astype('timedelta64[D]')
+    return (np.datetime64(start_date, 'us') + offsets).tolist()
 
 
 if __name__ == "__main__":
@@ -204,3 +289,4 @@ if __name__ == "__main__":
     # Test working days
     working_days = get_working_days(datetime.now(), 30)
     print(f"\nWorking days in next 30 days: {len(working_days)}")
+    print(f"Today is a non-working day: {is_non_working(datetime.now())}")
@@ -2,10 +2,7 @@
 Visualization utilities for nurse schedules.
 """
 
-import plotly.graph_objects as go
-import plotly.express as px
-from plotly.subplots import make_subplots
-import pandas as pd
+import numpy as np
 from datetime import datetime
 from typing import Dict
 from core.models import Schedule
@@ -19,28 +16,39 @@ def plot_schedule(schedule: Schedule, output_path: str = "schedule.html"):
         schedule: Schedule object to visualize
         output_path: Path to save HTML file
     """
-    # Prepare data for Gantt chart
-    gantt_data = []
+    # Imported here so report-only callers don't pay for plotly/pandas
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+    import pandas as pd
+    
+    # Prepare data for Gantt chart, one list per column
+    nurse_names, dates, shift_labels, durations = [], [], [], []
+    name_by_id = {n.id: n.name for n in reversed(schedule.nurses)}  # First match wins
     
     for rotation in schedule.rotations:
-        nurse = next((n for n in schedule.nurses if n.id == rotation.nurse_id), None)
-        if not nurse:
+        name = name_by_id.get(rotation.nurse_id)
+        if name is None:
             continue
         
         for shift in rotation.shifts:
-            gantt_data.append({
-                'Nurse': nurse.name,
-                'Start': shift.date,
-                'Finish': shift.date,
-                'Shift': shift.shift_type.value,
-                'Duration': shift.get_duration_hours()
-            })
-    
-    if not gantt_data:
+            nurse_names.append(name)
+            dates.append(shift.date)
+            shift_labels.append(shift.shift_type.label)
+            durations.append(shift.get_duration_hours())
+    
+    if not nurse_names:
         print("Warning: No data to plot")
         return
     
-    df = pd.DataFrame(gantt_data)
+    # One C-level conversion to a datetime64 array, shared by Start and Finish
+    starts = pd.DatetimeIndex(dates).values
+    df = pd.DataFrame({
+        'Nurse': nurse_names,
+        'Start': starts,
+        'Finish': starts,
+        'Shift': shift_labels,
+        'Duration': np.asarray(durations, dtype=np.float32)
+    })
     
     # Create figure with subplots
     fig = make_subplots(
@@ -61,12 +69,16 @@ def plot_schedule(schedule: Schedule, output_path: str = "schedule.html"):
         'extended': '#8B0000'
     }
     
-    for shift_type in df['Shift'].unique():
-        shift_data = df[df['Shift'] == shift_type]
+    # Integer codes per shift type (first-seen order) and nurse (sorted by name)
+    shift_codes, shift_types = pd.factorize(df['Shift'])
+    nurse_cat = pd.Categorical(df['Nurse'])
+    
+    for code, shift_type in enumerate(shift_types):
+        shift_data = df[shift_codes == code]
         fig.add_trace(
             go.Scatter(
-                x=shift_data['Start'],
-                y=shift_data['Nurse'],
+                x=shift_data['Start'].values,
+                y=shift_data['Nurse'].values,
                 mode='markers',
                 name=shift_type.capitalize(),
                 marker=dict(
@@ -79,23 +91,26 @@ def plot_schedule(schedule: Schedule, output_path: str = "schedule.html"):
         )
     
     # 2. Shift distribution
-    shift_counts = df['Shift'].value_counts()
+    shift_counts = np.bincount(shift_codes, minlength=len(shift_types))
+    order = np.argsort(-shift_counts, kind='stable')
     fig.add_trace(
         go.Bar(
-            x=shift_counts.index,
-            y=shift_counts.values,
-            marker_color=[colors.get(s, '#808080') for s in shift_counts.index],
+            x=shift_types.values[order],
+            y=shift_counts[order],
+            marker_color=[colors.get(s, '#808080') for s in shift_types.values[order]],
             showlegend=False
         ),
         row=2, col=1
     )
     
     # 3. Hours per nurse
-    nurse_hours = df.groupby('Nurse')['Duration'].sum().sort_values(ascending=True)
+    nurse_hours = np.bincount(nurse_cat.codes, weights=df['Duration'].values,
+                              minlength=len(nurse_cat.categories))
+    order = np.argsort(nurse_hours, kind='stable')
     fig.add_trace(
         go.Bar(
-            x=nurse_hours.values,
-            y=nurse_hours.index,
+            x=nurse_hours[order],
+            y=nurse_cat.categories.values[order],
             orientation='h',
             marker_color='#4682B4',
             showlegend=False
@@ -127,6 +142,53 @@ def plot_schedule(schedule: Schedule, output_path: str = "schedule.html"):
     print(f"Interactive visualization saved to {output_path}")
 
 
+_REPORT_TEMPLATE = """\
+{rule}
+{title}
+{subtitle}
+{rule}
+
+SCHEDULE INFORMATION
+{line}
+Hospital ID:       {schedule.hospital_id}
+Department:        {schedule.department}
+Start Date:        {start}
+End Date:          {end}
+Duration:          {days} days
+Created:           {created:%Y-%m-%d %H:%M:%S}
+
+OPTIMIZATION STATISTICS
+{line}
+Total Time:        {stats[solve_time]:.2f} seconds
+ML Time:           {stats[ml_time]:.2f} seconds
+Iterations:        {stats[iterations]}
+Best Objective:    {stats[best_objective]:.2f}
+
+SCHEDULE METRICS
+{line}
+Total Nurses:      {metrics[total_nurses]}
+Total Shifts:      {metrics[total_shifts]}
+Total Rotations:   {metrics[total_rotations]}
+Total Cost:        {metrics[total_cost]:.2f}
+Feasibility:       {feasibility}
+Nurse Satisfaction: {metrics[nurse_satisfaction]:.1%}
+Avg Hours/Nurse:   {metrics[average_hours_per_nurse]:.1f}
+
+SHIFT COVERAGE
+{line}
+Total Shifts:      {n_shifts}
+Covered:           {covered} ({covered_pct:.1f}%)
+Uncovered:         {uncovered}
+
+NURSE SATISFACTION BREAKDOWN
+{line}
+{satisfaction_lines}
+{rule}
+Generated by AI-Enhanced Nurse Scheduler
+Report Date: {now:%Y-%m-%d %H:%M:%S}
+{rule}"""
+
+
 def generate_schedule_report(schedule: Schedule, stats: Dict) -> str:
     """
     Generate text report for schedule.
@@ -138,78 +200,36 @@ def generate_schedule_report(schedule: Schedule, stats: Dict) -> str:
     Returns:
         Formatted report string
     """
-    report = []
-    
-    # Header
-    report.append("=" * 80)
-    report.append(" " * 25 + "NURSE SCHEDULE REPORT")
-    report.append(" " * 20 + "HealthFlow RegTech - Egypt")
-    report.append("=" * 80)
-    report.append("")
-    
-    # Schedule info
-    report.append("SCHEDULE INFORMATION")
-    report.append("-" * 80)
-    report.append(f"Hospital ID:       {schedule.hospital_id}")
-    report.append(f"Department:        {schedule.department}")
-    report.append(f"Start Date:        {schedule.start_date.date()}")
-    report.append(f"End Date:          {schedule.end_date.date()}")
-    report.append(f"Duration:          {(schedule.end_date - schedule.start_date).days} days")
-    report.append(f"Created:           {schedule.created_at.strftime('%Y-%m-%d %H:%M:%S')}")
-    report.append("")
-    
-    # Optimization stats
-    report.append("OPTIMIZATION STATISTICS")
-    report.append("-" * 80)
-    report.append(f"Total Time:        {stats['solve_time']:.2f} seconds")
-    report.append(f"ML Time:           {stats['ml_time']:.2f} seconds")
-    report.append(f"Iterations:        {stats['iterations']}")
-    report.append(f"Best Objective:    {stats['best_objective']:.2f}")
-    report.append("")
-    
-    # Schedule metrics
     metrics = schedule.get_metrics()
-    report.append("SCHEDULE METRICS")
-    report.append("-" * 80)
-    report.append(f"Total Nurses:      {metrics['total_nurses']}")
-    report.append(f"Total Shifts:      {metrics['total_shifts']}")
-    report.append(f"Total Rotations:   {metrics['total_rotations']}")
-    report.append(f"Total Cost:        {metrics['total_cost']:.2f}")
-    report.append(f"Feasibility:       {'FEASIBLE' if metrics['is_feasible'] else 'INFEASIBLE'}")
-    report.append(f"Nurse Satisfaction: {metrics['nurse_satisfaction']:.1%}")
-    report.append(f"Avg Hours/Nurse:   {metrics['average_hours_per_nurse']:.1f}")
-    report.append("")
-    
-    # Shift coverage
-    report.append("SHIFT COVERAGE")
-    report.append("-" * 80)
-    
-    covered = sum(1 for s in schedule.shifts if s.is_fully_staffed())
-    uncovered = len(schedule.shifts) - covered
-    
-    report.append(f"Total Shifts:      {len(schedule.shifts)}")
-    report.append(f"Covered:           {covered} ({covered/len(schedule.shifts)*100:.1f}%)")
-    report.append(f"Uncovered:         {uncovered}")
-    report.append("")
-    
-    # Nurse satisfaction breakdown
     satisfaction = schedule.get_nurse_satisfaction()
-    report.append("NURSE SATISFACTION BREAKDOWN")
-    report.append("-" * 80)
     
-    for nurse in schedule.nurses:
-        sat = satisfaction.get(nurse.id, 0)
-        report.append(f"{nurse.name:20s} {sat:.1%}")
-    
-    report.append("")
+    n_shifts = len(schedule.shifts)
+    covered = sum(1 for s in schedule.shifts if s.is_fully_staffed())
     
-    # Footer
-    report.append("=" * 80)
-    report.append("Generated by AI-Enhanced Nurse Scheduler")
-    report.append(f"Report Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    report.append("=" * 80)
+    satisfaction_lines = "\n".join(
+        f"{nurse.name:20s} {satisfaction.get(nurse.id, 0):.1%}" for nurse in schedule.nurses
+    )
     
-    return "\n".join(report)
+    return _REPORT_TEMPLATE.format(
+        rule="=" * 80,
+        line="-" * 80,
+        title=" " * 25 + "NURSE SCHEDULE REPORT",
+        subtitle=" " * 20 + "HealthFlow RegTech - Egypt",
+        schedule=schedule,
+        start=schedule.start_date.date(),
+        end=schedule.end_date.date(),
+        days=(schedule.end_date - schedule.start_date).days,
+        created=schedule.created_at,
+        stats=stats,
+        metrics=metrics,
+        feasibility='FEASIBLE' if metrics['is_feasible'] else 'INFEASIBLE',
+        n_shifts=n_shifts,
+        covered=covered,
+        covered_pct=covered / n_shifts * 100 if n_shifts else 0.0,
+        uncovered=n_shifts - covered,
+        satisfaction_lines=satisfaction_lines + "\n" if satisfaction_lines else "",
+        now=datetime.now()
+    )
 
 
 if __name__ == "__main__":